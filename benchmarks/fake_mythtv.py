@@ -0,0 +1,445 @@
+"""
+Local stand-in for the MythTV Services API, for benchmarks.
+
+Serves program lists, channels and backend status built from the recorded
+JSON fixtures in ``benchmarks/fixtures``, scaled up to a configurable number
+of programs, with an optional fixed latency per request to simulate a slow
+backend. Write requests (schedule, delete, undelete, stop) update the fake
+state so follow-up reads see the change, and are announced as backend events
+to event monitors connected to the Myth protocol port (see
+:func:`serve_events`), as a stub event source for live updates.
+
+Run standalone with ``python -m benchmarks.fake_mythtv --port 6544``.
+"""
+
+import argparse
+import copy
+import json
+import queue
+import socketserver
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+TITLES = [
+    "Nature's Neighbors",
+    "Evening Mystery Theatre",
+    "Kitchen Confidential",
+    "The Big Game",
+    "Evening News",
+    "Space Frontiers",
+    "Antiques Unearthed",
+    "Sunday Movie Classics",
+]
+CATEGORIES = ["Animals", "Drama", "Cooking", "Sports event", "News", "Science"]
+# RecType codes of recording rule types, as in program recording details
+REC_TYPES = {"Single Record": 1, "Record All": 4, "Record One": 6}
+
+
+def load_fixture(name):
+    with open(FIXTURE_DIR / f"{name}.json") as fixture:
+        return json.load(fixture)
+
+
+def api_time(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeMythTV:
+    """Fake backend state: channels, guide, upcoming and recorded programs."""
+
+    def __init__(self, channels=40, guide=2000, upcoming=200, recorded=1000):
+        self.lock = threading.Lock()
+        self.request_counts = {}
+        now = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+
+        channel = load_fixture("channel")
+        self.channels = []
+        for i in range(channels):
+            info = dict(channel)
+            info.update(
+                ChanId=1001 + i,
+                ChanNum=f"{i // 4 + 2}.{i % 4 + 1}",
+                CallSign=f"W{chr(65 + i % 26)}{chr(65 + i // 26)}",
+                ChannelName=f"Channel {i + 1}",
+            )
+            self.channels.append(info)
+
+        # guide listings: consecutive half-hour programs on every channel
+        template = load_fixture("guide_program")
+        self.guide = [
+            self.program(
+                template,
+                i,
+                now + timedelta(minutes=30 * (i // channels)),
+                self.channels[i % channels],
+            )
+            for i in range(guide)
+        ]
+        # one upcoming recording an hour, each on a different channel
+        template = load_fixture("upcoming_program")
+        self.upcoming = [
+            self.program(
+                template,
+                i,
+                now + timedelta(hours=i + 1),
+                self.channels[i % channels],
+                recording={"RecordId": 100 + i % 25},
+            )
+            for i in range(upcoming)
+        ]
+        # recordings, most recent first
+        template = load_fixture("recorded_program")
+        self.recorded = [
+            self.program(
+                template,
+                i,
+                now - timedelta(hours=i + 1),
+                self.channels[i % channels],
+                recording={"RecordedId": 5000 + i, "RecordId": 100 + i % 25},
+            )
+            for i in range(recorded)
+        ]
+        self.status = load_fixture("backend_status")
+        self.status["BackendStatus"]["Scheduled"] = self.upcoming[:10]
+        self.rules = {}
+        # event queues of connected event monitors
+        self.monitors = set()
+
+    def emit(self, message):
+        """Announce a backend event to connected event monitors."""
+        for monitor in list(self.monitors):
+            monitor.put(message)
+
+    def program(self, template, i, start, channel, recording=None):
+        """Copy of a fixture program varied by index, time and channel."""
+        program = copy.deepcopy(template)
+        duration = datetime.fromisoformat(template["EndTime"]) - datetime.fromisoformat(
+            template["StartTime"]
+        )
+        program.update(
+            StartTime=api_time(start),
+            EndTime=api_time(start + duration),
+            Title=TITLES[i % len(TITLES)],
+            SubTitle=f"Episode {i}" if program["SubTitle"] else "",
+            Category=CATEGORIES[i % len(CATEGORIES)],
+            Season=i % 7,
+            Episode=i % 22 + 1,
+        )
+        program["Channel"] = dict(
+            program["Channel"],
+            **{key: channel[key] for key in ("ChanId", "ChanNum", "CallSign")},
+            ChannelName=channel["ChannelName"],
+        )
+        if "Recording" in program:
+            program["Recording"].update(recording or {})
+        return program
+
+    def count(self, endpoint):
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    # --- request handlers, by endpoint; return JSON-serializable data
+
+    def program_list(self, programs, query):
+        start = int(query.get("StartIndex", 0))
+        count = query.get("Count") or query.get("count")
+        selected = programs[start : start + int(count)] if count else programs[start:]
+        return {
+            "ProgramList": {
+                "StartIndex": str(start),
+                "Count": str(len(selected)),
+                "TotalAvailable": str(len(programs)),
+                "AsOf": api_time(datetime.now(UTC)),
+                "Version": "34.0",
+                "ProtoVer": "91",
+                "Programs": selected,
+            }
+        }
+
+    def get_recorded_list(self, query):
+        programs = self.recorded
+        if query.get("descending", "true").lower() not in ("true", "1"):
+            programs = programs[::-1]
+        return self.program_list(programs, query)
+
+    def get_upcoming_list(self, query):
+        return self.program_list(self.upcoming, query)
+
+    def get_program_list(self, query):
+        programs = self.guide
+        # programs overlapping the time range, like the backend
+        if query.get("StartTime") and query.get("EndTime"):
+            start = datetime.fromisoformat(query["StartTime"])
+            end = datetime.fromisoformat(query["EndTime"])
+            programs = [
+                p
+                for p in programs
+                if datetime.fromisoformat(p["EndTime"]) >= start
+                and datetime.fromisoformat(p["StartTime"]) <= end
+            ]
+        if "ChanId" in query:
+            programs = [
+                p for p in programs if str(p["Channel"]["ChanId"]) == query["ChanId"]
+            ]
+        for filter_name, key in (
+            ("TitleFilter", "Title"),
+            ("CategoryFilter", "Category"),
+            ("KeywordFilter", "Description"),
+        ):
+            if query.get(filter_name):
+                term = query[filter_name].lower()
+                programs = [p for p in programs if term in p[key].lower()]
+        if query.get("PersonFilter"):
+            term = query["PersonFilter"].lower()
+            programs = [
+                p
+                for p in programs
+                if any(term in c["Name"].lower() for c in p["Cast"]["CastMembers"])
+            ]
+        return self.program_list(programs, query)
+
+    def get_program_details(self, query):
+        for program in self.upcoming + self.guide:
+            if str(program["Channel"]["ChanId"]) == query.get("ChanId") and program[
+                "StartTime"
+            ] == query.get("StartTime"):
+                return {"Program": program}
+        return {"Program": {}}
+
+    def get_recorded(self, query):
+        return {"Program": self.find_recording(query.get("RecordedId"))}
+
+    def find_recording(self, recorded_id):
+        for program in self.recorded:
+            if str(program["Recording"]["RecordedId"]) == str(recorded_id):
+                return program
+        return {}
+
+    def get_record_schedule(self, query):
+        rule_id = int(query.get("RecordId") or 0)
+        rule = self.rules.get(rule_id) or {
+            "Id": 0,
+            "Type": "Not Recording",
+            "ChanId": query.get("ChanId"),
+            "StartTime": query.get("StartTime"),
+        }
+        return {"RecRule": dict(rule, CallSign=self.channels[0]["CallSign"])}
+
+    def get_channel_info_list(self, query):
+        return {"ChannelInfoList": {"ChannelInfos": self.channels}}
+
+    def get_backend_status(self, query):
+        return self.status
+
+    def get_host_name(self, query):
+        return {"String": "fake-mythtv"}
+
+    def add_record_schedule(self, form):
+        rule_id = int(form.get("Id") or 0) or len(self.rules) + 1000
+        self.rules[rule_id] = dict(form, Id=rule_id)
+        # the scheduler marks the matching showing as will record
+        for program in self.upcoming + self.guide:
+            if str(program["Channel"]["ChanId"]) == form.get("ChanId") and program[
+                "StartTime"
+            ] == form.get("StartTime"):
+                program["Recording"] = {
+                    "RecordId": rule_id,
+                    "RecType": REC_TYPES.get(form.get("Type"), 0),
+                    "Status": -1,
+                    "StatusName": "WillRecord",
+                    "RecGroup": "Default",
+                }
+        self.emit("SCHEDULE_CHANGE")
+        return {"uint": rule_id}
+
+    def remove_record_schedule(self, form):
+        rule_id = int(form.get("RecordId", 0))
+        for program in self.upcoming + self.guide:
+            if program.get("Recording", {}).get("RecordId") == rule_id:
+                del program["Recording"]
+        self.emit("SCHEDULE_CHANGE")
+        return {"bool": self.rules.pop(rule_id, None) is not None}
+
+    def set_rec_group(self, form, rec_group, action):
+        program = self.find_recording(form.get("RecordedId"))
+        if program:
+            program["Recording"]["RecGroup"] = rec_group
+            self.emit(
+                f"RECORDING_LIST_CHANGE {action} {program['Channel']['ChanId']}"
+                f" {program['StartTime']}"
+            )
+        return {"bool": bool(program)}
+
+    def delete_recording(self, form):
+        return self.set_rec_group(form, "Deleted", "DELETE")
+
+    def undelete_recording(self, form):
+        return self.set_rec_group(form, "Default", "ADD")
+
+    def stop_recording(self, form):
+        program = self.find_recording(form.get("RecordedId"))
+        if program:
+            self.emit(
+                f"REC_FINISHED CARDID 1 CHANID {program['Channel']['ChanId']}"
+                f" STARTTIME {program['StartTime']}"
+                f" RECORDEDID {program['Recording']['RecordedId']}"
+            )
+        return {"bool": bool(program)}
+
+    def handlers(self):
+        return {
+            "Dvr/GetRecordedList": self.get_recorded_list,
+            "Dvr/GetUpcomingList": self.get_upcoming_list,
+            "Dvr/GetRecorded": self.get_recorded,
+            "Dvr/GetRecordSchedule": self.get_record_schedule,
+            "Guide/GetProgramList": self.get_program_list,
+            "Guide/GetProgramDetails": self.get_program_details,
+            "Channel/GetChannelInfoList": self.get_channel_info_list,
+            "Status/GetBackendStatus": self.get_backend_status,
+            "Myth/GetHostName": self.get_host_name,
+            "Dvr/AddRecordSchedule": self.add_record_schedule,
+            "Dvr/UpdateRecordSchedule": self.add_record_schedule,
+            "Dvr/RemoveRecordSchedule": self.remove_record_schedule,
+            "Dvr/DeleteRecording": self.delete_recording,
+            "Dvr/UnDeleteRecording": self.undelete_recording,
+            "Dvr/StopRecording": self.stop_recording,
+        }
+
+
+def make_handler(backend, latency=0.0):
+    handlers = backend.handlers()
+
+    class Handler(BaseHTTPRequestHandler):
+        # keep-alive, like the real backend
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def respond(self, query):
+            url = urlparse(self.path)
+            endpoint = url.path.strip("/")
+            query.update({k: v[-1] for k, v in parse_qs(url.query).items()})
+            backend.count(endpoint)
+            if latency:
+                time.sleep(latency)
+            handler = handlers.get(endpoint)
+            if handler is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            with backend.lock:
+                body = json.dumps(handler(query)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.respond({})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode())
+            self.respond({k: v[-1] for k, v in form.items()})
+
+    return Handler
+
+
+def serve(backend=None, port=0, latency=0.0):
+    """
+    Start a fake backend in a background thread; returns the server.
+    The port it is listening on is ``server.server_address[1]``.
+    """
+    backend = backend or FakeMythTV()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(backend, latency))
+    server.daemon_threads = True
+    server.backend = backend
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_event_handler(backend):
+    class EventHandler(socketserver.BaseRequestHandler):
+        """Myth protocol connection that accepts event monitors."""
+
+        def receive(self):
+            length = int(self.request.recv(8).decode().strip() or 0)
+            data = b""
+            while len(data) < length:
+                data += self.request.recv(length - len(data))
+            return data.decode()
+
+        def send(self, *fields):
+            data = "[]:[]".join(fields).encode()
+            self.request.sendall(f"{len(data):<8}".encode() + data)
+
+        def handle(self):
+            version = self.receive().split()[1]
+            self.send("ACCEPT", version)
+            if not self.receive().startswith("ANN Monitor"):
+                return
+            self.send("OK")
+            events = queue.Queue()
+            backend.monitors.add(events)
+            try:
+                while True:
+                    self.send("BACKEND_MESSAGE", events.get(), "empty")
+            except OSError:
+                pass
+            finally:
+                backend.monitors.discard(events)
+
+    return EventHandler
+
+
+def serve_events(backend, port=0):
+    """
+    Start a Myth protocol server for backend events in a background thread;
+    returns the server. Only event monitor connections are supported.
+    """
+    server = socketserver.ThreadingTCPServer(
+        ("127.0.0.1", port), make_event_handler(backend)
+    )
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--port", type=int, default=6544)
+    parser.add_argument("--event-port", type=int, default=6543)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each request"
+    )
+    parser.add_argument("--channels", type=int, default=40)
+    parser.add_argument("--guide", type=int, default=2000)
+    parser.add_argument("--upcoming", type=int, default=200)
+    parser.add_argument("--recorded", type=int, default=1000)
+    args = parser.parse_args()
+    backend = FakeMythTV(
+        channels=args.channels,
+        guide=args.guide,
+        upcoming=args.upcoming,
+        recorded=args.recorded,
+    )
+    serve(backend, port=args.port, latency=args.latency)
+    serve_events(backend, port=args.event_port)
+    print(
+        f"Fake MythTV backend listening on port {args.port}"
+        f" (events on port {args.event_port})"
+    )
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
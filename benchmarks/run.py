@@ -0,0 +1,280 @@
+"""
+Benchmark nu_mythweb views, program parsing and template rendering against
+a local fake MythTV backend (see :mod:`benchmarks.fake_mythtv`).
+
+    python -m benchmarks.run [--latency 0.02] [--recorded 5000] [--repeat 5]
+
+For every page in ``nu_mythweb/urls.py``, except those in :data:`EXCLUDED`,
+reports median view latency with a cold and a warm cache, response size,
+backend requests made and peak memory allocated while handling the request.
+Also reports ``MythProgram.from_json`` throughput and the time to render
+each page template from already loaded data, with and without cached table
+rows. Use ``--json`` to save results for comparison between runs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.fake_mythtv import FakeMythTV, serve
+
+
+def timed(func, repeat):
+    """Median duration in milliseconds of calling ``func`` ``repeat`` times."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def peak_allocation(func):
+    """Peak memory in KiB allocated while calling ``func``."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def response_content(response):
+    """Content of a regular or (sync or async) streaming response."""
+    if not response.streaming:
+        return response.content
+    if response.is_async:
+
+        async def consume():
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        return asyncio.run(consume())
+    return b"".join(response.streaming_content)
+
+
+# named URL patterns not benchmarked, and why
+EXCLUDED = {
+    # an event stream stays open until the browser disconnects, so it has no
+    # latency or size to measure
+    "live-updates": "endless event stream",
+}
+# unnamed patterns not benchmarked: the favicon, a redirect to a static file
+
+
+def page_requests(backend):
+    """Example request for each named URL pattern: (method, args, data)."""
+    upcoming = backend.upcoming[0]
+    recorded_ids = [
+        program["Recording"]["RecordedId"] for program in backend.recorded[:5]
+    ]
+    return {
+        "home": ("get", {}, {}),
+        "upcoming": ("get", {}, {}),
+        "guide-search": ("get", {}, {"q": "news", "search-filter": "Title"}),
+        "guide-grid": ("get", {}, {}),
+        "list-recordings": ("get", {}, {}),
+        "schedule-recording": (
+            "post",
+            {},
+            {
+                "chan_id": upcoming["Channel"]["ChanId"],
+                "start_time": upcoming["StartTime"],
+                "record_type": "one",
+            },
+        ),
+        "manage-recording": (
+            "post",
+            {"recorded_id": backend.recorded[0]["Recording"]["RecordedId"]},
+            {"action": "undelete"},
+        ),
+        "manage-recordings": (
+            "post",
+            {},
+            {"action": "undelete", "recorded_id": recorded_ids},
+        ),
+        "program-status": ("get", {}, {"recorded_id": recorded_ids[0]}),
+        "metrics": ("get", {}, {}),
+    }
+
+
+def clear_caches():
+    """Clear API responses and rendered fragments."""
+    from django.core.cache import caches
+
+    for cache in caches.all(initialized_only=True):
+        cache.clear()
+
+
+def bench_views(backend, repeat):
+    from django.test import Client
+    from django.urls import get_resolver, reverse
+
+    client = Client()
+    requests = page_requests(backend)
+    results = {}
+    for pattern in get_resolver().url_patterns:
+        name = pattern.name
+        if name in EXCLUDED:
+            print(f"  skipping {pattern.pattern} ({EXCLUDED[name]})")
+            continue
+        if name is None:
+            continue
+        if name not in requests:
+            print(f"  skipping {pattern.pattern} (no example request)")
+            continue
+        method, args, data = requests[name]
+        url = reverse(name, kwargs=args)
+
+        def request(method=method, url=url, data=data):
+            response = getattr(client, method)(url, data)
+            assert response.status_code == 200, f"{url}: {response.status_code}"
+            return response_content(response)
+
+        def cold_request(request=request):
+            clear_caches()
+            return request()
+
+        clear_caches()
+        backend.request_counts.clear()
+        size = len(request())
+        backend_requests = sum(backend.request_counts.values())
+        results[name] = {
+            "url": url,
+            "cold_ms": timed(cold_request, repeat),
+            "warm_ms": timed(request, repeat),
+            "bytes": size,
+            "backend_requests": backend_requests,
+            "peak_kib": peak_allocation(cold_request),
+        }
+    return results
+
+
+def bench_from_json(backend, repeat):
+    from nu_mythweb.recordings.api_models import MythProgram
+
+    programs = backend.recorded
+    duration = timed(lambda: [MythProgram.from_json(p) for p in programs], repeat)
+    return {
+        "programs": len(programs),
+        "ms": duration,
+        "programs_per_s": len(programs) / duration * 1000,
+        "peak_kib": peak_allocation(
+            lambda: [MythProgram.from_json(p) for p in programs]
+        ),
+    }
+
+
+def bench_templates(repeat):
+    from django.core.cache import caches
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+
+    from nu_mythweb.recordings.api_models import program_days
+    from nu_mythweb.recordings.mythtv_service import MythTVService
+
+    service = MythTVService()
+    request = RequestFactory().get("/")
+    upcoming = service.get_upcoming_recordings()
+    recordings = service.get_recent_recordings(limit=None)
+    guide = service.search_guide("", channel_id=None, days=20) or upcoming
+    # views group programs by day for the program table
+    pages = {
+        "upcoming.html": {"programs": upcoming, "days": list(program_days(upcoming))},
+        "list_recordings.html": {
+            "recordings": recordings,
+            "days": list(program_days(recordings)),
+        },
+        "guide_search.html": {
+            "results": guide,
+            "days": list(program_days(guide)),
+            "query": "news",
+        },
+    }
+    results = {}
+    for template, context in pages.items():
+        template_name = f"recordings/{template}"
+
+        def render(template_name=template_name, context=context):
+            return render_to_string(template_name, context, request)
+
+        def cold_render(render=render):
+            caches["fragments"].clear()
+            return render()
+
+        results[template] = {
+            "programs": len(next(iter(context.values()))),
+            "ms": timed(cold_render, repeat),
+            "cached_ms": timed(render, repeat),
+            "peak_kib": peak_allocation(cold_render),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="backend latency in seconds"
+    )
+    parser.add_argument("--channels", type=int, default=40)
+    parser.add_argument("--guide", type=int, default=2000)
+    parser.add_argument("--upcoming", type=int, default=200)
+    parser.add_argument("--recorded", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    backend = FakeMythTV(
+        channels=args.channels,
+        guide=args.guide,
+        upcoming=args.upcoming,
+        recorded=args.recorded,
+    )
+    server = serve(backend, latency=args.latency)
+    # configure the site to use the fake backend before loading settings
+    os.environ["MYTHTV_BACKEND_IP"] = "127.0.0.1"
+    os.environ["MYTHTV_BACKEND_PORT"] = str(server.server_address[1])
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nu_mythweb.settings")
+    os.environ.setdefault("DJANGO_ALLOWED_HOSTS", "testserver")
+    # measure requests only, without background cache refreshes
+    os.environ.setdefault("MYTHTV_CACHE_WARMER", "False")
+    os.environ.setdefault("MYTHTV_METRICS", "True")
+    import django
+
+    django.setup()
+
+    results = {"args": vars(args)}
+    print("Views (median ms):")
+    results["views"] = bench_views(backend, args.repeat)
+    for name, r in results["views"].items():
+        print(
+            f"  {r['url']:<32} cold {r['cold_ms']:8.1f}  warm {r['warm_ms']:8.1f}"
+            f"  {r['bytes'] / 1024:8.1f} KiB  {r['backend_requests']:3d} backend"
+            f"  peak {r['peak_kib']:8.0f} KiB"
+        )
+
+    r = results["from_json"] = bench_from_json(backend, args.repeat)
+    print(
+        f"MythProgram.from_json: {r['programs_per_s']:,.0f} programs/s"
+        f"  ({r['programs']} in {r['ms']:.1f} ms, peak {r['peak_kib']:.0f} KiB)"
+    )
+
+    print("Template rendering (median ms):")
+    results["templates"] = bench_templates(args.repeat)
+    for name, r in results["templates"].items():
+        print(
+            f"  {name:<32} {r['ms']:8.1f}  cached rows {r['cached_ms']:8.1f}"
+            f"  ({r['programs']} programs, peak {r['peak_kib']:.0f} KiB)"
+        )
+
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=2)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nu_mythweb.settings')
+# serve async views, so slow backend requests do not block worker threads
+os.environ.setdefault('MYTHTV_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -1,14 +1,67 @@
+import threading
+
+from nu_mythweb.recordings import metrics
 from nu_mythweb.recordings.mythtv_service import MythTVService
 
+# process-local channel lookup, rebuilt only when the channel list changes
+_channel_index = {"version": None, "channels": {}}
+_channel_index_lock = threading.Lock()
+
+
+def get_channel_index():
+    """
+    Return a dict of channel id to display label for all channels.
+
+    The dict is built once per process and reused while the digest of the
+    cached channel list stays the same (see
+    :meth:`MythTVService.channels_version`), so most calls only read the
+    cache entry's digest instead of decoding the full channel list. A
+    refresh that returns different channels changes the digest.
+    """
+    myth_api = MythTVService()
+    version = myth_api.channels_version()
+    if version is not None and version == _channel_index["version"]:
+        metrics.increment("mythtv_cache_requests_total", cache="channels", result="hit")
+        return _channel_index["channels"]
+    metrics.increment("mythtv_cache_requests_total", cache="channels", result="miss")
+
+    with _channel_index_lock:
+        if version is not None and version == _channel_index["version"]:
+            return _channel_index["channels"]
+
+        # a stale list is returned while it is refreshed, so take the
+        # version of the list before loading it; if a refresh finishes in
+        # between, the index is only rebuilt again on the next call
+        version = myth_api.channels_version(stale=True)
+        channels = myth_api.get_channels()
+        if not channels:
+            # backend unavailable; don't remember an empty list
+            return {}
+        if version is None:
+            version = myth_api.channels_version(stale=True)
+        if version is None or version != _channel_index["version"]:
+            # convert list of channels to dict for lookup/display
+            _channel_index["channels"] = {
+                c["ChanId"]: f"{c['CallSign']} - {c['ChannelName']}" for c in channels
+            }
+            _channel_index["version"] = version
+    return _channel_index["channels"]
+
 
 def channel_list(request):
     """
     Injects the channel dictionary into every template context.
-    The service already handles the caching logic.
-    """
-    # get list of channels; convert to dict for lookup/display
-    channels_dict = {
-        c["ChanId"]: f"{c['CallSign']} - {c['ChannelName']}"
-        for c in MythTVService().get_channels()
-    }
-    return {"CHANNELS_DICT": channels_dict}
+
+    The dictionary is passed as a callable, which the template engine only
+    calls if a template uses ``CHANNELS_DICT``; partial responses that don't
+    display channels don't pay for loading it.
+    """
+    return {"CHANNELS_DICT": get_channel_index}
+
+
+def backend_status(request):
+    """
+    Injects ``MYTHTV_OFFLINE``, the time the backend became unavailable, or
+    None while it is available, so pages can mark cached data as stale.
+    """
+    return {"MYTHTV_OFFLINE": MythTVService().breaker.opened_at}
@@ -1,16 +1,27 @@
 import datetime
 import re
-from dataclasses import dataclass, fields
+import sys
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from itertools import accumulate, groupby
+from types import MappingProxyType
 
+from django.contrib.humanize.templatetags.humanize import naturalday
+from django.utils import dateformat, timezone
+from django.utils.timesince import timeuntil
 
+
+@lru_cache(maxsize=256)
 def split_camel_case(text):
     """Turn status like 'WillRecord' into 'Will Record'"""
     if not text:
         return text
     # This regex finds the boundary between lowercase and uppercase
-    return re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return sys.intern(re.sub(r"([a-z])([A-Z])", r"\1 \2", text))
 
 
+@lru_cache(maxsize=256)
 def category_slug(text):
     text = text.lower()
 
@@ -22,36 +33,94 @@ def category_slug(text):
         # animated, sitcom, animals, movie
         slug = text
 
-    return slug
+    return sys.intern(slug)
 
 
-def get_status_class(code):
-    """Map MythTV numeric status codes to CSS class."""
+# MythTV numeric status codes and corresponding CSS class
+STATUS_CLASSES = {
     # 0: Recording, -2: Will Record
-    if code in [0, -2]:
-        return "status-recording"
+    0: "status-recording",
+    -2: "status-recording",
     # -3: Recorded (?)
-    elif code == -3:
-        return "status-recorded"
-    # -3: Conflict, -5: Offline/Error
-    elif code in [-3, -5]:
-        return "status-conflict"
+    -3: "status-recorded",
+    # -5: Offline/Error
+    -5: "status-conflict",
+}
+
+
+def get_status_class(code):
+    """Map MythTV numeric status codes to CSS class."""
     # Default for Previous, Don't Record, etc.
-    else:
-        return "status-default"
+    return STATUS_CLASSES.get(code, "status-default")
+
+
+# channel details kept for each program
+CHANNEL_KEYS = ("ChanId", "ChanNum", "CallSign", "ChannelName")
+
+
+@lru_cache(maxsize=2048)
+def shared_channel(*values):
+    """
+    Return a channel mapping, shared by all programs on the same channel;
+    read-only, since a change would show up on every one of them.
+    """
+    return MappingProxyType(dict(zip(CHANNEL_KEYS, values)))
+
+
+class ProgramList(list):
+    """List of programs, with paging information from a MythTV ProgramList."""
+
+    def __init__(self, programs=(), start_index=0, total_available=None):
+        super().__init__(programs)
+        self.start_index = start_index
+        # total number of programs available from the backend for the query
+        self.total_available = len(self) if total_available is None else total_available
 
+    @property
+    def end_index(self):
+        """Index after the last program in this list."""
+        return self.start_index + len(self)
+
+    @property
+    def has_more(self):
+        return self.end_index < self.total_available
+
+
+@dataclass(slots=True)
+class ProgramDisplay:
+    """Formatted values shown for a program in program tables."""
+
+    # start time in the current time zone
+    start: datetime.datetime
+    time: str
+    duration: str
+    # original air date year, when not the year shown
+    air_year: str
+    # cast as (role, names) pairs
+    cast: tuple
+
+
+def cast_by_role(cast):
+    """Names of cast members grouped by role, e.g. ``("Actor", "A, B")``."""
+    members = (cast or {}).get("CastMembers") or []
+    return tuple(
+        (role, ", ".join(member["Name"] for member in role_members))
+        for role, role_members in groupby(
+            members, key=lambda member: member.get("TranslatedRole")
+        )
+    )
 
-@dataclass
+
+@dataclass(slots=True)
 class MythProgram:
     # field names match the lowercase version of the MythTV JSON API response keys
     title: str = ""
     subtitle: str = ""
     description: str = ""
-    start_time: datetime = None
-    end_time: datetime = None
-    air_date: datetime = None
+    # times are stored as returned by the API and only parsed when used
     raw_start_time: str = ""
     raw_end_time: str = ""
+    raw_air_date: str = ""
     status_display: str = ""
     status_code_class: str = ""
     category_code: str = ""
@@ -61,12 +130,21 @@ class MythProgram:
     recording: dict = None
     cast: dict = None
     filesize: int = None
+    # search result text with matches marked, by field; see recordings.search
+    highlights: dict = field(default=None, repr=False, compare=False)
+    _start_time: datetime.datetime = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _end_time: datetime.datetime = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _display: ProgramDisplay = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def from_json(cls, data):
         """Factory method to initialize from MythTV API response."""
-        class_fields = {f.name for f in fields(cls)}
-
         # Build a kwargs dict of data for the class
         init_kwargs = {
             "category_code": category_slug(data["Category"]),
@@ -74,37 +152,167 @@ class MythProgram:
         # get recording status - for programs in guide, is None
         recording_data = data.get("Recording")
         if recording_data:
-            init_kwargs.update(
-                {
-                    "status_display": split_camel_case(
-                        recording_data.get("StatusName", "Unknown")
-                    ),
-                    "status_code_class": get_status_class(
-                        int(recording_data.get("Status", 99))
-                    ),
-                }
+            init_kwargs["status_display"] = split_camel_case(
+                recording_data.get("StatusName", "Unknown")
             )
-        else:
-            init_kwargs.update(
-                {
-                    "status_display": "Not Recording",
-                    "status_code_class": "not-recording",
-                }
+            init_kwargs["status_code_class"] = get_status_class(
+                int(recording_data.get("Status", 99))
             )
+        else:
+            init_kwargs["status_display"] = "Not Recording"
+            init_kwargs["status_code_class"] = "not-recording"
+
+        json_fields = _json_fields
         for key, val in data.items():
-            key = key.lower()
-            if key in class_fields:
-                init_kwargs[key] = val
-            elif key in ["starttime", "endtime"] and val:
-                key = key.replace("time", "_time")  # add _ between start/end and time
-                init_kwargs[key] = datetime.datetime.fromisoformat(val)
-                # store raw value for use in forms
-                init_kwargs[f"raw_{key}"] = val
-            elif key == "airdate" and val:
-                init_kwargs["air_date"] = datetime.date.fromisoformat(val)
+            name = json_fields.get(key, _MISSING)
+            if name is _MISSING:
+                name = json_fields[key] = _field_for_key(key)
+            if name is not None:
+                init_kwargs[name] = val
 
+        channel = init_kwargs.get("channel")
+        if channel:
+            init_kwargs["channel"] = shared_channel(
+                *(channel.get(key) for key in CHANNEL_KEYS)
+            )
         return cls(**init_kwargs)
 
+    @property
+    def start_time(self) -> datetime.datetime:
+        if self._start_time is None and self.raw_start_time:
+            self._start_time = datetime.datetime.fromisoformat(self.raw_start_time)
+        return self._start_time
+
+    @property
+    def end_time(self) -> datetime.datetime:
+        if self._end_time is None and self.raw_end_time:
+            self._end_time = datetime.datetime.fromisoformat(self.raw_end_time)
+        return self._end_time
+
+    @property
+    def air_date(self) -> datetime.date:
+        return (
+            datetime.date.fromisoformat(self.raw_air_date)
+            if self.raw_air_date
+            else None
+        )
+
     @property
     def duration(self) -> datetime.timedelta:
         return self.end_time - self.start_time
+
+    @property
+    def display(self) -> ProgramDisplay:
+        """
+        Formatted values for program tables, computed on first use. Cached
+        program lists compute them when they are stored (see
+        :mod:`~nu_mythweb.recordings.cache_codec`), so they are formatted
+        once per backend request instead of on every render.
+        """
+        if self._display is None:
+            start = timezone.localtime(self.start_time)
+            air_date = self.air_date
+            self._display = ProgramDisplay(
+                start=start,
+                time=dateformat.format(start, "g:i A"),
+                duration=timeuntil(self.end_time, self.start_time),
+                air_year=(
+                    str(air_date.year)
+                    if air_date and air_date.year != start.year
+                    else ""
+                ),
+                cast=cast_by_role(self.cast),
+            )
+        return self._display
+
+
+class ProgramDay:
+    """Programs starting on the same day, in the current time zone."""
+
+    __slots__ = ("programs", "continued")
+
+    def __init__(self, programs):
+        self.programs = programs
+        # the day continues from the previous page, whose rows have its header
+        self.continued = False
+
+    @property
+    def date(self):
+        return self.programs[0].display.start.date()
+
+    @property
+    def label(self):
+        """Date header, e.g. "Today" or "Saturday, May 2"."""
+        return naturalday(self.programs[0].display.start, "l, F j").title()
+
+
+def program_days(programs):
+    """Split programs, in time order, into a :class:`ProgramDay` per day."""
+    for _day, day_programs in groupby(
+        programs, key=lambda program: program.display.start.date()
+    ):
+        yield ProgramDay(list(day_programs))
+
+
+class GuideIndex:
+    """
+    Guide listings indexed by channel and time, for finding the programs on
+    a channel in a time range by bisection instead of scanning the listings.
+    """
+
+    __slots__ = ("channels",)
+
+    def __init__(self, programs):
+        by_channel = {}
+        for program in programs:
+            if program.channel and program.raw_start_time and program.raw_end_time:
+                by_channel.setdefault(program.channel["ChanId"], []).append(program)
+        # channel id -> (start times, end times, latest end time so far,
+        # programs), ordered by start time; times as timestamps
+        self.channels = {}
+        for chan_id, channel_programs in by_channel.items():
+            channel_programs.sort(key=lambda program: program.start_time)
+            ends = [program.end_time.timestamp() for program in channel_programs]
+            self.channels[chan_id] = (
+                [program.start_time.timestamp() for program in channel_programs],
+                ends,
+                # unlike end times, always in order, even if programs overlap
+                list(accumulate(ends, max)),
+                channel_programs,
+            )
+
+    def __len__(self):
+        return sum(len(entry[3]) for entry in self.channels.values())
+
+    def overlapping(self, chan_id, start, end):
+        """
+        Programs on a channel that overlap the time from ``start`` to
+        ``end`` (timestamps), in order of start time.
+        """
+        entry = self.channels.get(chan_id)
+        if entry is None:
+            return []
+        starts, ends, latest_ends, programs = entry
+        first = bisect_right(latest_ends, start)
+        last = bisect_left(starts, end)
+        return [programs[i] for i in range(first, last) if ends[i] > start]
+
+
+# JSON keys with differently named fields
+_renamed_keys = {
+    "starttime": "raw_start_time",
+    "endtime": "raw_end_time",
+    "airdate": "raw_air_date",
+}
+_field_names = {f.name for f in fields(MythProgram) if f.init}
+# cache of JSON key to field name (None for keys that are not stored),
+# filled in as keys are first seen
+_json_fields = {}
+_MISSING = object()
+
+
+def _field_for_key(key):
+    """Field name for a MythTV JSON API response key, if it is stored."""
+    name = key.lower()
+    name = _renamed_keys.get(name, name)
+    return name if name in _field_names else None
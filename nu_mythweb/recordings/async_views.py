@@ -0,0 +1,346 @@
+"""
+Async versions of the views in :mod:`nu_mythweb.recordings.views`, for
+deployment under ASGI (enabled by ``MYTHTV_ASYNC_VIEWS``). Backend calls
+are made with :class:`AsyncMythTVService`, so waiting on a slow backend
+suspends a coroutine instead of blocking a worker thread.
+
+Templates are rendered with :func:`~asgiref.sync.sync_to_async`, like local
+database queries: rendering reads cached row fragments and validators, and
+the channel list context processor may request channels from the backend.
+"""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render
+from django.views.decorators.http import require_POST
+
+from nu_mythweb.recordings import guide_mirror, program_grid
+from nu_mythweb.recordings.events import format_event, get_event_hub, last_event_id
+from nu_mythweb.recordings.mythtv_service import AsyncMythTVService
+from nu_mythweb.recordings.views import (
+    EVENT_STREAM_KEEPALIVE,
+    EVENT_STREAM_START,
+    MANAGE_ACTIONS,
+    MIRROR_UNAVAILABLE,
+    bulk_manage_context,
+    dashboard_context,
+    event_stream_response,
+    get_page_number,
+    get_recorded_ids,
+    get_recording_filters,
+    guide_grid_context,
+    guide_grid_window,
+    guide_search_params,
+    live_updates_disabled,
+    page_validators,
+    program_keys,
+    recording_filter_context,
+    recording_updated,
+    recordings_error,
+    render_if_modified,
+    render_paged_program_page,
+    render_program_page,
+    render_program_status,
+    render_recordings_page,
+    schedule_updated,
+    search_start,
+)
+
+# blocking helpers, run in a worker thread; see above
+arender = sync_to_async(render)
+arender_if_modified = sync_to_async(render_if_modified)
+arender_program_status = sync_to_async(render_program_status)
+apage_validators = sync_to_async(page_validators)
+
+
+async def dashboard(request):
+    mythtv_service = AsyncMythTVService()
+    results = await mythtv_service.gather(
+        status=mythtv_service.get_backend_status,
+        recorded=partial(mythtv_service.get_recent_recordings, limit=3),
+        # load channels used by the channel_list context processor
+        # so it does not make a blocking request while rendering
+        channels=mythtv_service.get_channels,
+    )
+    return await arender(
+        request, "recordings/dashboard.html", dashboard_context(results)
+    )
+
+
+async def upcoming_list(request):
+    context = {"programs": [], "error": None}
+    mythtv_service = AsyncMythTVService()
+    results = await mythtv_service.gather(
+        programs=mythtv_service.get_upcoming_recordings,
+        channels=mythtv_service.get_channels,
+    )
+    if results["programs"].ok:
+        context["programs"] = results["programs"].value
+    else:
+        context["error"] = f"Could not connect to MythTV: {results['programs'].error}"
+
+    return await arender_if_modified(
+        request,
+        await apage_validators(request, mythtv_service),
+        partial(
+            render_program_page,
+            request,
+            "recordings/upcoming.html",
+            context,
+            context["programs"],
+            asynchronous=True,
+        ),
+    )
+
+
+async def recordings_list(request):
+    page = get_page_number(request)
+    query = request.GET.get("q", "")
+    filters = get_recording_filters(request)
+    context = {
+        "recordings": [],
+        "error": None,
+        "query": query,
+        "filters": filters,
+        "bulk_actions": True,
+    }
+    myth_api = AsyncMythTVService()
+    # load channels used by the channel_list context processor
+    # so it does not make a blocking request while rendering
+    calls = {"channels": myth_api.get_channels}
+    if not query and not filters:
+        calls["recordings"] = partial(
+            myth_api.get_recent_recordings,
+            limit=settings.MYTHTV_RECORDINGS_PER_PAGE,
+            start=(page - 1) * settings.MYTHTV_RECORDINGS_PER_PAGE,
+        )
+    results = await myth_api.gather(**calls)
+    try:
+        if (query or filters) and not await sync_to_async(
+            guide_mirror.recordings_available
+        )():
+            context.update(MIRROR_UNAVAILABLE)
+        elif query:
+            context["recordings"] = await sync_to_async(guide_mirror.search_recordings)(
+                query, start=search_start(page)
+            )
+        elif filters:
+            context.update(await sync_to_async(recording_filter_context)(filters, page))
+        else:
+            if not results["recordings"].ok:
+                raise results["recordings"].error
+            context["recordings"] = results["recordings"].value
+    except Exception as e:
+        context.update(recordings_error(e))
+    context["filter_options"] = await sync_to_async(
+        guide_mirror.recording_filter_options
+    )()
+    return await arender_if_modified(
+        request,
+        await apage_validators(request, myth_api, context["filter_options"]),
+        partial(render_recordings_page, request, page, context, asynchronous=True),
+    )
+
+
+async def guide_search(request):
+    query, search_type, chan_id, searchable = guide_search_params(request)
+    page = get_page_number(request)
+    mythtv_service = AsyncMythTVService()
+    calls = {"channels": mythtv_service.get_channels}
+
+    mirror = searchable and await sync_to_async(guide_mirror.is_available)()
+    if mirror:
+        calls["upcoming"] = mythtv_service.get_upcoming_recordings
+    elif searchable:
+        calls["results"] = partial(
+            mythtv_service.search_guide, query, search_type, channel_id=chan_id
+        )
+    results = await mythtv_service.gather(**calls)
+    error = next(
+        (
+            results[name].error
+            for name in ("results", "upcoming")
+            if name in results and not results[name].ok
+        ),
+        None,
+    )
+
+    programs = []
+    validators = None
+    if mirror and error is None:
+        programs = await sync_to_async(guide_mirror.search_guide)(
+            query,
+            search_type,
+            channel_id=chan_id,
+            upcoming=results["upcoming"].value,
+            start=search_start(page),
+        )
+        validators = await apage_validators(
+            request,
+            mythtv_service,
+            await sync_to_async(guide_mirror.last_synced)(),
+            program_keys(programs),
+        )
+    elif "results" in results and error is None:
+        programs = results["results"].value
+        validators = await apage_validators(request, mythtv_service)
+    return await arender_if_modified(
+        request,
+        validators,
+        partial(
+            render_paged_program_page,
+            request,
+            page,
+            "recordings/guide_search.html",
+            {
+                "results": programs,
+                "query": query,
+                "search_filter": search_type,
+                "channel_id": chan_id,
+                "error": error and f"Could not connect to MythTV: {error}",
+            },
+            programs,
+            asynchronous=True,
+        ),
+    )
+
+
+async def guide_grid(request):
+    start, end = guide_grid_window(request)
+    mythtv_service = AsyncMythTVService()
+    blocks = program_grid.window_blocks(start, end)
+    results = await mythtv_service.gather(
+        channels=mythtv_service.get_channels,
+        upcoming=mythtv_service.get_upcoming_recordings,
+        **{
+            block.isoformat(): partial(mythtv_service.get_guide_index, block)
+            for block in blocks
+        },
+    )
+    validators = await apage_validators(request, mythtv_service, start)
+    for block in program_grid.adjacent_blocks(start, end):
+        mythtv_service.prefetch_guide_index(block)
+    return await arender_if_modified(
+        request,
+        validators,
+        partial(
+            render,
+            request,
+            "recordings/guide_grid.html",
+            guide_grid_context(results, start, end, blocks),
+        ),
+    )
+
+
+@require_POST
+async def schedule_recording(request):
+    # schedule or cancel recording
+    record_id = request.POST.get("record_id")  # available when existing rule
+    chan_id = request.POST.get("chan_id")
+    start_time = request.POST.get("start_time")
+    record_type = request.POST.get("record_type")
+    myth_api = AsyncMythTVService()
+    if record_type == "cancel" and record_id:
+        success = await myth_api.remove_record_schedule(record_id)
+    else:
+        success = await myth_api.update_record_schedule(
+            chan_id, start_time, record_type=record_type, record_id=record_id
+        )
+
+    # get updated program; check until it reflects the change
+    fetch = partial(myth_api.get_program_details, chan_id, start_time)
+    if success:
+        program = await myth_api.wait_for(fetch, schedule_updated(record_type))
+    else:
+        program = await fetch()
+
+    # re-render the record form portion of the recording status
+    return await arender(
+        request,
+        "recordings/partials/program_record_status.html",
+        {
+            "program": program,
+            "updated": success,
+        },
+    )
+
+
+@require_POST
+async def manage_recording(request, recorded_id: int):
+    # delete or undelete
+    program, success = await manage(
+        AsyncMythTVService(), recorded_id, request.POST.get("action")
+    )
+
+    # re-render the record form portion of the recording status
+    return await arender(
+        request,
+        "recordings/partials/program_record_status.html",
+        {
+            "program": program,
+            "updated": success,
+        },
+    )
+
+
+async def manage(myth_api, recorded_id, action):
+    method, kwargs = MANAGE_ACTIONS.get(action, (None, {}))
+    success = bool(method) and await getattr(myth_api, method)(recorded_id, **kwargs)
+
+    fetch = partial(myth_api.get_recording_details, recorded_id)
+    if success:
+        program = await myth_api.wait_for(fetch, recording_updated(action))
+        await sync_to_async(guide_mirror.update_recording)(recorded_id, program)
+    else:
+        program = await fetch()
+    return program, success
+
+
+@require_POST
+async def manage_recordings(request):
+    action = request.POST.get("action")
+    recorded_ids = get_recorded_ids(request)
+    myth_api = AsyncMythTVService()
+    results = await myth_api.map_concurrent(
+        partial(manage, myth_api, action=action), recorded_ids
+    )
+    return await arender(
+        request,
+        "recordings/partials/bulk_manage_results.html",
+        bulk_manage_context(recorded_ids, results),
+    )
+
+
+async def program_status(request):
+    recorded_id = request.GET.get("recorded_id")
+    if recorded_id:
+        program = await AsyncMythTVService().get_recording_details(recorded_id)
+    else:
+        program = await AsyncMythTVService().get_program_details(
+            request.GET.get("chan_id"), request.GET.get("start_time")
+        )
+    return await arender_program_status(request, program)
+
+
+async def live_updates(request):
+    if not settings.MYTHTV_LIVE_UPDATES:
+        return live_updates_disabled()
+    hub = get_event_hub()
+    event_id = last_event_id(request, hub)
+
+    async def stream():
+        nonlocal event_id
+        yield EVENT_STREAM_START
+        while True:
+            events = await hub.async_wait(
+                event_id, timeout=settings.MYTHTV_EVENT_HEARTBEAT
+            )
+            for event in events:
+                event_id = event["id"]
+                yield format_event(event)
+            if not events:
+                yield EVENT_STREAM_KEEPALIVE
+
+    return event_stream_response(stream())
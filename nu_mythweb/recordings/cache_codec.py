@@ -0,0 +1,139 @@
+"""
+Compact serialization of cached MythTV API results.
+
+Cached results would otherwise be pickled, which stores every program as
+an object with its attribute names and nested dicts. Instead, program lists
+are stored column by column (all titles, then all start times, ...) with
+:mod:`marshal`, which keeps objects shared between programs (channels,
+interned status and category names) shared, and is fast to decode. Other
+results from JSON data (e.g. the channel list) are marshalled as they are.
+Large results are compressed with zlib (``MYTHTV_CACHE_COMPRESSION``).
+"""
+
+import marshal
+import zlib
+from dataclasses import fields
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from nu_mythweb.recordings.api_models import (
+    CHANNEL_KEYS,
+    MythProgram,
+    ProgramDisplay,
+    ProgramList,
+    shared_channel,
+)
+
+# MythProgram constructor arguments, in order
+PROGRAM_FIELDS = tuple(f.name for f in fields(MythProgram) if f.init)
+# channels are read-only mappings, stored as a tuple of their values
+CHANNEL_COLUMN = PROGRAM_FIELDS.index("channel")
+# first byte of encoded data: what was encoded
+PROGRAMS = b"p"
+DATA = b"d"
+# second byte: whether the rest is compressed
+COMPRESSED = b"z"
+UNCOMPRESSED = b"-"
+# results smaller than this many bytes are not worth compressing
+COMPRESS_MIN_SIZE = 4096
+MARSHAL_VERSION = 4
+
+
+def encode(result):
+    """
+    Compact form of a result for the cache, as bytes. Results that are
+    neither program lists nor JSON data are returned as they are.
+    """
+    if isinstance(result, ProgramList):
+        return PROGRAMS + pack(program_columns(result))
+    if type(result) in (list, dict):
+        try:
+            return DATA + pack(result)
+        except ValueError:
+            # not marshallable
+            pass
+    return result
+
+
+def decode(data):
+    """Result from the output of :func:`encode`."""
+    if not isinstance(data, bytes):
+        return data
+    value = unpack(data[1:])
+    if data[:1] == PROGRAMS:
+        return program_list(value)
+    return value
+
+
+def pack(value):
+    data = marshal.dumps(value, MARSHAL_VERSION)
+    level = settings.MYTHTV_CACHE_COMPRESSION
+    if level and len(data) >= COMPRESS_MIN_SIZE:
+        return COMPRESSED + zlib.compress(data, level)
+    return UNCOMPRESSED + data
+
+
+def unpack(data):
+    if data[:1] == COMPRESSED:
+        return marshal.loads(zlib.decompress(data[1:]))
+    return marshal.loads(data[1:])
+
+
+def program_columns(programs):
+    """
+    Program list as columns of field values, and the formatted display
+    values of each program (see :func:`display_values`).
+    """
+    columns = [
+        [getattr(program, name) for program in programs] for name in PROGRAM_FIELDS
+    ]
+    columns[CHANNEL_COLUMN] = channel_values(columns[CHANNEL_COLUMN])
+    displays = [display_values(program) for program in programs]
+    return programs.start_index, programs.total_available, columns, displays
+
+
+def channel_values(channels):
+    """Channels as tuples of values, the same tuple for a shared channel."""
+    values = {}
+    for channel in channels:
+        if channel is not None and id(channel) not in values:
+            values[id(channel)] = tuple(channel.get(key) for key in CHANNEL_KEYS)
+    return [None if channel is None else values[id(channel)] for channel in channels]
+
+
+def display_values(program):
+    """
+    Formatted display values of a program (start time as a timestamp), or
+    None for programs without start and end times. Values not yet used are
+    formatted here, so cached lists are formatted once, when stored.
+    """
+    if not (program.raw_start_time and program.raw_end_time):
+        return None
+    display = program.display
+    return (
+        display.start.timestamp(),
+        display.time,
+        display.duration,
+        display.air_year,
+        display.cast,
+    )
+
+
+def program_list(value):
+    """Rebuild a :class:`ProgramList` from :func:`program_columns` output."""
+    start_index, total_available, columns, displays = value
+    columns[CHANNEL_COLUMN] = [
+        None if values is None else shared_channel(*values)
+        for values in columns[CHANNEL_COLUMN]
+    ]
+    programs = list(map(MythProgram, *columns))
+    tz = timezone.get_current_timezone()
+    for program, display in zip(programs, displays):
+        if display:
+            start, *formatted = display
+            program._display = ProgramDisplay(
+                datetime.fromtimestamp(start, tz), *formatted
+            )
+    return ProgramList(programs, start_index, total_available)
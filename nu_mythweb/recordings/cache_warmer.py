@@ -0,0 +1,74 @@
+"""
+Keeps data used on every page load cached, by refreshing it shortly before
+it expires, so user requests don't wait on the backend for a cold cache.
+
+Runs in a background thread of each web server process (started by
+:class:`~nu_mythweb.recordings.middleware.CacheWarmerMiddleware`), or with
+a shared cache, in a single ``warm_mythtv_cache`` management command.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from nu_mythweb.recordings.mythtv_service import CACHE_GENERATION_KEY, MythTVService
+
+# service calls kept warm, with the same arguments the views use so they
+# share cache entries: (method name, keyword arguments)
+WARM_CALLS = [
+    ("get_channels", {}),
+    ("get_backend_status", {}),
+    ("get_upcoming_recordings", {}),
+    # dashboard
+    ("get_recent_recordings", {"limit": 3}),
+    # first page of the recordings list
+    ("get_recent_recordings", {"limit": settings.MYTHTV_RECORDINGS_PER_PAGE}),
+]
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def warm_cache(interval=None):
+    """
+    Refresh cached results of :data:`WARM_CALLS` that are missing or will
+    expire before the next run, ``interval`` seconds from now.
+    """
+    service = MythTVService()
+    # allow for the time the refresh itself takes
+    service.refresh_ahead = 2 * (interval or settings.MYTHTV_CACHE_WARM_INTERVAL)
+    for name, kwargs in WARM_CALLS:
+        getattr(service, name)(**kwargs)
+
+
+def run_cache_warmer(interval=None):
+    """
+    Warm the cache every ``interval`` seconds, and as soon as cached data
+    is expired by a change.
+    """
+    interval = interval or settings.MYTHTV_CACHE_WARM_INTERVAL
+    generation = None
+    next_run = 0
+    while True:
+        current = cache.get(CACHE_GENERATION_KEY, 0)
+        if current != generation or time.monotonic() >= next_run:
+            generation = current
+            next_run = time.monotonic() + interval
+            try:
+                warm_cache(interval)
+            except Exception as e:
+                print(f"Error warming MythTV cache: {e}")
+        time.sleep(1)
+
+
+def start_cache_warmer():
+    """Start warming the cache in a background thread, if not already."""
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=run_cache_warmer, name="mythtv-cache-warmer", daemon=True
+            )
+            _thread.start()
@@ -0,0 +1,249 @@
+"""
+Live updates from MythTV backend events.
+
+The backend announces changes (recordings starting and finishing, schedule
+changes, deleted recordings) to clients connected to its Myth protocol port
+(``MYTHTV_EVENT_PORT``, 6543) as event monitors. An :class:`EventHub` runs
+one such connection per process in a background thread, started with the
+web server (see :class:`~nu_mythweb.recordings.middleware.EventHubMiddleware`)
+so cached data is expired even while no page is open, or else when the
+first browser subscribes. Each event expires cached API responses, so the
+next request sees the change, and is then passed to every subscriber; the
+``live_updates`` views send them to browsers as Server-Sent Events, where
+``live_updates.js`` reloads the status of affected programs.
+
+For local testing, ``benchmarks.fake_mythtv`` serves events for changes
+made through its API.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from nu_mythweb.recordings.mythtv_service import MythTVService
+
+# Myth protocol field separator
+FIELD_SEPARATOR = "[]:[]"
+# events sent to browsers; other backend messages are ignored
+LIVE_EVENTS = {
+    "REC_STARTED",
+    "REC_FINISHED",
+    "REC_DELETED",
+    "SCHEDULE_CHANGE",
+    "RECORDING_LIST_CHANGE",
+}
+# event arguments kept, by the name used in event messages
+EVENT_ARGUMENTS = {
+    "CHANID": "chan_id",
+    "STARTTIME": "start_time",
+    "RECORDEDID": "recorded_id",
+}
+# recent events kept to replay to reconnecting browsers
+EVENT_HISTORY = 100
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+class ProtocolError(Exception):
+    """Unexpected response from the backend on the Myth protocol port."""
+
+
+def parse_event(message):
+    """
+    Parse a backend event message, e.g. ``REC_STARTED CARDID 1 CHANID 1001
+    STARTTIME 2026-01-01T20:00:00Z RECORDEDID 42``. Returns a dict with the
+    event name and any program identifiers, or None for events that are
+    not sent to browsers.
+    """
+    words = message.split()
+    if not words or words[0] not in LIVE_EVENTS:
+        return None
+    event = {"event": words[0]}
+    if words[0] == "RECORDING_LIST_CHANGE" and len(words) == 4:
+        # RECORDING_LIST_CHANGE ADD|DELETE <chanid> <starttime>
+        event.update(action=words[1], chan_id=words[2], start_time=words[3])
+    else:
+        for name, value in zip(words[1:], words[2:]):
+            if name in EVENT_ARGUMENTS:
+                event[EVENT_ARGUMENTS[name]] = value
+    return event
+
+
+def send_message(sock, message):
+    """Send a Myth protocol message, prefixed with its length."""
+    data = message.encode()
+    sock.sendall(f"{len(data):<8}".encode() + data)
+
+
+def receive_message(sock):
+    """Receive a Myth protocol message; returns a list of fields."""
+    length = int(receive_exactly(sock, 8).decode().strip())
+    return receive_exactly(sock, length).decode().split(FIELD_SEPARATOR)
+
+
+def receive_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by MythTV backend")
+        data += chunk
+    return data
+
+
+def backend_events(host=None, port=None):
+    """
+    Connect to the backend as an event monitor and yield event messages
+    as they are received.
+    """
+    host = host or settings.MYTHTV_HOST
+    port = port or settings.MYTHTV_EVENT_PORT
+    with socket.create_connection(
+        (host, port), timeout=settings.MYTHTV_CONNECT_TIMEOUT
+    ) as sock:
+        send_message(
+            sock,
+            f"MYTH_PROTO_VERSION {settings.MYTHTV_PROTO_VERSION}"
+            f" {settings.MYTHTV_PROTO_TOKEN}",
+        )
+        reply = receive_message(sock)
+        if reply[0] != "ACCEPT":
+            raise ProtocolError(f"Protocol version rejected: {reply}")
+        send_message(sock, f"ANN Monitor {socket.gethostname()} 1")
+        reply = receive_message(sock)
+        if reply[0] != "OK":
+            raise ProtocolError(f"Event monitor rejected: {reply}")
+
+        # events can be hours apart; keep the connection open indefinitely
+        sock.settimeout(None)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        while True:
+            fields = receive_message(sock)
+            if fields[0] == "BACKEND_MESSAGE" and len(fields) > 1:
+                yield fields[1]
+
+
+class EventHub:
+    """
+    Receives backend events in a background thread and passes them on to
+    subscribers, which wait for events after the last one they have seen.
+    """
+
+    def __init__(self, source=backend_events):
+        self.source = source
+        self.events = deque(maxlen=EVENT_HISTORY)
+        self.last_id = 0
+        self.condition = threading.Condition()
+        # futures of async subscribers waiting for the next event
+        self.waiters = set()
+        self.thread = None
+
+    def start(self):
+        """Start listening for events, if not already."""
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.listen, name="mythtv-events", daemon=True
+                )
+                self.thread.start()
+
+    def listen(self):
+        """Receive events from the source, reconnecting after errors."""
+        delay = 1
+        while True:
+            try:
+                for message in self.source():
+                    delay = 1
+                    self.receive(message)
+            except Exception as e:
+                # anything else would stop the thread, and live updates with it
+                print(f"MythTV event connection error: {e!r}")
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def receive(self, message):
+        """Publish an event message; a bad message is logged and skipped."""
+        try:
+            event = parse_event(message)
+            if event:
+                self.publish(event)
+        except Exception as e:
+            print(f"MythTV event error ({message!r}): {e!r}")
+
+    def publish(self, event):
+        """Expire cached data affected by an event and notify subscribers."""
+        MythTVService().invalidate_cache()
+        with self.condition:
+            self.last_id += 1
+            self.events.append(dict(event, id=self.last_id))
+            self.condition.notify_all()
+            waiters, self.waiters = self.waiters, set()
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_set_done, future)
+
+    def events_after(self, event_id):
+        """Events received after the given event id, oldest first."""
+        with self.condition:
+            return [event for event in self.events if event["id"] > event_id]
+
+    def wait(self, event_id, timeout=None):
+        """Wait for events after the given event id; returns the events."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.last_id > event_id, timeout)
+        return self.events_after(event_id)
+
+    async def async_wait(self, event_id, timeout=None):
+        """Async version of :meth:`wait`."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.condition:
+            waiting = self.last_id <= event_id
+            if waiting:
+                self.waiters.add((loop, future))
+        if waiting:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except TimeoutError:
+                pass
+            finally:
+                # also when the browser disconnects and the task is cancelled
+                with self.condition:
+                    self.waiters.discard((loop, future))
+        return self.events_after(event_id)
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def get_event_hub():
+    """Return the process-wide event hub, listening for events."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = EventHub()
+    _hub.start()
+    return _hub
+
+
+def format_event(event):
+    """Format an event as a Server-Sent Event message."""
+    return f"id: {event['id']}\nevent: mythtv\ndata: {json.dumps(event)}\n\n"
+
+
+def last_event_id(request, hub):
+    """Id of the last event seen by a reconnecting browser, or the latest."""
+    try:
+        # ids restart from zero when the server restarts
+        return min(int(request.headers["Last-Event-ID"]), hub.last_id)
+    except (KeyError, ValueError):
+        return hub.last_id
@@ -0,0 +1,474 @@
+"""
+Local mirror of MythTV guide listings.
+
+Guide data is copied from the backend into the project database in blocks
+of time (``MYTHTV_GUIDE_SYNC_WINDOW_HOURS``) by :func:`sync_guide`, which is
+run by the ``sync_guide`` management command. Blocks are only fetched again
+once they are older than ``MYTHTV_GUIDE_SYNC_MAX_AGE_HOURS``, so a regular
+sync only requests the parts of the guide that are new or out of date.
+
+:func:`search_guide` queries the local tables instead of the backend.
+Recording status is taken from the (cached) upcoming recordings list, so
+schedule changes made since the last sync are still shown correctly.
+
+Recording details are also copied, by :func:`sync_recordings`, for
+searching and for filtering the recordings list by :func:`filter_recordings`
+without loading the whole list from the backend.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from nu_mythweb.recordings import search
+from nu_mythweb.recordings.api_models import MythProgram, ProgramList
+from nu_mythweb.recordings.models import (
+    Channel,
+    Credit,
+    GuideProgram,
+    GuideSyncWindow,
+    Person,
+    RecordedProgram,
+)
+from nu_mythweb.recordings.mythtv_service import MythTVService
+
+SEARCH_FILTERS = ["title", "category", "person", "keyword"]
+# search index column for each filter; keyword searches all columns
+SEARCH_FILTER_COLUMNS = {
+    "title": "title",
+    "category": "category",
+    "person": "people",
+    "keyword": None,
+}
+
+# recordings list filters, by request parameter; values must match exactly
+RECORDING_FILTERS = {
+    "title": "title",
+    "category": "category",
+    "rec_group": "rec_group",
+    "chan_id": "chan_id",
+}
+RECORDING_SORTS = {"newest": "-start_time", "oldest": "start_time"}
+
+
+def window_start(time):
+    """Start of the sync window that includes the given time."""
+    hours = settings.MYTHTV_GUIDE_SYNC_WINDOW_HOURS
+    time = time.astimezone(UTC)
+    return time.replace(
+        hour=time.hour - time.hour % hours, minute=0, second=0, microsecond=0
+    )
+
+
+def sync_guide(days=None, max_age=None, service=None, log=None):
+    """
+    Copy guide listings for the next ``days`` days from the backend. Windows
+    synced less than ``max_age`` ago are skipped; use ``max_age=timedelta(0)``
+    to refresh everything. Returns the number of windows synced.
+    """
+    days = days or settings.MYTHTV_GUIDE_SYNC_DAYS
+    if max_age is None:
+        max_age = timedelta(hours=settings.MYTHTV_GUIDE_SYNC_MAX_AGE_HOURS)
+    service = service or MythTVService()
+    window = timedelta(hours=settings.MYTHTV_GUIDE_SYNC_WINDOW_HOURS)
+    now = timezone.now()
+
+    synced_at = dict(
+        GuideSyncWindow.objects.filter(end_time__gt=now).values_list(
+            "start_time", "synced_at"
+        )
+    )
+    start = window_start(now)
+    synced = 0
+    while start < now + timedelta(days=days):
+        last_sync = synced_at.get(start)
+        if last_sync is None or now - last_sync >= max_age:
+            count = sync_window(service, start, start + window)
+            synced += 1
+            if log:
+                log(f"{start:%Y-%m-%d %H:%M} UTC: {count} programs")
+        start += window
+
+    # remove listings that have ended
+    GuideProgram.objects.filter(end_time__lt=now).delete()
+    GuideSyncWindow.objects.filter(end_time__lt=now).delete()
+    return synced
+
+
+def sync_window(service, start, end):
+    """Replace local listings for programs starting in a window of time."""
+    programs = [
+        data
+        for data in service.iter_guide_listings(start, end)
+        # the API also returns programs that started before the window
+        if start <= datetime.fromisoformat(data["StartTime"]) < end
+    ]
+
+    with transaction.atomic():
+        channels = {}
+        for data in programs:
+            channel = data.get("Channel", {})
+            channels[channel["ChanId"]] = Channel(
+                chan_id=channel["ChanId"],
+                chan_num=channel.get("ChanNum", ""),
+                call_sign=channel.get("CallSign", ""),
+                name=channel.get("ChannelName", ""),
+            )
+        Channel.objects.bulk_create(
+            channels.values(),
+            update_conflicts=True,
+            unique_fields=["chan_id"],
+            update_fields=["chan_num", "call_sign", "name"],
+        )
+
+        GuideProgram.objects.filter(start_time__gte=start, start_time__lt=end).delete()
+        guide_programs = GuideProgram.objects.bulk_create(
+            GuideProgram(
+                channel_id=data["Channel"]["ChanId"],
+                start_time=data["StartTime"],
+                end_time=data["EndTime"],
+                title=data.get("Title", ""),
+                subtitle=data.get("SubTitle", ""),
+                description=data.get("Description", ""),
+                category=data.get("Category", ""),
+                data=data,
+            )
+            for data in programs
+        )
+
+        search.index_programs(
+            GuideProgram,
+            [(program.pk, data) for program, data in zip(guide_programs, programs)],
+        )
+
+        cast = [
+            (program, member)
+            for program, data in zip(guide_programs, programs)
+            for member in (data.get("Cast") or {}).get("CastMembers", [])
+        ]
+        names = {member["Name"] for _, member in cast}
+        Person.objects.bulk_create(
+            (Person(name=name) for name in names), ignore_conflicts=True
+        )
+        person_ids = dict(
+            Person.objects.filter(name__in=names).values_list("name", "id")
+        )
+        Credit.objects.bulk_create(
+            Credit(
+                program=program,
+                person_id=person_ids[member["Name"]],
+                role=member.get("TranslatedRole") or member.get("Role", ""),
+            )
+            for program, member in cast
+        )
+
+        GuideSyncWindow.objects.update_or_create(
+            start_time=start,
+            defaults={
+                "end_time": end,
+                "synced_at": timezone.now(),
+                "program_count": len(programs),
+            },
+        )
+    return len(programs)
+
+
+def sync_recordings(service=None):
+    """
+    Replace the local copy of recordings with the current list from the
+    backend, for searching recordings. Returns the number of recordings.
+    """
+    service = service or MythTVService()
+    programs = list(service.iter_recordings(build=None))
+    with transaction.atomic():
+        RecordedProgram.objects.all().delete()
+        RecordedProgram.objects.bulk_create(
+            RecordedProgram(
+                recorded_id=data["Recording"]["RecordedId"],
+                start_time=data["StartTime"],
+                title=data.get("Title", ""),
+                subtitle=data.get("SubTitle", ""),
+                category=data.get("Category", ""),
+                rec_group=data["Recording"].get("RecGroup", ""),
+                chan_id=(data.get("Channel") or {}).get("ChanId"),
+                data=data,
+            )
+            for data in programs
+        )
+        search.index_programs(
+            RecordedProgram,
+            [(data["Recording"]["RecordedId"], data) for data in programs],
+        )
+    return len(programs)
+
+
+def update_recording(recorded_id, program):
+    """
+    Update the local copy of a recording with its details after a change
+    made here (delete, undelete, stop), so filtered and searched lists show
+    its new status and recording group before the next sync.
+    """
+    if program is None or not program.recording:
+        return
+    try:
+        recording = RecordedProgram.objects.get(pk=recorded_id)
+    except (RecordedProgram.DoesNotExist, DatabaseError):
+        # not synced yet, or migrations have not been run
+        return
+    recording.data = dict(recording.data, Recording=program.recording)
+    recording.rec_group = program.recording.get("RecGroup", "")
+    recording.save(update_fields=["data", "rec_group"])
+
+
+def is_available():
+    """Check if the mirror has guide data for the current time."""
+    if not settings.MYTHTV_GUIDE_MIRROR:
+        return False
+    try:
+        return GuideSyncWindow.objects.filter(
+            start_time__lte=timezone.now(), end_time__gt=timezone.now()
+        ).exists()
+    except DatabaseError:
+        # e.g. migrations have not been run
+        return False
+
+
+def recordings_available():
+    """Check if recordings have been copied for searching and filtering."""
+    if not settings.MYTHTV_GUIDE_MIRROR:
+        return False
+    try:
+        return RecordedProgram.objects.exists()
+    except DatabaseError:
+        # e.g. migrations have not been run
+        return False
+
+
+def last_synced():
+    """Time guide listings were last synced, or None."""
+    return GuideSyncWindow.objects.aggregate(Max("synced_at"))["synced_at__max"]
+
+
+def search_guide(
+    query, filter="Keyword", channel_id=None, days=20, upcoming=(), start=0
+):
+    """
+    Search local guide listings, with the same arguments as
+    :meth:`MythTVService.search_guide`. ``upcoming`` is the current list of
+    upcoming recordings, used for recording status. Returns a page of
+    results from ``start``, as a :class:`ProgramList` (see
+    :func:`search_page`).
+    """
+    now = timezone.now()
+    programs = GuideProgram.objects.filter(
+        end_time__gt=now, start_time__lt=now + timedelta(days=days)
+    )
+    if channel_id is not None:
+        programs = programs.filter(channel_id=channel_id)
+    if query:
+        filter = filter.lower()
+        if filter not in SEARCH_FILTERS:
+            raise ValueError(f"Invalid guide search filter: {filter}")
+        if search.is_available():
+            return search_results(
+                programs, query, SEARCH_FILTER_COLUMNS[filter], upcoming, start
+            )
+        if filter == "title":
+            programs = programs.filter(title__icontains=query)
+        elif filter == "category":
+            programs = programs.filter(category__icontains=query)
+        elif filter == "person":
+            programs = programs.filter(people__name__icontains=query).distinct()
+        else:
+            programs = programs.filter(
+                Q(title__icontains=query)
+                | Q(subtitle__icontains=query)
+                | Q(description__icontains=query)
+            )
+
+    return search_page(
+        (
+            program_with_status(data, upcoming)
+            for data in page_slice(programs.values_list("data", flat=True), start)
+        ),
+        start,
+    )
+
+
+def page_slice(results, start):
+    """
+    A page of ``MYTHTV_SEARCH_LIMIT`` search results from ``start``, and
+    one more if there are any, to tell if there is a next page.
+    """
+    return results[start : start + settings.MYTHTV_SEARCH_LIMIT + 1]
+
+
+def search_page(results, start):
+    """
+    :class:`ProgramList` of a page of search results from
+    :func:`page_slice`, with paging information; ``has_more`` is set if
+    there are more results after this page.
+    """
+    results = list(results)
+    more = len(results) > settings.MYTHTV_SEARCH_LIMIT
+    results = results[: settings.MYTHTV_SEARCH_LIMIT]
+    # the total is not counted; one more than shown when there are more
+    return ProgramList(
+        results, start_index=start, total_available=start + len(results) + more
+    )
+
+
+def search_results(programs, query, column=None, upcoming=(), start=0):
+    """
+    Full text search of a queryset of guide programs or recordings. Matches
+    are ranked, and a page of ``MYTHTV_SEARCH_LIMIT`` from ``start`` is
+    returned in time order (for display by day), with matched words
+    highlighted.
+    """
+    matches = search.search(
+        programs,
+        query,
+        column=column,
+        limit=settings.MYTHTV_SEARCH_LIMIT + 1,
+        offset=start,
+    )
+    data = dict(
+        programs.model.objects.filter(pk__in=[pk for pk, _ in matches]).values_list(
+            "pk", "data"
+        )
+    )
+    results = []
+    for pk, highlights in matches:
+        program = program_with_status(data[pk], upcoming)
+        program.highlights = highlights
+        results.append(program)
+    page = search_page(results, start)
+    page.sort(
+        key=lambda program: program.raw_start_time,
+        reverse=programs.model is RecordedProgram,
+    )
+    return page
+
+
+def search_recordings(query, start=0):
+    """
+    Search local recordings by keyword; returns a page of results from
+    ``start``, most recent first, as a :class:`ProgramList` (see
+    :func:`search_page`). Results are as of the last sync, and changes made
+    here (see :func:`update_recording`).
+    """
+    if search.is_available():
+        return search_results(RecordedProgram.objects.all(), query, start=start)
+    recordings = RecordedProgram.objects.filter(
+        Q(title__icontains=query)
+        | Q(subtitle__icontains=query)
+        | Q(data__Description__icontains=query)
+    )
+    return search_page(
+        (
+            MythProgram.from_json(data)
+            for data in page_slice(recordings.values_list("data", flat=True), start)
+        ),
+        start,
+    )
+
+
+def filter_recordings(filters, sort="newest", start=0, limit=None):
+    """
+    Local recordings matching filters (see :data:`RECORDING_FILTERS`), as a
+    :class:`ProgramList` with paging information. Filtered and sorted by the
+    database using indexes, so only matching recordings are loaded.
+    """
+    recordings = RecordedProgram.objects.filter(**recording_lookups(filters))
+    total = recordings.count()
+    recordings = recordings.order_by(RECORDING_SORTS.get(sort, "-start_time"))
+    end = start + limit if limit else None
+    return ProgramList(
+        (
+            MythProgram.from_json(data)
+            for data in recordings[start:end].values_list("data", flat=True)
+        ),
+        start_index=start,
+        total_available=total,
+    )
+
+
+def recording_series(filters):
+    """
+    Recordings matching filters grouped by title, most recently recorded
+    first: a list of dicts with ``title``, ``count`` and ``latest``.
+    """
+    return list(
+        RecordedProgram.objects.filter(**recording_lookups(filters))
+        .values("title")
+        .annotate(count=Count("pk"), latest=Max("start_time"))
+        .order_by("-latest")
+    )
+
+
+def recording_filter_options():
+    """
+    Values that recordings can be filtered by, for filter choices; empty if
+    recordings have not been synced.
+    """
+    recordings = RecordedProgram.objects.order_by()
+    try:
+        return {
+            name: [
+                value
+                for value in recordings.values_list(name, flat=True)
+                .distinct()
+                .order_by(name)
+                if value not in (None, "")
+            ]
+            for name in RECORDING_FILTERS
+            if name != "title"
+        }
+    except DatabaseError:
+        # e.g. migrations have not been run
+        return {}
+
+
+def recording_lookups(filters):
+    """Queryset lookups for recording filters; unknown filters are ignored."""
+    return {
+        RECORDING_FILTERS[name]: value
+        for name, value in filters.items()
+        if name in RECORDING_FILTERS and value
+    }
+
+
+def program_with_status(data, upcoming):
+    """
+    Build a :class:`MythProgram` from stored guide data, with recording
+    status from the upcoming recordings list when scheduled.
+    """
+    scheduled = upcoming_index(upcoming).get(
+        (data["Channel"]["ChanId"], data["StartTime"])
+    )
+    if scheduled is not None:
+        data = dict(data, Recording=scheduled.recording)
+    elif (data.get("Recording") or {}).get("StatusName") == "WillRecord":
+        # was scheduled when synced, but has since been cancelled
+        data = {key: val for key, val in data.items() if key != "Recording"}
+    return MythProgram.from_json(data)
+
+
+def upcoming_index(upcoming):
+    """Upcoming recordings by channel id and start time, built once per list."""
+    index = getattr(upcoming, "_guide_index", None)
+    if index is None:
+        index = {
+            (program.channel["ChanId"], program.raw_start_time): program
+            for program in upcoming
+            if program.channel
+        }
+        try:
+            upcoming._guide_index = index
+        except AttributeError:
+            # plain list or tuple; index is rebuilt for each program
+            pass
+    return index
@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from nu_mythweb.recordings.guide_mirror import sync_guide, sync_recordings
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy guide listings and recordings from the MythTV backend to the"
+        " local database, for searching"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="number of days to sync")
+        parser.add_argument(
+            "--max-age",
+            type=float,
+            help="hours before synced listings are fetched again",
+        )
+        parser.add_argument(
+            "--full", action="store_true", help="fetch all listings again"
+        )
+        parser.add_argument(
+            "--watch",
+            type=int,
+            metavar="SECONDS",
+            help="keep running, syncing at this interval",
+        )
+
+    def handle(self, *args, days=None, max_age=None, full=False, watch=None, **kwargs):
+        if full:
+            max_age = timedelta(0)
+        elif max_age is not None:
+            max_age = timedelta(hours=max_age)
+        log = self.stdout.write if kwargs["verbosity"] > 1 else None
+        while True:
+            try:
+                synced = sync_guide(days=days, max_age=max_age, log=log)
+                self.stdout.write(f"Synced {synced} guide windows")
+                synced = sync_recordings()
+                self.stdout.write(f"Synced {synced} recordings")
+            except Exception as e:
+                if not watch:
+                    raise
+                print(f"Error syncing guide: {e}")
+            if not watch:
+                break
+            time.sleep(watch)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from nu_mythweb.recordings.cache_warmer import run_cache_warmer, warm_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh frequently used MythTV data in the cache before it expires;"
+        " for use with a cache shared by all web server processes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="keep running, refreshing every MYTHTV_CACHE_WARM_INTERVAL seconds",
+        )
+
+    def handle(self, *args, watch=False, **kwargs):
+        if watch:
+            run_cache_warmer(settings.MYTHTV_CACHE_WARM_INTERVAL)
+        else:
+            warm_cache()
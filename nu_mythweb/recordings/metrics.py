@@ -0,0 +1,261 @@
+"""
+Instrumentation of MythTV API requests, caches and page rendering.
+
+Metrics are kept in memory in each process and exported in the Prometheus
+text format by the ``metrics`` view. Times are also added up for each
+request and sent in a ``Server-Timing`` header by
+:class:`~nu_mythweb.recordings.middleware.MetricsMiddleware`, so they show
+up in the browser's developer tools.
+
+Instrumented code calls :func:`timed`, :func:`observe` and
+:func:`increment` with one of the metric names in :data:`METRICS` and
+labels, e.g. ``increment("mythtv_cache_requests_total", cache="response",
+result="hit")``.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+# histogram bucket upper bounds
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+SIZE_BUCKETS = tuple(1024 * 4**i for i in range(9))
+
+# metric name: (type, help text, histogram buckets)
+METRICS = {
+    "mythtv_request_seconds": (
+        "histogram",
+        "Time waiting for MythTV API responses, by endpoint.",
+        DURATION_BUCKETS,
+    ),
+    "mythtv_request_errors_total": (
+        "counter",
+        "Failed MythTV API requests, by endpoint.",
+        None,
+    ),
+    "mythtv_response_bytes": (
+        "histogram",
+        "Size of MythTV API responses, by endpoint.",
+        SIZE_BUCKETS,
+    ),
+    "mythtv_parse_seconds": (
+        "histogram",
+        "Time decoding and parsing MythTV API responses, by endpoint.",
+        DURATION_BUCKETS,
+    ),
+    "mythtv_objects_built_total": (
+        "counter",
+        "Programs, channels and other items parsed from responses, by endpoint.",
+        None,
+    ),
+    "mythtv_cache_requests_total": (
+        "counter",
+        "Cache lookups, by cache, endpoint and result.",
+        None,
+    ),
+    "mythtv_backend_up": (
+        "gauge",
+        "Whether the MythTV backend is responding (circuit breaker closed).",
+        None,
+    ),
+    "django_view_seconds": (
+        "histogram",
+        "Time to respond to requests, by view; excludes streamed content.",
+        DURATION_BUCKETS,
+    ),
+    "django_render_seconds": (
+        "histogram",
+        "Time rendering templates, by view.",
+        DURATION_BUCKETS,
+    ),
+}
+
+_lock = threading.Lock()
+# (name, labels) -> value, or [bucket counts, sum, count] for histograms
+_values = {}
+# RequestTimings of the request being handled
+_request_timings = ContextVar("request_timings", default=None)
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def increment(name, amount=1, **labels):
+    """Add to a counter."""
+    if not settings.MYTHTV_METRICS:
+        return
+    key = (name, label_key(labels))
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _values[name, label_key(labels)] = value
+
+
+def observe(name, value, **labels):
+    """Record a value in a histogram."""
+    if not settings.MYTHTV_METRICS:
+        return
+    buckets = METRICS[name][2]
+    key = (name, label_key(labels))
+    with _lock:
+        histogram = _values.get(key)
+        if histogram is None:
+            histogram = _values[key] = [[0] * (len(buckets) + 1), 0, 0]
+        histogram[0][bisect_left(buckets, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+@contextmanager
+def timed(name, timing=None, **labels):
+    """
+    Time a block of code in a histogram, and add the time to the current
+    request's ``Server-Timing`` metric ``timing``, if given.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(name, time.perf_counter() - start, timing, **labels)
+
+
+def record_time(name, seconds, timing=None, **labels):
+    """Record a time measured by the caller, like :func:`timed`."""
+    observe(name, seconds, **labels)
+    timings = _request_timings.get()
+    if timing and timings is not None:
+        timings.add(timing, seconds)
+
+
+def record_response(endpoint, size, items):
+    """Record the size of a response and the number of items parsed from it."""
+    observe("mythtv_response_bytes", size, endpoint=endpoint)
+    increment("mythtv_objects_built_total", items, endpoint=endpoint)
+
+
+def count_items(result):
+    """Number of items parsed into a result: list length, or 1 for a dict."""
+    return len(result) if isinstance(result, list) else int(bool(result))
+
+
+class RequestTimings:
+    """
+    Total time and number of calls for each ``Server-Timing`` metric of a
+    request. Calls run in other threads with a copy of the request's
+    context (see :meth:`MythTVService.gather`) add to the same totals.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.totals = {}
+
+    def add(self, timing, seconds):
+        with _lock:
+            total = self.totals.setdefault(timing, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def header(self):
+        """``Server-Timing`` header value."""
+        with _lock:
+            totals = list(self.totals.items())
+        return ", ".join(
+            f"{timing};dur={seconds * 1000:.1f}"
+            + (f';desc="{count} calls"' if count > 1 else "")
+            for timing, (seconds, count) in totals
+        )
+
+
+def start_request(request):
+    """Start collecting ``Server-Timing`` metrics for a request."""
+    timings = RequestTimings(request)
+    _request_timings.set(timings)
+    return timings
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else ""
+
+
+def export():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        values = sorted(
+            (name, labels, list(value) if isinstance(value, list) else value)
+            for (name, labels), value in _values.items()
+        )
+    lines = []
+    described = set()
+    for name, labels, value in values:
+        kind, help_text, buckets = METRICS[name]
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        if kind != "histogram":
+            lines.append(f"{name}{format_labels(labels)} {value}")
+            continue
+        counts, total, count = value
+        cumulative = 0
+        for bound, bucket_count in zip(buckets + ("+Inf",), counts):
+            cumulative += bucket_count
+            le = format_labels(labels + (("le", bound),))
+            lines.append(f"{name}_bucket{le} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total}")
+        lines.append(f"{name}_count{format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return f"{{{pairs}}}"
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _request_timings.get()
+        # rows rendered while streaming a response are rendered without the
+        # request; label them with the view being streamed
+        view = view_name(request or (timings and timings.request))
+        with timed("django_render_seconds", "render", view=view):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend that records render times."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
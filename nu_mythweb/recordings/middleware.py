@@ -0,0 +1,76 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from nu_mythweb.recordings import metrics
+from nu_mythweb.recordings.cache_warmer import start_cache_warmer
+from nu_mythweb.recordings.events import get_event_hub
+
+
+class CacheWarmerMiddleware:
+    """
+    Starts the cache warmer thread when the web server loads middleware,
+    then removes itself; it does not process requests.
+    """
+
+    def __init__(self, get_response):
+        if settings.MYTHTV_CACHE_WARMER:
+            start_cache_warmer()
+        raise MiddlewareNotUsed
+
+
+class EventHubMiddleware:
+    """
+    Starts listening for backend events when the web server loads
+    middleware, so cached data is expired on changes whether or not any
+    page is open, then removes itself; it does not process requests.
+    """
+
+    def __init__(self, get_response):
+        if settings.MYTHTV_LIVE_UPDATES:
+            get_event_hub()
+        raise MiddlewareNotUsed
+
+
+class MetricsMiddleware:
+    """
+    Records the time taken to respond to each request, by view, and adds a
+    ``Server-Timing`` header with the time spent on MythTV API requests,
+    parsing responses and rendering templates.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.MYTHTV_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = metrics.start_request(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.add_timings(response, timings, started)
+
+    async def __acall__(self, request):
+        timings = metrics.start_request(request)
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.add_timings(response, timings, started)
+
+    def add_timings(self, response, timings, started):
+        seconds = time.perf_counter() - started
+        metrics.observe(
+            "django_view_seconds", seconds, view=metrics.view_name(timings.request)
+        )
+        # streamed content is rendered after the headers are sent
+        timings.add("total", seconds)
+        response.headers["Server-Timing"] = timings.header()
+        return response
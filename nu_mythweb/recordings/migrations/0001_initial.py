@@ -0,0 +1,160 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Channel",
+            fields=[
+                (
+                    "chan_id",
+                    models.PositiveIntegerField(primary_key=True, serialize=False),
+                ),
+                ("chan_num", models.CharField(blank=True, max_length=20)),
+                ("call_sign", models.CharField(blank=True, max_length=50)),
+                ("name", models.CharField(blank=True, max_length=255)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GuideSyncWindow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_time", models.DateTimeField(unique=True)),
+                ("end_time", models.DateTimeField()),
+                ("synced_at", models.DateTimeField()),
+                ("program_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["start_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Person",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GuideProgram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_time", models.DateTimeField()),
+                ("end_time", models.DateTimeField()),
+                ("title", models.CharField(max_length=255)),
+                ("subtitle", models.CharField(blank=True, max_length=255)),
+                ("description", models.TextField(blank=True)),
+                ("category", models.CharField(blank=True, max_length=100)),
+                ("data", models.JSONField()),
+                (
+                    "channel",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="programs",
+                        to="recordings.channel",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["start_time", "channel"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Credit",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("role", models.CharField(blank=True, max_length=50)),
+                (
+                    "program",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="recordings.guideprogram",
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="recordings.person",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="guideprogram",
+            name="people",
+            field=models.ManyToManyField(
+                related_name="programs",
+                through="recordings.Credit",
+                to="recordings.person",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guideprogram",
+            index=models.Index(
+                fields=["start_time"], name="recordings__start_t_119eac_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guideprogram",
+            index=models.Index(
+                fields=["end_time"], name="recordings__end_tim_cc08bd_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guideprogram",
+            index=models.Index(fields=["title"], name="recordings__title_e95a07_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="guideprogram",
+            index=models.Index(
+                fields=["category"], name="recordings__categor_5df676_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="guideprogram",
+            constraint=models.UniqueConstraint(
+                fields=("channel", "start_time"), name="unique_channel_showing"
+            ),
+        ),
+    ]
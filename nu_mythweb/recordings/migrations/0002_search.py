@@ -0,0 +1,68 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:41
+
+from django.db import migrations, models
+
+# indexed tables and their primary key, which is the rowid of the full text
+# search table row; see nu_mythweb.recordings.search
+SEARCH_TABLES = {
+    "recordings_guideprogram": "id",
+    "recordings_recordedprogram": "recorded_id",
+}
+
+
+def create_search_tables(apps, schema_editor):
+    # FTS5 is only available with SQLite; search falls back to filters
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, pk in SEARCH_TABLES.items():
+        fts = f"{table}_fts"
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            "title, subtitle, description, category, people, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        # bm25 weights by column, for ORDER BY rank
+        schema_editor.execute(
+            f"INSERT INTO {fts} ({fts}, rank) "
+            "VALUES ('rank', 'bm25(10.0, 4.0, 1.0, 2.0, 3.0)')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = old.{pk}; END"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in SEARCH_TABLES:
+        fts = f"{table}_fts"
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_delete")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recordings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecordedProgram",
+            fields=[
+                (
+                    "recorded_id",
+                    models.PositiveIntegerField(primary_key=True, serialize=False),
+                ),
+                ("start_time", models.DateTimeField()),
+                ("title", models.CharField(max_length=255)),
+                ("subtitle", models.CharField(blank=True, max_length=255)),
+                ("data", models.JSONField()),
+            ],
+            options={
+                "ordering": ["-start_time"],
+            },
+        ),
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
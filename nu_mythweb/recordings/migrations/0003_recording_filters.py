@@ -0,0 +1,73 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:45
+
+from django.db import migrations, models
+
+
+def restore_delete_trigger(apps, schema_editor):
+    # adding fields with SQLite rebuilds the table, which drops the trigger
+    # that removes deleted recordings from the search index; see 0002_search
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE TRIGGER IF NOT EXISTS recordings_recordedprogram_fts_delete"
+        " AFTER DELETE ON recordings_recordedprogram BEGIN"
+        " DELETE FROM recordings_recordedprogram_fts WHERE rowid = old.recorded_id;"
+        " END"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recordings", "0002_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recordedprogram",
+            name="category",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="recordedprogram",
+            name="chan_id",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="recordedprogram",
+            name="rec_group",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="recordedprogram",
+            index=models.Index(
+                fields=["start_time"], name="recordings__start_t_b12921_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recordedprogram",
+            index=models.Index(
+                fields=["title", "start_time"], name="recordings__title_67b7d5_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recordedprogram",
+            index=models.Index(
+                fields=["category", "start_time"], name="recordings__categor_652b45_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recordedprogram",
+            index=models.Index(
+                fields=["rec_group", "start_time"],
+                name="recordings__rec_gro_db04fb_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recordedprogram",
+            index=models.Index(
+                fields=["chan_id", "start_time"], name="recordings__chan_id_1e39a3_idx"
+            ),
+        ),
+        migrations.RunPython(restore_delete_trigger, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,112 @@
 from django.db import models
 
-# Create your models here.
+# Local mirror of MythTV guide and recording data, kept up to date by the
+# sync_guide management command; see nu_mythweb.recordings.guide_mirror.
+# Programs are also indexed for full text search when using SQLite; see
+# nu_mythweb.recordings.search
+
+
+class Channel(models.Model):
+    """A channel with guide listings."""
+
+    chan_id = models.PositiveIntegerField(primary_key=True)
+    chan_num = models.CharField(max_length=20, blank=True)
+    call_sign = models.CharField(max_length=50, blank=True)
+    name = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return f"{self.call_sign} - {self.name}"
+
+
+class Person(models.Model):
+    """A cast or crew member credited in guide listings."""
+
+    name = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class GuideProgram(models.Model):
+    """A single showing of a program in the guide."""
+
+    channel = models.ForeignKey(
+        Channel, on_delete=models.CASCADE, related_name="programs"
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    people = models.ManyToManyField(Person, through="Credit", related_name="programs")
+    # program data as returned by the MythTV API, for display
+    data = models.JSONField()
+
+    class Meta:
+        ordering = ["start_time", "channel"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["channel", "start_time"], name="unique_channel_showing"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["start_time"]),
+            models.Index(fields=["end_time"]),
+            models.Index(fields=["title"]),
+            models.Index(fields=["category"]),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.channel_id} {self.start_time})"
+
+
+class Credit(models.Model):
+    """A person's role in a program, e.g. actor or director."""
+
+    program = models.ForeignKey(GuideProgram, on_delete=models.CASCADE)
+    person = models.ForeignKey(Person, on_delete=models.CASCADE)
+    role = models.CharField(max_length=50, blank=True)
+
+
+class GuideSyncWindow(models.Model):
+    """A block of guide time that has been copied from the backend."""
+
+    start_time = models.DateTimeField(unique=True)
+    end_time = models.DateTimeField()
+    synced_at = models.DateTimeField()
+    program_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["start_time"]
+
+    def __str__(self):
+        return f"{self.start_time} - {self.end_time}"
+
+
+class RecordedProgram(models.Model):
+    """A recording on the backend, for searching recordings."""
+
+    recorded_id = models.PositiveIntegerField(primary_key=True)
+    start_time = models.DateTimeField()
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    rec_group = models.CharField(max_length=100, blank=True)
+    chan_id = models.PositiveIntegerField(null=True)
+    # program data as returned by the MythTV API, for display
+    data = models.JSONField()
+
+    class Meta:
+        ordering = ["-start_time"]
+        # for filtering the recordings list; see guide_mirror.filter_recordings
+        indexes = [
+            models.Index(fields=["start_time"]),
+            models.Index(fields=["title", "start_time"]),
+            models.Index(fields=["category", "start_time"]),
+            models.Index(fields=["rec_group", "start_time"]),
+            models.Index(fields=["chan_id", "start_time"]),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.start_time})"
@@ -1,74 +1,1121 @@
+import asyncio
+import codecs
+import contextvars
+import copy
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import timedelta
+from functools import partial
+from operator import itemgetter
+from typing import Any
+from urllib.parse import urlencode
 
+import httpx
 import requests
 from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from nu_mythweb.recordings.api_models import MythProgram
+from nu_mythweb.recordings import cache_codec, metrics
+from nu_mythweb.recordings.api_models import GuideIndex, MythProgram, ProgramList
 
+# A single transport adapter (and its urllib3 connection pool) is shared by
+# every MythTVService instance in the process, so connections to the backend
+# are kept alive and reused across requests instead of opening a new TCP
+# connection for every API call.
+_adapter = None
+_adapter_lock = threading.Lock()
+# requests.Session is not documented as thread-safe (cookies, settings),
+# so each thread gets its own session mounted on the shared adapter
+_local = threading.local()
+# worker threads used to run independent API calls concurrently
+_executor = None
+# turns taken by backends answering shared reads
+_read_turns = itertools.count()
+# async clients, one per event loop
+_async_clients = weakref.WeakKeyDictionary()
+# background cache refresh tasks of async services
+_background_tasks = set()
+# circuit breakers, one per backend
+_breakers = {}
+# indexed blocks of guide listings, by cache key and version of the listings
+_guide_indexes = {}
+_guide_index_lock = threading.Lock()
 
-class MythTVService:
-    def __init__(self, host=settings.MYTHTV_HOST, port=settings.MYTHTV_PORT):
-        self.base_url = f"http://{host}:{port}"
-        self.headers = {"Accept": "application/json"}
+# cached API responses are keyed on a generation number that is bumped after
+# every successful write, so schedule and recording changes are visible
+# immediately instead of after the cache expires
+CACHE_GENERATION_KEY = "mythtv:generation"
+# endpoints whose data is not affected by schedule or recording changes
+STATIC_ENDPOINTS = {"Channel/GetChannelInfoList"}
+# guide search start time granularity, in minutes
+GUIDE_SEARCH_ROUNDING = 15
+# bytes read at a time when streaming large responses
+STREAM_CHUNK_SIZE = 64 * 1024
+# cheap request used to check if an unavailable backend has recovered
+HEALTH_ENDPOINT = "Myth/GetHostName"
+# recording types offered in forms: recording rule type, and the matching
+# RecType code in program recording details
+RECORD_TYPES = {
+    "one": ("Record One", 6),
+    "single": ("Single Record", 1),
+    "all": ("Record All", 4),
+}
+# indexed guide blocks kept in each process, oldest dropped first
+GUIDE_INDEX_LIMIT = 16
+# endpoints any backend can answer, from the shared database; reads are
+# spread over all backends, other requests go to the master backend. Not
+# Guide/GetProgramDetails, which has the scheduler's recording status
+SHARED_READ_ENDPOINTS = (
+    "Guide/GetProgramList",
+    "Guide/GetProgramGuide",
+    "Channel/",
+    "Dvr/GetRecorded",
+)
 
-    def _get(self, endpoint, params=None):
-        """Internal helper for GET requests with error handling."""
-        url = f"{self.base_url}/{endpoint}"
+
+def get_http_adapter():
+    """Return the process-wide pooled adapter, creating it on first use."""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                retry = Retry(
+                    total=settings.MYTHTV_RETRIES,
+                    # a read timeout means the backend is slow, not that the
+                    # request was lost; retrying would only add to its load
+                    read=0,
+                    backoff_factor=settings.MYTHTV_RETRY_BACKOFF,
+                    status_forcelist=(502, 503, 504),
+                    # retry idempotent requests only; never resend a POST
+                    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                    raise_on_status=False,
+                )
+                _adapter = HTTPAdapter(
+                    # a pool of connections for each backend
+                    pool_connections=1 + len(settings.MYTHTV_SLAVE_BACKENDS),
+                    pool_maxsize=settings.MYTHTV_POOL_SIZE,
+                    max_retries=retry,
+                )
+    return _adapter
+
+
+def get_session():
+    """Return a keep-alive session for the current thread."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = get_http_adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+def get_executor():
+    """Return the process-wide thread pool used by :meth:`MythTVService.gather`."""
+    global _executor
+    if _executor is None:
+        with _adapter_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.MYTHTV_POOL_SIZE,
+                    thread_name_prefix="mythtv",
+                )
+    return _executor
+
+
+def get_timeout(endpoint):
+    """Connect and read timeout for an API endpoint."""
+    read_timeout = settings.MYTHTV_ENDPOINT_TIMEOUTS.get(
+        endpoint, settings.MYTHTV_TIMEOUT
+    )
+    return (settings.MYTHTV_CONNECT_TIMEOUT, read_timeout)
+
+
+# generation time included in every response; ignored by content digests
+RESPONSE_TIMESTAMP = re.compile(rb'"AsOf"\s*:\s*"[^"]*",?')
+
+
+def response_cache_key(base_url, endpoint, params, parse, generation):
+    """
+    Cache key for a parsed response from an endpoint with parameters, of
+    the backend (master) at ``base_url``.
+    """
+    query = urlencode(sorted((params or {}).items()))
+    parser = getattr(parse, "__qualname__", "raw")
+    digest = hashlib.md5(f"{base_url}|{parser}?{query}".encode()).hexdigest()
+    return f"mythtv:{endpoint}:{generation}:{digest}"
+
+
+def channel_list_params(source_id):
+    return {"SourceID": source_id, "OnlyVisible": True, "Details": False}
+
+
+def content_digest(content):
+    """Digest of a response body, ignoring the time it was generated."""
+    return hashlib.md5(RESPONSE_TIMESTAMP.sub(b"", content)).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """
+    A cached API response. Entries are kept in the cache past the time
+    they are fresh until, so a stale result can be served while refreshed.
+
+    ``digest`` identifies the response content and ``modified`` is the
+    time it last changed, kept when a refresh returns the same content;
+    together they are the response's version, for conditional requests.
+
+    The result is pickled in the compact form from :mod:`cache_codec`, and
+    only decoded when an entry loaded from the cache is first used.
+    """
+
+    result: Any
+    fresh_until: float
+    digest: str = ""
+    modified: float = 0.0
+
+    @property
+    def version(self):
+        """(digest, modified), or None for entries cached without a digest."""
+        return (self.digest, self.modified) if self.digest else None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if "result" in state:
+            state["result"] = cache_codec.encode(state.pop("result"))
+        else:
+            state["result"] = state.pop("encoded_result")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.encoded_result = self.__dict__.pop("result")
+
+    def __getattr__(self, name):
+        # only called for missing attributes: the result, until decoded
+        if name != "result" or "encoded_result" not in self.__dict__:
+            raise AttributeError(name)
+        self.result = cache_codec.decode(self.__dict__.pop("encoded_result"))
+        return self.result
+
+
+def new_cache_entry(previous, result, ttl, digest):
+    """Cache entry for a response, keeping the modified time of ``previous``
+    if the content has not changed."""
+    now = time.time()
+    unchanged = previous is not None and digest and previous.digest == digest
+    return CachedResponse(
+        result, now + ttl, digest, previous.modified if unchanged else now
+    )
+
+
+def cache_response(cache_key, result, ttl, digest=""):
+    """Cache a response, fresh for ``ttl`` seconds. Returns the cache entry."""
+    entry = new_cache_entry(cache.get(cache_key), result, ttl, digest)
+    cache.set(cache_key, entry, ttl + settings.MYTHTV_CACHE_GRACE)
+    return entry
+
+
+async def cache_response_async(cache_key, result, ttl, digest=""):
+    entry = new_cache_entry(await cache.aget(cache_key), result, ttl, digest)
+    await cache.aset(cache_key, entry, ttl + settings.MYTHTV_CACHE_GRACE)
+    return entry
+
+
+def wait_for_cached(cache_key, lock_key, timeout):
+    """
+    Wait for a response being fetched by another process to be cached.
+    Returns the cache entry, or None if the other process releases its lock
+    without caching a result or the timeout passes.
+    """
+    for delay in poll_delays(time.monotonic() + timeout, max_delay=0.25):
+        time.sleep(delay)
+        entry = cache.get(cache_key)
+        if entry is not None or cache.get(lock_key) is None:
+            return entry
+
+
+async def wait_for_cached_async(cache_key, lock_key, timeout):
+    for delay in poll_delays(time.monotonic() + timeout, max_delay=0.25):
+        await asyncio.sleep(delay)
+        entry = await cache.aget(cache_key)
+        if entry is not None or await cache.aget(lock_key) is None:
+            return entry
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function and any callers arriving while it runs wait for and share its
+    result (or exception), instead of repeating the work.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def run(self, key, func):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio version of :class:`SingleFlight`, for coroutine functions. The
+    call runs as a task, so it completes for the other callers even if the
+    first caller is cancelled.
+    """
+
+    def __init__(self):
+        # calls in progress on each event loop
+        self.calls = weakref.WeakKeyDictionary()
+
+    async def run(self, key, func):
+        calls = self.calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        return await asyncio.shield(task)
+
+
+_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
+
+
+class BackendUnavailable(Exception):
+    """Raised instead of sending a request while the backend is down."""
+
+
+def is_backend_failure(error):
+    """
+    Check if a request error means the backend is unavailable (no
+    connection, timed out, a server error or a response that is not JSON,
+    like a proxy error page or a cut off body), rather than a bad request.
+    """
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(
+        error,
+        (requests.ConnectionError, requests.Timeout, httpx.TransportError, ValueError),
+    )
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of a backend, so requests fail immediately while it
+    is down instead of each waiting for a timeout.
+
+    The breaker opens after ``MYTHTV_BREAKER_FAILURES`` consecutive failed
+    requests; while open, :meth:`allow_request` returns False. After
+    ``MYTHTV_BREAKER_RESET`` seconds it is half-open: the next request
+    starts a health probe in a worker thread (and still fails fast), and
+    the breaker closes if the backend responds, or stays open for another
+    reset period if not.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.lock = threading.Lock()
+        self.failures = 0
+        # when the breaker opened, for display; None while closed
+        self.opened_at = None
+        # time.monotonic() after which a probe is sent
+        self.retry_at = 0.0
+        self.probing = False
+
+    @property
+    def state(self):
+        """ "closed", "open" or "half-open"."""
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if self.probing or time.monotonic() >= self.retry_at:
+                return "half-open"
+            return "open"
+
+    def allow_request(self):
+        """Check if a request may be sent; starts a probe when one is due."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() < self.retry_at:
+                return False
+            self.probing = True
+        get_executor().submit(self.probe)
+        return False
+
+    def probe(self):
+        """Check if the backend responds to a cheap request."""
         try:
-            response = requests.get(
-                url, params=params, headers=self.headers, timeout=10
+            response = get_session().get(
+                f"{self.base_url}/{HEALTH_ENDPOINT}",
+                headers={"Accept": "application/json"},
+                timeout=(settings.MYTHTV_CONNECT_TIMEOUT, settings.MYTHTV_TIMEOUT),
             )
             response.raise_for_status()
-            return response.json()
         except requests.RequestException as e:
-            print(f"MythTV API Error ({endpoint}): {e}")
-            return {}
+            self.record(e)
+        else:
+            self.record()
 
-    def _post(self, endpoint, params=None, data=None):
-        """Internal helper for POST requests with error handling."""
-        url = f"{self.base_url}/{endpoint}"
+    def record(self, error=None):
+        """Record the outcome of a request: success, or the request error."""
+        if error is not None and is_backend_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def record_success(self):
+        with self.lock:
+            recovered = self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+        if recovered:
+            print(f"MythTV backend at {self.base_url} is available again")
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if (
+                self.opened_at is None
+                and self.failures < settings.MYTHTV_BREAKER_FAILURES
+            ):
+                return
+            opened = self.opened_at is None
+            if opened:
+                self.opened_at = timezone.now()
+            self.retry_at = time.monotonic() + settings.MYTHTV_BREAKER_RESET
+        if opened:
+            print(
+                f"MythTV backend at {self.base_url} is unavailable;"
+                " failing requests until it responds"
+            )
+
+
+def count_cache_lookup(endpoint, result):
+    metrics.increment(
+        "mythtv_cache_requests_total",
+        cache="response",
+        endpoint=endpoint,
+        result=result,
+    )
+
+
+def get_breaker(base_url):
+    """Return the process-wide circuit breaker for a backend."""
+    breaker = _breakers.get(base_url)
+    if breaker is None:
+        with _adapter_lock:
+            breaker = _breakers.setdefault(base_url, CircuitBreaker(base_url))
+    return breaker
+
+
+def get_async_client():
+    """
+    Return the pooled :class:`httpx.AsyncClient` for the running event loop.
+
+    httpx clients are bound to the event loop they were first used on, so one
+    client is kept per loop (normally just one under ASGI).
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # connections are pooled per backend; allow a full pool for each
+        pool_size = settings.MYTHTV_POOL_SIZE * (
+            1 + len(settings.MYTHTV_SLAVE_BACKENDS)
+        )
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        client = httpx.AsyncClient(
+            # httpx only retries failed connection attempts, never requests
+            transport=httpx.AsyncHTTPTransport(
+                limits=limits, retries=settings.MYTHTV_RETRIES
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_async_timeout(endpoint):
+    """httpx version of :func:`get_timeout`."""
+    connect_timeout, read_timeout = get_timeout(endpoint)
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def drop_empty(params):
+    """Remove unset values, which requests omits but httpx sends as blank."""
+    if params is None:
+        return None
+    return {key: val for key, val in params.items() if val is not None}
+
+
+def parse_programs(data):
+    """Parse a ProgramList response into a :class:`ProgramList`."""
+    program_list = data.get("ProgramList", {})
+    return ProgramList(
+        [MythProgram.from_json(prog) for prog in program_list.get("Programs", [])],
+        start_index=int(program_list.get("StartIndex") or 0),
+        total_available=(
+            int(program_list["TotalAvailable"])
+            if program_list.get("TotalAvailable")
+            else None
+        ),
+    )
+
+
+class ProgramListParser:
+    """
+    Incremental parser for a ProgramList JSON response.
+
+    Text is passed to :meth:`feed` as it arrives and each complete program
+    in the ``Programs`` array is returned as soon as it has been received,
+    so a large response never has to be held or decoded all at once.
+    Paging values that precede the array (``StartIndex``, ``TotalAvailable``)
+    are available as attributes once they have been read.
+    """
+
+    header_re = re.compile(r'"(StartIndex|Count|TotalAvailable)"\s*:\s*"?(\d+)')
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.in_programs = False
+        self.done = False
+        self.start_index = 0
+        self.total_available = None
+
+    def feed(self, text):
+        """Add text to the buffer; returns a list of complete program dicts."""
+        self.buffer += text
+        if self.done:
+            return []
+        pos = 0
+        if not self.in_programs:
+            key_pos = self.buffer.find('"Programs"')
+            array_pos = self.buffer.find("[", key_pos) if key_pos != -1 else -1
+            if array_pos == -1:
+                return []
+            header = dict(self.header_re.findall(self.buffer, 0, key_pos))
+            self.start_index = int(header.get("StartIndex", 0))
+            if "TotalAvailable" in header:
+                self.total_available = int(header["TotalAvailable"])
+            self.in_programs = True
+            pos = array_pos + 1
+
+        programs = []
+        buffer = self.buffer
+        while True:
+            # skip separators between array items
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                program, pos = self.decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # incomplete item; wait for more text
+                break
+            programs.append(program)
+        # discard parsed text
+        self.buffer = buffer[pos:]
+        return programs
+
+    def close(self):
+        """Check that the complete program list was received."""
+        if not self.done:
+            raise ValueError("Incomplete or invalid ProgramList response")
+
+
+def guide_block_params(block_start):
+    """Request parameters for the guide listings of a guide grid block."""
+    block_end = block_start + timedelta(hours=settings.MYTHTV_GUIDE_GRID_BLOCK_HOURS)
+    return {
+        "StartTime": block_start.isoformat(),
+        "EndTime": block_end.isoformat(),
+        "Details": "false",
+    }
+
+
+def parse_program(data):
+    """Parse a single Program response; returns None if not found."""
+    program_data = data.get("Program", {})
+    return MythProgram.from_json(program_data) if program_data else None
+
+
+def parse_backend_status(data):
+    return data.get("BackendStatus", {})
+
+
+def merge_backend_status(statuses):
+    """
+    Combine the status of several backends: the first (normally the
+    master's) status, with the encoders of all backends. Encoders listed
+    by more than one backend are only included once.
+    """
+    if not statuses:
+        return {}
+    encoders = {}
+    for status in statuses:
+        for encoder in status.get("Encoders", []):
+            encoders.setdefault((encoder.get("HostName"), encoder.get("Id")), encoder)
+    return {**statuses[0], "Encoders": list(encoders.values())}
+
+
+def parse_channels(data):
+    return data.get("ChannelInfoList", {}).get("ChannelInfos", [])
+
+
+def parse_rule_id(data):
+    # MythTV returns 'RecRule' if found
+    rule = data.get("RecRule", {})
+    return rule.get("Id") if rule else None
+
+
+def record_rule_params(chan_id, start_time, record_id=None):
+    """Parameters for retrieving a recording rule to add or update."""
+    return {
+        "ChanId": chan_id,
+        "StartTime": start_time,
+        "RecordId": record_id,
+    }
+
+
+def prepare_record_rule(recording_rule, record_type):
+    """
+    Update a recording rule from ``Dvr/GetRecordSchedule`` for the requested
+    recording type. Returns a tuple of the add/update endpoint and an updated
+    copy of the rule, or None if the rule already has the requested type.
+    """
+    # the response may be shared with concurrent requests (see SingleFlight)
+    recording_rule = copy.deepcopy(recording_rule)
+    # # If ID is 0, this is a new rule, so we Add. Otherwise Update.
+    if recording_rule.get("Id") == 0:
+        action = "Add"
+    else:
+        action = "Update"
+    endpoint = f"Dvr/{action}RecordSchedule"
+
+    # update recording rule
+    if record_type not in RECORD_TYPES:
+        raise ValueError(f"Unsupported recording type `{record_type}`")
+    rec_type, _ = RECORD_TYPES[record_type]
+
+    if recording_rule["Type"] == rec_type:
+        print("recording type is already as desired")
+        return None
+
+    recording_rule["Type"] = rec_type
+    # set station from channel call sign
+    recording_rule["Station"] = recording_rule["CallSign"]
+    return endpoint, recording_rule
+
+
+def poll_delays(deadline, max_delay=1.0):
+    """
+    Delays before each attempt when polling until a :func:`time.monotonic`
+    deadline: none for the first attempt, then exponential backoff capped
+    so that the last attempt happens at the deadline.
+    """
+    yield 0
+    delay = settings.MYTHTV_POLL_INTERVAL
+    while (remaining := deadline - time.monotonic()) > 0:
+        yield min(delay, remaining)
+        delay = min(delay * 2, max_delay)
+
+
+@dataclass
+class CallResult:
+    """Outcome of a single call run by :meth:`MythTVService.gather`."""
+
+    value: Any = None
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class MythTVService:
+    # cached results due to expire within this many seconds are refreshed
+    # before being returned; set by the cache warmer
+    refresh_ahead = 0
+
+    def __init__(self, host=None, port=None):
+        """
+        Use the configured backends: the master, and any slave backends for
+        reads (see :meth:`read_backends`); or only the backend at ``host``.
+        """
+        if host is None:
+            self.backends = [
+                f"{settings.MYTHTV_HOST}:{settings.MYTHTV_PORT}",
+                *settings.MYTHTV_SLAVE_BACKENDS,
+            ]
+        else:
+            self.backends = [f"{host}:{port or settings.MYTHTV_PORT}"]
+        self.backend_urls = [f"http://{address}" for address in self.backends]
+        # the master backend, for writes and the scheduler
+        self.base_url = self.backend_urls[0]
+        self.headers = {"Accept": "application/json"}
+        self.breaker = get_breaker(self.base_url)
+        # cache key: version of each response returned, see content_version
+        self.response_versions = {}
+
+    def for_backend(self, address):
+        """Service for only the backend at ``address`` (host:port)."""
+        host, _, port = address.partition(":")
+        return type(self)(host, port or None)
+
+    def read_backends(self, endpoint):
+        """
+        Base URLs of the backends a GET request can be sent to, in the
+        order to try them. Requests to endpoints in ``SHARED_READ_ENDPOINTS``
+        go to each backend in turn, those that are down last; others only
+        to the master.
+        """
+        if len(self.backend_urls) == 1 or not endpoint.startswith(
+            SHARED_READ_ENDPOINTS
+        ):
+            return [self.base_url]
+        turn = next(_read_turns) % len(self.backend_urls)
+        urls = self.backend_urls[turn:] + self.backend_urls[:turn]
+        return sorted(urls, key=lambda url: get_breaker(url).opened_at is not None)
+
+    def available_backend(self, endpoint):
+        """First of :meth:`read_backends` a request may be sent to, or None."""
+        return next(
+            (
+                url
+                for url in self.read_backends(endpoint)
+                if get_breaker(url).allow_request()
+            ),
+            None,
+        )
+
+    def backends_down(self, endpoint):
+        """Check if every backend that can answer ``endpoint`` is down."""
+        return all(
+            get_breaker(url).opened_at is not None
+            for url in self.read_backends(endpoint)
+        )
+
+    def _get(self, endpoint, params=None, parse=None, static=False):
+        """
+        Internal helper for GET requests with error handling.
+        When ``parse`` is given, it is applied to the JSON response data.
+        Parsed results for endpoints with a configured cache timeout
+        (``MYTHTV_CACHE_TTLS``) are cached. Once a cached result expires it
+        is still returned, for up to ``MYTHTV_CACHE_GRACE`` seconds, while
+        it is refreshed in the background. Results are kept across schedule
+        and recording changes for ``STATIC_ENDPOINTS``, or when ``static``.
+
+        While the backend is down (see :class:`CircuitBreaker`), requests
+        fail immediately and any cached result is returned instead.
+        """
+        ttl = settings.MYTHTV_CACHE_TTLS.get(endpoint)
+        entry = None
+        if ttl:
+            generation = (
+                0
+                if static or endpoint in STATIC_ENDPOINTS
+                else cache.get(CACHE_GENERATION_KEY, 0)
+            )
+            cache_key = response_cache_key(
+                self.base_url, endpoint, params, parse, generation
+            )
+            entry = cache.get(cache_key)
+            if entry is not None:
+                if entry.fresh_until - time.time() > self.refresh_ahead:
+                    count_cache_lookup(endpoint, "hit")
+                    return self._cached_result(cache_key, entry)
+                if not self.refresh_ahead:
+                    # stale; serve it while it is refreshed
+                    count_cache_lookup(endpoint, "stale")
+                    self._revalidate(cache_key, ttl, endpoint, params, parse)
+                    return self._cached_result(cache_key, entry)
+            count_cache_lookup(endpoint, "miss")
+        else:
+            cache_key = response_cache_key(
+                self.base_url, endpoint, params, parse, "uncached"
+            )
+
+        # identical concurrent requests share one request and result
+        result, ok, loaded = _flights.run(
+            (self.base_url, cache_key),
+            partial(self._load, endpoint, params, parse, cache_key, ttl),
+        )
+        if not ok and entry is not None:
+            return self._cached_result(cache_key, entry)
+        self.response_versions[cache_key] = loaded and loaded.version
+        return result
+
+    def _cached_result(self, cache_key, entry):
+        self.response_versions[cache_key] = entry.version
+        return entry.result
+
+    def content_version(self):
+        """
+        Version of the backend data returned by this service object so far,
+        as ``(digest, modified)``: a digest of the content of all responses
+        returned and the latest time any of them changed. None if nothing
+        was returned, or anything was not from a cached response (uncached
+        endpoints, failed requests), so its version is unknown.
+        """
+        versions = list(self.response_versions.values())
+        if not versions or None in versions:
+            return None
+        digest = hashlib.md5()
+        for content, _ in sorted(versions):
+            digest.update(content.encode())
+        return digest.hexdigest(), max(modified for _, modified in versions)
+
+    def _load(self, endpoint, params, parse, cache_key, ttl=None):
+        """
+        Fetch a response and cache it if ``ttl`` is set. With
+        ``MYTHTV_SHARED_SINGLE_FLIGHT``, if another process is already
+        fetching the same response, wait for it to be cached instead.
+        Returns the result, whether it was loaded, and its cache entry.
+        """
+        lock_key = None
+        if ttl and settings.MYTHTV_SHARED_SINGLE_FLIGHT:
+            lock_key = f"{cache_key}:flight"
+            timeout = sum(get_timeout(endpoint))
+            if not cache.add(lock_key, True, timeout):
+                entry = wait_for_cached(cache_key, lock_key, timeout)
+                if entry is not None:
+                    count_cache_lookup(endpoint, "shared")
+                    return entry.result, True, entry
+                # the other request failed; try again here
+                lock_key = None
         try:
-            response = requests.post(
-                url, data=data, params=params, headers=self.headers, timeout=10
+            result, ok, digest = self._fetch(endpoint, params, parse)
+            # don't cache the empty result for a failed request
+            if ok and ttl:
+                return result, ok, cache_response(cache_key, result, ttl, digest)
+            return result, ok, None
+        finally:
+            if lock_key:
+                cache.delete(lock_key)
+
+    def _fetch(self, endpoint, params=None, parse=None):
+        """
+        Uncached GET request; returns the parsed result, whether the
+        request succeeded and a digest of the response content. The request
+        is sent to each of :meth:`read_backends` in turn until one responds.
+        """
+        for base_url in self.read_backends(endpoint):
+            breaker = get_breaker(base_url)
+            if not breaker.allow_request():
+                continue
+            try:
+                with metrics.timed(
+                    "mythtv_request_seconds", "mythtv", endpoint=endpoint
+                ):
+                    response = get_session().get(
+                        f"{base_url}/{endpoint}",
+                        params=params,
+                        headers=self.headers,
+                        timeout=get_timeout(endpoint),
+                    )
+                    response.raise_for_status()
+                with metrics.timed("mythtv_parse_seconds", "parse", endpoint=endpoint):
+                    data = response.json()
+                    result = parse(data) if parse else data
+            except requests.RequestException as e:
+                print(f"MythTV API Error ({endpoint}): {e}")
+                metrics.increment("mythtv_request_errors_total", endpoint=endpoint)
+                breaker.record(e)
+                if is_backend_failure(e):
+                    continue
+                break
+            breaker.record()
+            metrics.record_response(
+                endpoint, len(response.content), metrics.count_items(result)
             )
-            response.raise_for_status()
-            return response.json()
+            return result, True, content_digest(response.content)
+        return (parse({}) if parse else {}), False, ""
+
+    def _revalidate(self, cache_key, ttl, endpoint, params=None, parse=None):
+        """
+        Refresh a stale cached response in a worker thread, unless another
+        thread or process is already refreshing it, or the backend is down.
+        """
+        if self.backends_down(endpoint):
+            return
+        lock_key = f"{cache_key}:refresh"
+        if not cache.add(lock_key, True, sum(get_timeout(endpoint))):
+            return
+
+        def refresh():
+            try:
+                result, ok, digest = self._fetch(endpoint, params, parse)
+                if ok:
+                    cache_response(cache_key, result, ttl, digest)
+            finally:
+                cache.delete(lock_key)
+
+        get_executor().submit(refresh)
+
+    def _post(self, endpoint, params=None, data=None, parse=None):
+        """
+        Internal helper for POST requests with error handling. Returns the
+        response data, parsed with ``parse`` when given, or None if the
+        request failed.
+        """
+        if not self.breaker.allow_request():
+            print(f"MythTV API Error ({endpoint}): backend unavailable")
+            return None
+        url = f"{self.base_url}/{endpoint}"
+        try:
+            with metrics.timed("mythtv_request_seconds", "mythtv", endpoint=endpoint):
+                response = get_session().post(
+                    url,
+                    data=data,
+                    params=params,
+                    headers=self.headers,
+                    timeout=get_timeout(endpoint),
+                )
+                response.raise_for_status()
+            result = response.json()
         except requests.RequestException as e:
             print(f"MythTV API Error ({endpoint}): {e}")
-            return {}
+            metrics.increment("mythtv_request_errors_total", endpoint=endpoint)
+            self.breaker.record(e)
+            return None
+        self.breaker.record()
+        self.invalidate_cache()
+        return parse(result) if parse else result
+
+    def _stream_programs(self, endpoint, params=None, build=MythProgram.from_json):
+        """
+        Internal helper to stream a ProgramList response as programs;
+        ``build=None`` yields the program data as returned by the API.
+
+        Unlike :meth:`_get`, request errors are raised (after any programs
+        already received), since a partial list can't otherwise be told
+        apart from a complete one. :class:`BackendUnavailable` is raised
+        while the backends that can answer the request are down.
+        """
+        base_url = self.available_backend(endpoint)
+        if base_url is None:
+            raise BackendUnavailable(f"MythTV backends for {endpoint} are down")
+        breaker = get_breaker(base_url)
+        url = f"{base_url}/{endpoint}"
+        parser = ProgramListParser()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        size = count = 0
+        started = time.perf_counter()
+        try:
+            with get_session().get(
+                url,
+                params=params,
+                headers=self.headers,
+                timeout=get_timeout(endpoint),
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                # time to the response headers; the rest depends on the caller
+                metrics.record_time(
+                    "mythtv_request_seconds",
+                    time.perf_counter() - started,
+                    "mythtv",
+                    endpoint=endpoint,
+                )
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    size += len(chunk)
+                    for program in parser.feed(decoder.decode(chunk)):
+                        count += 1
+                        yield build(program) if build else program
+        except requests.RequestException as e:
+            metrics.increment("mythtv_request_errors_total", endpoint=endpoint)
+            breaker.record(e)
+            raise
+        breaker.record()
+        metrics.record_response(endpoint, size, count)
+        parser.close()
+
+    def invalidate_cache(self):
+        """
+        Expire all cached responses affected by schedule or recording
+        changes; called after every successful write request.
+        """
+        # add is a no-op if the key exists; incr fails if it does not
+        cache.add(CACHE_GENERATION_KEY, 0, None)
+        cache.incr(CACHE_GENERATION_KEY)
+
+    def gather(self, **calls):
+        """
+        Run independent service calls concurrently and collect the results.
+
+        Each keyword argument maps a name to a zero-argument callable, e.g.
+        ``service.gather(status=service.get_backend_status,
+        recorded=partial(service.get_recent_recordings, limit=3))``.
+        Returns a dict of :class:`CallResult` keyed by the same names; an
+        exception raised by one call is stored on its result and does not
+        affect the others. Total latency is that of the slowest call.
+        """
+        if len(calls) <= 1:
+            # nothing to overlap; skip the thread hand-off
+            futures = None
+        else:
+            executor = get_executor()
+            # calls run with the request's context, for its Server-Timing totals
+            futures = {
+                name: executor.submit(contextvars.copy_context().run, func)
+                for name, func in calls.items()
+            }
+
+        results = {}
+        for name, func in calls.items():
+            try:
+                value = futures[name].result() if futures else func()
+                results[name] = CallResult(value=value)
+            except Exception as err:
+                results[name] = CallResult(error=err)
+        return results
+
+    def map_concurrent(self, func, items, limit=None):
+        """
+        Call ``func`` with each of ``items`` concurrently, with at most
+        ``limit`` (default ``MYTHTV_BULK_CONCURRENCY``) calls running at a
+        time, so a large batch neither floods the backend nor takes every
+        worker thread. Returns a list of :class:`CallResult` in the order of
+        ``items``.
+        """
+        executor = get_executor()
+        queue = enumerate(items)
+        results = {}
+        # future -> index of its item
+        pending = {}
+
+        def submit_next():
+            entry = next(queue, None)
+            if entry is not None:
+                index, item = entry
+                future = executor.submit(contextvars.copy_context().run, func, item)
+                pending[future] = index
+
+        for _ in range(limit or settings.MYTHTV_BULK_CONCURRENCY):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = CallResult(value=future.result())
+                except Exception as err:
+                    results[index] = CallResult(error=err)
+                submit_next()
+        return [results[index] for index in sorted(results)]
+
+    def wait_for(self, fetch, converged, timeout=None):
+        """
+        Poll until backend state reflects a change that was just made.
+
+        Calls ``fetch`` until ``converged`` returns true for its result or
+        ``timeout`` seconds (default ``MYTHTV_CONVERGE_TIMEOUT``) have
+        passed, and returns the last result. The first check is made
+        immediately; after that the delay between checks doubles, from
+        ``MYTHTV_POLL_INTERVAL`` up to a maximum of one second.
+        """
+        deadline = time.monotonic() + (timeout or settings.MYTHTV_CONVERGE_TIMEOUT)
+        for delay in poll_delays(deadline):
+            if delay:
+                time.sleep(delay)
+            result = fetch()
+            if converged(result):
+                break
+        return result
 
     def get_backend_status(self):
-        """Fetch the backend status information."""
-        data = self._get("Status/GetBackendStatus")
-        return data.get("BackendStatus", {})
+        """
+        Fetch the backend status information. With slave backends, the
+        master's status with the encoders of all backends.
+        """
+        if len(self.backends) == 1:
+            return self._get("Status/GetBackendStatus", parse=parse_backend_status)
+        # one backend at a time: this may already run in a worker thread
+        # (see gather), which must not wait on other workers
+        statuses = [
+            self.for_backend(address).get_backend_status() for address in self.backends
+        ]
+        return merge_backend_status([status for status in statuses if status])
 
     def get_upcoming_recordings(self, limit=None):
         params = {}
         if limit is not None:
             params["Count"] = limit
 
-        data = self._get("Dvr/GetUpcomingList", params=params)
-        return [
-            MythProgram.from_json(prog)
-            for prog in data.get("ProgramList", {}).get("Programs", [])
-        ]
+        return self._get("Dvr/GetUpcomingList", params=params, parse=parse_programs)
 
-    def get_recent_recordings(self, limit=10):
+    def get_recent_recordings(self, limit=10, start=0):
         params = {"descending": True}
         if limit is not None:
             params["Count"] = limit
+        # offset into the recorded list, for pagination
+        if start:
+            params["StartIndex"] = start
 
-        data = self._get("Dvr/GetRecordedList", params=params)
-        return [
-            MythProgram.from_json(prog)
-            for prog in data.get("ProgramList", {}).get("Programs", [])
-        ]
+        return self._get("Dvr/GetRecordedList", params=params, parse=parse_programs)
+
+    def iter_recordings(
+        self, limit=None, start=0, descending=True, build=MythProgram.from_json
+    ):
+        """
+        Stream recorded programs, yielding :class:`MythProgram` objects (or
+        the API data, with ``build=None``) as the response is received and
+        parsed instead of loading the whole recorded list into memory.
+        Results are not cached.
+        """
+        params = {"descending": descending}
+        if limit is not None:
+            params["Count"] = limit
+        if start:
+            params["StartIndex"] = start
+        return self._stream_programs("Dvr/GetRecordedList", params=params, build=build)
 
     def search_guide(self, query, filter="Keyword", channel_id=None, days=20):
         """Searches guide data for a specific keyword."""
-        start_time = timezone.now()
+        # round the start time down, so repeated searches share a cache key
+        now = timezone.now()
+        start_time = now - timedelta(
+            minutes=now.minute % GUIDE_SEARCH_ROUNDING,
+            seconds=now.second,
+            microseconds=now.microsecond,
+        )
         end_time = start_time + timedelta(days=days)
 
         params = {
@@ -85,44 +1132,112 @@ class MythTVService:
                 raise ValueError(f"Invalid guide search filter: {filter}")
         if channel_id is not None:
             params["ChanId"] = channel_id
-        data = self._get("Guide/GetProgramList", params=params)
-        raw_programs = data.get("ProgramList", {}).get("Programs", [])
+        return self._get("Guide/GetProgramList", params=params, parse=parse_programs)
+
+    def iter_guide_listings(self, start_time, end_time):
+        """
+        Stream all guide listings for programs in a time range, as returned
+        by the API (dicts, not :class:`MythProgram`), with details and
+        recording status. Used to mirror guide data locally.
+        """
+        params = {
+            "StartTime": start_time.isoformat(),
+            "EndTime": end_time.isoformat(),
+            "Details": "true",
+        }
+        return self._stream_programs("Guide/GetProgramList", params=params, build=None)
+
+    def get_guide_index(self, block_start):
+        """
+        Guide listings of all channels for the block of
+        ``MYTHTV_GUIDE_GRID_BLOCK_HOURS`` from ``block_start``, as a
+        :class:`GuideIndex`. The listings are cached like other responses,
+        and indexed once per process for each version of them, so while
+        they are cached this is a lookup rather than a backend request.
+        Blocks are kept across schedule changes; the guide grid takes
+        recording status from the upcoming recordings list instead.
+        """
+        params = guide_block_params(block_start)
+        cache_key = response_cache_key(
+            self.base_url, "Guide/GetProgramList", params, parse_programs, 0
+        )
+        index, stale = self._indexed_guide(cache_key, cache.get(cache_key))
+        if stale:
+            self._revalidate(
+                cache_key, stale, "Guide/GetProgramList", params, parse_programs
+            )
+        if index is None:
+            programs = self._get(
+                "Guide/GetProgramList", params=params, parse=parse_programs, static=True
+            )
+            index = self._index_guide(cache_key, programs)
+        return index
+
+    def _indexed_guide(self, cache_key, entry):
+        """
+        Index built before for a cached guide block, or None; and the cache
+        timeout to refresh the block with if it has expired (see
+        :meth:`_get`), else None. Cached listings are not decoded.
+        """
+        if entry is None:
+            return None, None
+        index = _guide_indexes.get((cache_key, entry.version))
+        if index is None:
+            return None, None
+        if entry.fresh_until - time.time() > self.refresh_ahead:
+            result, ttl = "hit", None
+        elif not self.refresh_ahead:
+            # stale; serve it while it is refreshed
+            result, ttl = "stale", settings.MYTHTV_CACHE_TTLS["Guide/GetProgramList"]
+        else:
+            return None, None
+        count_cache_lookup("Guide/GetProgramList", result)
+        self.response_versions[cache_key] = entry.version
+        return index, ttl
+
+    def _index_guide(self, cache_key, programs):
+        """Index guide listings, keeping the index if they were cached."""
+        index = GuideIndex(programs)
+        version = self.response_versions.get(cache_key)
+        if version:
+            with _guide_index_lock:
+                _guide_indexes[cache_key, version] = index
+                while len(_guide_indexes) > GUIDE_INDEX_LIMIT:
+                    del _guide_indexes[next(iter(_guide_indexes))]
+        return index
 
-        return [MythProgram.from_json(p) for p in raw_programs]
+    def prefetch_guide_index(self, block_start):
+        """
+        Load and index a guide block in a worker thread, so moving the guide
+        grid to it doesn't wait for the backend.
+        """
+        get_executor().submit(self.get_guide_index, block_start)
 
     def get_program_details(self, chan_id, start_time):
         """Fetches specific details for a single program."""
         params = {"ChanId": chan_id, "StartTime": start_time}
-        data = self._get("Guide/GetProgramDetails", params=params)
-        program_data = data.get("Program", {})
-        return MythProgram.from_json(program_data) if program_data else None
+        return self._get("Guide/GetProgramDetails", params=params, parse=parse_program)
 
     def get_recording_details(self, recorded_id):
         """Fetch details for a recorded program."""
-        data = self._get("Dvr/GetRecorded", params={"RecordedId": recorded_id})
-        program_data = data.get("Program", {})
-        return MythProgram.from_json(program_data) if program_data else None
+        return self._get(
+            "Dvr/GetRecorded", params={"RecordedId": recorded_id}, parse=parse_program
+        )
 
     def get_record_id(self, chan_id, start_time):
         """Get the recording rule for this showing and returns the ID."""
         params = {"ChanId": chan_id, "StartTime": start_time}
         # This endpoint checks for a rule covering this specific time/channel
-        data = self._get("Dvr/GetRecordSchedule", params=params)
-
-        # MythTV returns 'RecRule' if found
-        rule = data.get("RecRule", {})
-        return rule.get("Id") if rule else None
+        return self._get("Dvr/GetRecordSchedule", params=params, parse=parse_rule_id)
 
     def remove_record_schedule(self, record_id: int) -> bool:
         """Remove a scheduled recording rule by RecordId."""
         params = {"RecordId": record_id}
         api_endpoint = "Dvr/RemoveRecordSchedule"
-        try:
-            # post the request
-            response = self._post(api_endpoint, params=params)
-            return response["bool"]
-        except Exception:
-            return False
+        # post the request; any error is reported as failure
+        return self._post(
+            api_endpoint, params=params, parse=lambda data: data.get("bool", False)
+        )
 
     def update_record_schedule(
         self, chan_id, start_time, record_type="one", record_id: int = None
@@ -134,42 +1249,20 @@ class MythTVService:
         # If record id is valid, that will be used. Otherwise, channel id and
         # start time are used to get a recording rule (existing or new), which can then
         # be added or updated.
-
-        rule_params = {
-            "ChanId": chan_id,
-            "StartTime": start_time,
-            "RecordId": record_id,
-        }
-        response = self._get("Dvr/GetRecordSchedule", params=rule_params)
-        recording_rule = response["RecRule"]
-        # # If ID is 0, this is a new rule, so we Add. Otherwise Update.
-        if recording_rule.get("Id") == 0:
-            action = "Add"
-        else:
-            action = "Update"
-        endpoint = f"Dvr/{action}RecordSchedule"
-
-        # update recording rule
-        if record_type == "one":
-            rec_type = "Record One"
-        elif record_type == "single":
-            rec_type = "Single Record"
-        elif record_type == "all":
-            rec_type = "Record All"
-        else:
-            raise ValueError(f"Unsupported recording type `{record_type}`")
-
-        if recording_rule["Type"] == rec_type:
-            print("recording type is already as desired")
+        response = self._get(
+            "Dvr/GetRecordSchedule",
+            params=record_rule_params(chan_id, start_time, record_id),
+        )
+        if not response.get("RecRule"):
+            # the request failed
+            return None
+        update = prepare_record_rule(response["RecRule"], record_type)
+        if update is None:
             return
-
-        recording_rule["Type"] = rec_type
-        # set station from channel call sign
-        recording_rule["Station"] = recording_rule["CallSign"]
+        endpoint, recording_rule = update
         # POST the updated recording rule to the add/update api endpoint
-        result = self._post(endpoint, data=recording_rule)
         # returns an id for the added recording rule
-        return result["uint"]
+        return self._post(endpoint, data=recording_rule, parse=itemgetter("uint"))
 
     def delete_recording(self, recorded_id, record_again=False, force=False):
         # delete recording by recording id
@@ -181,36 +1274,351 @@ class MythTVService:
         # delete but allow rerecord
         if record_again:
             data["AllowRerecord"] = True
-        result = self._post(endpoint, data=data)
-        return result["bool"]
+        return self._post(endpoint, data=data, parse=itemgetter("bool"))
 
     def undelete_recording(self, recorded_id):
         # undelete recording by recording id
         endpoint = "Dvr/UnDeleteRecording"
-        result = self._post(endpoint, data={"RecordedId": recorded_id})
-        return result["bool"]
+        return self._post(
+            endpoint, data={"RecordedId": recorded_id}, parse=itemgetter("bool")
+        )
 
     def stop_recording(self, recorded_id):
         # stop recording by recording id (currently being recorded)
         endpoint = "Dvr/StopRecording"
-        result = self._post(endpoint, data={"RecordedId": recorded_id})
-        return result["bool"]
+        return self._post(
+            endpoint, data={"RecordedId": recorded_id}, parse=itemgetter("bool")
+        )
 
     def get_channels(self, source_id=1):
-        cache_key = "mythtv_channel_list"
-        channels = cache.get(cache_key)
+        # returns a list of channel information
+        return self._get(
+            "Channel/GetChannelInfoList",
+            params=channel_list_params(source_id),
+            parse=parse_channels,
+        )
+
+    def channels_version(self, source_id=1, stale=False):
+        """
+        Digest of the cached channel list, read without decoding the list,
+        which changes whenever a refresh returns different channels. None if
+        the list is not cached, or is due for a refresh unless ``stale``.
+        """
+        cache_key = response_cache_key(
+            self.base_url,
+            "Channel/GetChannelInfoList",
+            channel_list_params(source_id),
+            parse_channels,
+            0,
+        )
+        entry = cache.get(cache_key)
+        if entry is None or (not stale and entry.fresh_until <= time.time()):
+            return None
+        return entry.digest or None
+
+
+class AsyncMythTVService(MythTVService):
+    """
+    Asyncio version of :class:`MythTVService` for use in async views.
+
+    Provides the same methods as coroutines; while waiting on the backend
+    only the calling coroutine is suspended, so a slow backend does not tie
+    up worker threads when running under ASGI.
+    """
 
-        if channels is None:
-            params = {"SourceID": source_id, "OnlyVisible": True, "Details": False}
-            api_endpoint = "Channel/GetChannelInfoList"
+    async def _get(self, endpoint, params=None, parse=None, static=False):
+        """Internal helper for GET requests with error handling and caching."""
+        ttl = settings.MYTHTV_CACHE_TTLS.get(endpoint)
+        entry = None
+        if ttl:
+            generation = (
+                0
+                if static or endpoint in STATIC_ENDPOINTS
+                else await cache.aget(CACHE_GENERATION_KEY, 0)
+            )
+            cache_key = response_cache_key(
+                self.base_url, endpoint, params, parse, generation
+            )
+            entry = await cache.aget(cache_key)
+            if entry is not None:
+                if entry.fresh_until - time.time() > self.refresh_ahead:
+                    count_cache_lookup(endpoint, "hit")
+                    return self._cached_result(cache_key, entry)
+                if not self.refresh_ahead:
+                    count_cache_lookup(endpoint, "stale")
+                    await self._revalidate(cache_key, ttl, endpoint, params, parse)
+                    return self._cached_result(cache_key, entry)
+            count_cache_lookup(endpoint, "miss")
+        else:
+            cache_key = response_cache_key(
+                self.base_url, endpoint, params, parse, "uncached"
+            )
+
+        result, ok, loaded = await _async_flights.run(
+            (self.base_url, cache_key),
+            partial(self._load, endpoint, params, parse, cache_key, ttl),
+        )
+        if not ok and entry is not None:
+            return self._cached_result(cache_key, entry)
+        self.response_versions[cache_key] = loaded and loaded.version
+        return result
+
+    async def _load(self, endpoint, params, parse, cache_key, ttl=None):
+        lock_key = None
+        if ttl and settings.MYTHTV_SHARED_SINGLE_FLIGHT:
+            lock_key = f"{cache_key}:flight"
+            timeout = sum(get_timeout(endpoint))
+            if not await cache.aadd(lock_key, True, timeout):
+                entry = await wait_for_cached_async(cache_key, lock_key, timeout)
+                if entry is not None:
+                    count_cache_lookup(endpoint, "shared")
+                    return entry.result, True, entry
+                lock_key = None
+        try:
+            result, ok, digest = await self._fetch(endpoint, params, parse)
+            if ok and ttl:
+                entry = await cache_response_async(cache_key, result, ttl, digest)
+                return result, ok, entry
+            return result, ok, None
+        finally:
+            if lock_key:
+                await cache.adelete(lock_key)
+
+    async def _fetch(self, endpoint, params=None, parse=None):
+        for base_url in self.read_backends(endpoint):
+            breaker = get_breaker(base_url)
+            if not breaker.allow_request():
+                continue
             try:
-                response = self._get(api_endpoint, params=params)
-                # returns a list of channel information
-                channels = response.get("ChannelInfoList", {}).get("ChannelInfos", [])
-                # Store in cache for 86400 seconds (24 hours)
-                cache.set(cache_key, channels, 86400)
-            except Exception as err:
-                print(err)
-                return []
+                with metrics.timed(
+                    "mythtv_request_seconds", "mythtv", endpoint=endpoint
+                ):
+                    response = await get_async_client().get(
+                        f"{base_url}/{endpoint}",
+                        params=drop_empty(params),
+                        headers=self.headers,
+                        timeout=get_async_timeout(endpoint),
+                    )
+                    response.raise_for_status()
+                with metrics.timed("mythtv_parse_seconds", "parse", endpoint=endpoint):
+                    data = response.json()
+                    result = parse(data) if parse else data
+            except (httpx.HTTPError, ValueError) as e:
+                # ValueError: the response is not JSON
+                print(f"MythTV API Error ({endpoint}): {e}")
+                metrics.increment("mythtv_request_errors_total", endpoint=endpoint)
+                breaker.record(e)
+                if is_backend_failure(e):
+                    continue
+                break
+            breaker.record()
+            metrics.record_response(
+                endpoint, len(response.content), metrics.count_items(result)
+            )
+            return result, True, content_digest(response.content)
+        return (parse({}) if parse else {}), False, ""
+
+    async def _revalidate(self, cache_key, ttl, endpoint, params=None, parse=None):
+        if self.backends_down(endpoint):
+            return
+        lock_key = f"{cache_key}:refresh"
+        if not await cache.aadd(lock_key, True, sum(get_timeout(endpoint))):
+            return
 
-        return channels
+        async def refresh():
+            try:
+                result, ok, digest = await self._fetch(endpoint, params, parse)
+                if ok:
+                    await cache_response_async(cache_key, result, ttl, digest)
+            finally:
+                await cache.adelete(lock_key)
+
+        # keep a reference until done, so the task is not garbage collected
+        task = asyncio.create_task(refresh())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _post(self, endpoint, params=None, data=None, parse=None):
+        """Internal helper for POST requests with error handling."""
+        if not self.breaker.allow_request():
+            print(f"MythTV API Error ({endpoint}): backend unavailable")
+            return None
+        url = f"{self.base_url}/{endpoint}"
+        try:
+            with metrics.timed("mythtv_request_seconds", "mythtv", endpoint=endpoint):
+                response = await get_async_client().post(
+                    url,
+                    data=drop_empty(data),
+                    params=drop_empty(params),
+                    headers=self.headers,
+                    timeout=get_async_timeout(endpoint),
+                )
+                response.raise_for_status()
+            result = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError: the response is not JSON
+            print(f"MythTV API Error ({endpoint}): {e}")
+            metrics.increment("mythtv_request_errors_total", endpoint=endpoint)
+            self.breaker.record(e)
+            return None
+        self.breaker.record()
+        await self.invalidate_cache()
+        return parse(result) if parse else result
+
+    async def _stream_programs(
+        self, endpoint, params=None, build=MythProgram.from_json
+    ):
+        """Internal helper to stream a ProgramList response as programs;
+        ``build=None`` yields the program data as returned by the API."""
+        base_url = self.available_backend(endpoint)
+        if base_url is None:
+            raise BackendUnavailable(f"MythTV backends for {endpoint} are down")
+        breaker = get_breaker(base_url)
+        url = f"{base_url}/{endpoint}"
+        parser = ProgramListParser()
+        count = 0
+        started = time.perf_counter()
+        try:
+            async with get_async_client().stream(
+                "GET",
+                url,
+                params=drop_empty(params),
+                headers=self.headers,
+                timeout=get_async_timeout(endpoint),
+            ) as response:
+                response.raise_for_status()
+                metrics.record_time(
+                    "mythtv_request_seconds",
+                    time.perf_counter() - started,
+                    "mythtv",
+                    endpoint=endpoint,
+                )
+                async for text in response.aiter_text(STREAM_CHUNK_SIZE):
+                    for program in parser.feed(text):
+                        count += 1
+                        yield build(program) if build else program
+        except httpx.HTTPError as e:
+            metrics.increment("mythtv_request_errors_total", endpoint=endpoint)
+            breaker.record(e)
+            raise
+        breaker.record()
+        metrics.record_response(endpoint, response.num_bytes_downloaded, count)
+        parser.close()
+
+    async def invalidate_cache(self):
+        await cache.aadd(CACHE_GENERATION_KEY, 0, None)
+        await cache.aincr(CACHE_GENERATION_KEY)
+
+    async def gather(self, **calls):
+        """
+        Async version of :meth:`MythTVService.gather`; each keyword argument
+        maps a name to a zero-argument callable returning an awaitable.
+        """
+        names = list(calls)
+
+        # errors raised before returning an awaitable are results too
+        async def call(func):
+            return await func()
+
+        values = await asyncio.gather(
+            *(call(func) for func in calls.values()), return_exceptions=True
+        )
+        return {
+            name: (
+                CallResult(error=value)
+                if isinstance(value, Exception)
+                else CallResult(value=value)
+            )
+            for name, value in zip(names, values)
+        }
+
+    async def map_concurrent(self, func, items, limit=None):
+        """
+        Async version of :meth:`MythTVService.map_concurrent`; ``func``
+        returns an awaitable.
+        """
+        semaphore = asyncio.Semaphore(limit or settings.MYTHTV_BULK_CONCURRENCY)
+
+        async def call(item):
+            async with semaphore:
+                return await func(item)
+
+        values = await asyncio.gather(
+            *(call(item) for item in items), return_exceptions=True
+        )
+        return [
+            (
+                CallResult(error=value)
+                if isinstance(value, Exception)
+                else CallResult(value=value)
+            )
+            for value in values
+        ]
+
+    async def wait_for(self, fetch, converged, timeout=None):
+        """Async version of :meth:`MythTVService.wait_for`; ``fetch``
+        returns an awaitable."""
+        deadline = time.monotonic() + (timeout or settings.MYTHTV_CONVERGE_TIMEOUT)
+        for delay in poll_delays(deadline):
+            if delay:
+                await asyncio.sleep(delay)
+            result = await fetch()
+            if converged(result):
+                break
+        return result
+
+    async def get_backend_status(self):
+        if len(self.backends) == 1:
+            return await self._get(
+                "Status/GetBackendStatus", parse=parse_backend_status
+            )
+        results = await self.map_concurrent(
+            lambda address: self.for_backend(address).get_backend_status(),
+            self.backends,
+            limit=len(self.backends),
+        )
+        return merge_backend_status(
+            [result.value for result in results if result.ok and result.value]
+        )
+
+    async def get_guide_index(self, block_start):
+        params = guide_block_params(block_start)
+        cache_key = response_cache_key(
+            self.base_url, "Guide/GetProgramList", params, parse_programs, 0
+        )
+        index, stale = self._indexed_guide(cache_key, await cache.aget(cache_key))
+        if stale:
+            await self._revalidate(
+                cache_key, stale, "Guide/GetProgramList", params, parse_programs
+            )
+        if index is None:
+            programs = await self._get(
+                "Guide/GetProgramList", params=params, parse=parse_programs, static=True
+            )
+            index = self._index_guide(cache_key, programs)
+        return index
+
+    def prefetch_guide_index(self, block_start):
+        # keep a reference until done, so the task is not garbage collected
+        task = asyncio.create_task(self.get_guide_index(block_start))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def update_record_schedule(
+        self, chan_id, start_time, record_type="one", record_id: int = None
+    ):
+        """
+        Add or update a recording schedule.
+        """
+        response = await self._get(
+            "Dvr/GetRecordSchedule",
+            params=record_rule_params(chan_id, start_time, record_id),
+        )
+        if not response.get("RecRule"):
+            # the request failed
+            return None
+        update = prepare_record_rule(response["RecRule"], record_type)
+        if update is None:
+            return
+        endpoint, recording_rule = update
+        return await self._post(endpoint, data=recording_rule, parse=itemgetter("uint"))
@@ -0,0 +1,172 @@
+"""
+Guide grid: programs by channel and time, like the MythWeb listings page.
+
+Guide listings of all channels are loaded from the backend in blocks of
+``MYTHTV_GUIDE_GRID_BLOCK_HOURS`` and indexed in memory by channel and time
+(see :meth:`MythTVService.get_guide_index`), so any window of the grid is a
+lookup in one or two indexes instead of a request for each channel. The
+blocks of the windows before and after are loaded in the background.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from nu_mythweb.recordings.api_models import MythProgram
+from nu_mythweb.recordings.guide_mirror import upcoming_index
+
+# the grid starts at the start of a slot, and has a time heading per slot
+GRID_SLOT = timedelta(minutes=30)
+# programs are placed in columns of this length
+GRID_COLUMN = timedelta(minutes=5)
+# longest time shown at once, in hours
+GRID_MAX_HOURS = 12
+# farthest from now the grid can start
+GRID_RANGE = timedelta(days=30)
+
+
+@dataclass(slots=True)
+class GridCell:
+    """A program in the grid, or a gap between programs (no program)."""
+
+    program: MythProgram
+    # width in columns
+    span: int
+    # the program started before, or ends after, the time shown
+    continued: bool = False
+    continues: bool = False
+
+
+def grid_start(value=None):
+    """
+    Start of the grid: the slot that includes ``value``, a date and time in
+    ISO format (in the current time zone, unless it has an offset); or the
+    current slot. Times more than ``GRID_RANGE`` from now are clamped.
+    """
+    now = timezone.now()
+    start = now
+    if value:
+        try:
+            start = datetime.fromisoformat(value)
+            if timezone.is_naive(start):
+                start = timezone.make_aware(start)
+        except (ValueError, OverflowError):
+            # not a date and time, or too far out to convert
+            start = now
+    start = min(max(start, now - GRID_RANGE), now + GRID_RANGE)
+    slot = GRID_SLOT.total_seconds()
+    return datetime.fromtimestamp(start.timestamp() // slot * slot, UTC)
+
+
+def grid_hours(value=None):
+    """Number of hours shown, from a request parameter."""
+    try:
+        hours = int(value)
+    except (TypeError, ValueError):
+        hours = settings.MYTHTV_GUIDE_GRID_HOURS
+    return min(max(hours, 1), GRID_MAX_HOURS)
+
+
+def block_start(time):
+    """Start of the guide block that includes the given time."""
+    hours = settings.MYTHTV_GUIDE_GRID_BLOCK_HOURS
+    time = time.astimezone(UTC)
+    return time.replace(
+        hour=time.hour - time.hour % hours, minute=0, second=0, microsecond=0
+    )
+
+
+def window_blocks(start, end):
+    """Start times of the guide blocks with programs from ``start`` to ``end``."""
+    block = block_start(start)
+    blocks = []
+    while block < end:
+        blocks.append(block)
+        block += timedelta(hours=settings.MYTHTV_GUIDE_GRID_BLOCK_HOURS)
+    return blocks
+
+
+def adjacent_blocks(start, end):
+    """Guide blocks of the windows of the same length before and after."""
+    length = end - start
+    shown = window_blocks(start, end)
+    return [
+        block
+        for block in window_blocks(start - length, start)
+        + window_blocks(end, end + length)
+        if block not in shown
+    ]
+
+
+def grid_slots(start, end):
+    """Start times of the slots from ``start`` to ``end``, for headings."""
+    slots = []
+    while start < end:
+        slots.append(start)
+        start += GRID_SLOT
+    return slots
+
+
+def grid_rows(indexes, channels, start, end, upcoming=()):
+    """
+    Rows of the grid from ``start`` to ``end``, as ``(channel, cells)`` for
+    each channel, from the :class:`GuideIndex` of each block shown (in time
+    order). Programs are replaced by their entry in the upcoming recordings
+    list when scheduled, for current recording status.
+    """
+    scheduled = upcoming_index(upcoming)
+    window_start, window_end = start.timestamp(), end.timestamp()
+    column = GRID_COLUMN.total_seconds()
+    columns = round((window_end - window_start) / column)
+    rows = []
+    for channel in channels:
+        chan_id = channel["ChanId"]
+        cells = []
+        position = 0
+        for index in indexes:
+            for program in index.overlapping(chan_id, window_start, window_end):
+                first = round((program.start_time.timestamp() - window_start) / column)
+                last = round((program.end_time.timestamp() - window_start) / column)
+                # programs in more than one block are only placed once, and
+                # programs too short for a column not at all
+                first, last = max(first, position), min(last, columns)
+                if last <= first:
+                    continue
+                if first > position:
+                    cells.append(GridCell(None, first - position))
+                cells.append(
+                    GridCell(
+                        with_status(
+                            program, scheduled.get((chan_id, program.raw_start_time))
+                        ),
+                        last - first,
+                        continued=program.start_time < start,
+                        continues=program.end_time > end,
+                    )
+                )
+                position = last
+        if position < columns:
+            cells.append(GridCell(None, columns - position))
+        rows.append((channel, cells))
+    return rows
+
+
+def with_status(program, upcoming):
+    """
+    Program with recording status from its upcoming recordings entry, if
+    scheduled; guide blocks stay cached across schedule changes, so their
+    status may be old.
+    """
+    if upcoming is not None:
+        return upcoming
+    if program.status_display == "Will Record":
+        # was scheduled when loaded, but has since been cancelled
+        return replace(
+            program,
+            recording=None,
+            status_display="Not Recording",
+            status_code_class="not-recording",
+        )
+    return program
@@ -0,0 +1,146 @@
+"""
+Full text search of mirrored guide listings and recordings.
+
+Uses SQLite FTS5 tables (created by migration 0002 when the database is
+SQLite) with a row for each :class:`GuideProgram` and
+:class:`RecordedProgram`, keyed by the program's primary key. Rows are
+added by :func:`index_programs` when programs are synced, and removed by
+triggers when programs are deleted. Matches are ranked by bm25, with
+column weights set in the migration so that matches in the title rank
+highest, and every search word is treated as a prefix ("star tre" matches
+"Star Trek").
+"""
+
+import re
+
+from django.core.exceptions import FullResultSet
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# indexed columns, in table order
+SEARCH_COLUMNS = ("title", "subtitle", "description", "category", "people")
+# columns returned with matches marked, for display
+HIGHLIGHT_COLUMNS = ("title", "subtitle", "description")
+# markers used by the FTS highlight function; replaced after escaping
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+def fts_table(model):
+    """Name of the full text search table for a model."""
+    return f"{model._meta.db_table}_fts"
+
+
+def is_available():
+    """Check if full text search is supported by the database."""
+    return connection.vendor == "sqlite"
+
+
+def match_query(text, column=None):
+    """
+    FTS5 query for user search text, matching programs that contain every
+    word (as a prefix), optionally in a single column. Returns None when
+    the text has nothing to search for.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    query = " ".join(f'"{word}"*' for word in words)
+    return f"{column} : ({query})" if column else query
+
+
+def index_programs(model, programs):
+    """
+    Add programs to the search index, given pairs of primary key and
+    program data as returned by the MythTV API.
+    """
+    if not is_available():
+        return
+    rows = [
+        (
+            pk,
+            data.get("Title", ""),
+            data.get("SubTitle", ""),
+            data.get("Description", ""),
+            data.get("Category", ""),
+            " ".join(
+                member["Name"]
+                for member in (data.get("Cast") or {}).get("CastMembers", [])
+            ),
+        )
+        for pk, data in programs
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {fts_table(model)} (rowid, {', '.join(SEARCH_COLUMNS)})"
+            " VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def search(queryset, text, column=None, limit=None, offset=0):
+    """
+    Search programs in a queryset (of a model with a search index) for
+    text, optionally in one of :data:`SEARCH_COLUMNS`. Returns a list of
+    ``(pk, highlights)`` for the best matches first, skipping the first
+    ``offset`` and up to ``limit`` of them, where ``highlights`` is
+    a dict of safe HTML for :data:`HIGHLIGHT_COLUMNS` with matched words in
+    ``<mark>`` tags. Only filters on the queryset's own table are applied.
+    """
+    query = match_query(text, column)
+    if query is None:
+        return []
+    model = queryset.model
+    table = model._meta.db_table
+    fts = fts_table(model)
+
+    sql = [
+        "SELECT {fts}.rowid, {highlights} FROM {fts}".format(
+            fts=fts,
+            highlights=", ".join(
+                f"highlight({fts}, {SEARCH_COLUMNS.index(name)}, %s, %s)"
+                for name in HIGHLIGHT_COLUMNS
+            ),
+        )
+    ]
+    params = [HIGHLIGHT_START, HIGHLIGHT_END] * len(HIGHLIGHT_COLUMNS)
+    try:
+        where, where_params = queryset.query.get_compiler(
+            connection=connection
+        ).compile(queryset.query.where)
+    except FullResultSet:
+        # no filters
+        where, where_params = "", []
+    if where:
+        # filters reference the model table by name; CROSS JOIN makes SQLite
+        # find matches with the index first, then filter them
+        sql.append(
+            f"CROSS JOIN {table} ON {table}.{model._meta.pk.column} = {fts}.rowid"
+        )
+    sql.append(f"WHERE {fts} MATCH %s")
+    params.append(query)
+    if where:
+        sql.append(f"AND {where}")
+        params.extend(where_params)
+    # rank uses the bm25 weights configured for the table
+    sql.append("ORDER BY rank")
+    if limit or offset:
+        sql.append("LIMIT %s OFFSET %s")
+        params.extend([limit or -1, offset])
+
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        return [
+            (pk, dict(zip(HIGHLIGHT_COLUMNS, map(highlight_html, highlights))))
+            for pk, *highlights in cursor.fetchall()
+        ]
+
+
+def highlight_html(text):
+    """Escape highlighted text from the index and mark up matches."""
+    return mark_safe(
+        escape(text or "")
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
@@ -1,7 +1,16 @@
+import hashlib
+
 from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.safestring import mark_safe
+
+from nu_mythweb.recordings import metrics
 
 register = template.Library()
 
+PROGRAM_ROW_TEMPLATE = "recordings/partials/program_row.html"
+
 
 @register.filter
 def get_item(dictionary, key):
@@ -9,3 +18,62 @@ def get_item(dictionary, key):
     if key.isnumeric():
         return dictionary.get(int(key))
     return dictionary.get(str(key))
+
+
+def program_row_key(prog, bulk_actions):
+    """
+    Fragment cache key for a program's table row: the program's recording
+    state, and a digest of everything else shown in the row. A program
+    whose status changes (e.g. by scheduling or deleting it) gets a new key.
+    """
+    channel = prog.channel or {}
+    recording = prog.recording or {}
+    state = (
+        prog.status_display,
+        recording.get("RecGroup"),
+        recording.get("RecordId"),
+        bool(bulk_actions),
+        prog,
+    )
+    digest = hashlib.md5(repr(state).encode()).hexdigest()
+    return f"mythtv:row:{channel.get('ChanId')}:{prog.raw_start_time}:{digest}"
+
+
+@register.simple_tag(takes_context=True)
+def program_rows(context, programs):
+    """
+    Render table rows for ``programs``, reusing rows rendered before for
+    programs in the same state from the fragments cache, so large tables
+    are mostly assembled from cached HTML. Search results, with matches
+    highlighted, are always rendered.
+    """
+    row_template = context.template.engine.get_template(PROGRAM_ROW_TEMPLATE)
+    bulk_actions = context.get("bulk_actions")
+    timeout = settings.MYTHTV_ROW_CACHE_TIMEOUT
+    keys = [
+        program_row_key(prog, bulk_actions) if timeout and not prog.highlights else None
+        for prog in programs
+    ]
+    fragments = caches["fragments"]
+    cached = fragments.get_many([key for key in keys if key]) if timeout else {}
+    rendered = {}
+    rows = []
+    for prog, key in zip(programs, keys):
+        row = cached.get(key)
+        if row is None:
+            row = row_template.render(
+                context.new({"prog": prog, "bulk_actions": bulk_actions})
+            )
+            if key:
+                rendered[key] = row
+        rows.append(row)
+    if rendered:
+        fragments.set_many(rendered, timeout)
+    if timeout:
+        metrics.increment(
+            "mythtv_cache_requests_total", len(cached), cache="rows", result="hit"
+        )
+        metrics.increment(
+            "mythtv_cache_requests_total", len(rendered), cache="rows", result="miss"
+        )
+    return mark_safe("".join(rows))
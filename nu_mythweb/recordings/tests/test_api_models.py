@@ -0,0 +1,95 @@
+from datetime import UTC, datetime
+
+from django.test import SimpleTestCase
+
+from nu_mythweb.recordings.api_models import GuideIndex, MythProgram, shared_channel
+
+
+def timestamp(hour, minute=0):
+    return datetime(2026, 1, 1, hour, minute, tzinfo=UTC).timestamp()
+
+
+def program(chan_id, title, start, end):
+    """Program from ``start`` to ``end``, as (hour, minute) pairs."""
+    return MythProgram(
+        title=title,
+        raw_start_time=datetime(2026, 1, 1, *start, tzinfo=UTC).isoformat(),
+        raw_end_time=datetime(2026, 1, 1, *end, tzinfo=UTC).isoformat(),
+        channel=shared_channel(chan_id, str(chan_id), "", ""),
+    )
+
+
+class GuideIndexTests(SimpleTestCase):
+    def setUp(self):
+        # given out of order, as programs from several guide requests
+        self.index = GuideIndex(
+            [
+                program(1001, "Late", (21, 0), (22, 0)),
+                program(1001, "Evening", (19, 0), (20, 0)),
+                program(1001, "Prime", (20, 0), (21, 0)),
+                program(1002, "Movie", (18, 0), (21, 30)),
+                program(1002, "Short", (19, 0), (19, 30)),
+                program(1002, "After", (21, 30), (23, 0)),
+                # not indexed: no channel
+                MythProgram(
+                    title="Unknown",
+                    raw_start_time="2026-01-01T19:00:00+00:00",
+                    raw_end_time="2026-01-01T20:00:00+00:00",
+                ),
+            ]
+        )
+
+    def titles(self, chan_id, start, end):
+        return [p.title for p in self.index.overlapping(chan_id, start, end)]
+
+    def test_len(self):
+        self.assertEqual(len(self.index), 6)
+
+    def test_block_inside_program(self):
+        self.assertEqual(
+            self.titles(1001, timestamp(19, 15), timestamp(19, 45)), ["Evening"]
+        )
+
+    def test_block_matching_program_edges(self):
+        # programs ending at the start of the block or starting at its end
+        # are not in it
+        self.assertEqual(self.titles(1001, timestamp(20), timestamp(21)), ["Prime"])
+
+    def test_block_spanning_programs(self):
+        self.assertEqual(
+            self.titles(1001, timestamp(19, 30), timestamp(21, 30)),
+            ["Evening", "Prime", "Late"],
+        )
+
+    def test_block_edges_one_second_inside(self):
+        self.assertEqual(
+            self.titles(1001, timestamp(20) - 1, timestamp(21) + 1),
+            ["Evening", "Prime", "Late"],
+        )
+
+    def test_block_before_and_after_listings(self):
+        self.assertEqual(self.titles(1001, timestamp(17), timestamp(19)), [])
+        self.assertEqual(self.titles(1001, timestamp(22), timestamp(23)), [])
+
+    def test_long_program_overlapping_later_programs(self):
+        # the movie started before the short program and ends after it
+        self.assertEqual(
+            self.titles(1002, timestamp(19), timestamp(19, 30)), ["Movie", "Short"]
+        )
+        self.assertEqual(self.titles(1002, timestamp(20), timestamp(21)), ["Movie"])
+        self.assertEqual(
+            self.titles(1002, timestamp(21), timestamp(22)), ["Movie", "After"]
+        )
+        self.assertEqual(self.titles(1002, timestamp(21, 30), timestamp(22)), ["After"])
+
+    def test_unknown_channel(self):
+        self.assertEqual(self.titles(1003, timestamp(19), timestamp(22)), [])
+
+
+class SharedChannelTests(SimpleTestCase):
+    def test_shared_and_read_only(self):
+        channel = shared_channel(1001, "1", "NEWS", "News Channel")
+        self.assertIs(shared_channel(1001, "1", "NEWS", "News Channel"), channel)
+        self.assertEqual(channel["CallSign"], "NEWS")
+        with self.assertRaises(TypeError):
+            channel["CallSign"] = "OTHER"
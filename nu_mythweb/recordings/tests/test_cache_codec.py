@@ -0,0 +1,144 @@
+import pickle
+
+from django.test import SimpleTestCase, override_settings
+
+from nu_mythweb.recordings import cache_codec
+from nu_mythweb.recordings.api_models import MythProgram, ProgramList
+from nu_mythweb.recordings.mythtv_service import CachedResponse
+
+CHANNEL = {
+    "ChanId": 1001,
+    "ChanNum": "1",
+    "CallSign": "NEWS",
+    "ChannelName": "News Channel",
+}
+
+
+def program(hour, **data):
+    return MythProgram.from_json(
+        {
+            "Title": "Evening News",
+            "Category": "News",
+            "StartTime": f"2026-01-01T{hour:02}:00:00Z",
+            "EndTime": f"2026-01-01T{hour:02}:30:00Z",
+            "Channel": CHANNEL,
+            **data,
+        }
+    )
+
+
+def programs():
+    return ProgramList(
+        [
+            program(18, SubTitle="", Airdate="1999-05-02"),
+            program(
+                19,
+                Title="Ñandú – café ☕",
+                SubTitle="日本語の字幕",
+                Recording={"Status": "-3", "StatusName": "Recorded"},
+                Season=2,
+                Episode=5,
+                FileSize=1234567890123,
+                Cast={
+                    "CastMembers": [
+                        {"Name": "Zoë", "TranslatedRole": "Actor"},
+                        {"Name": "Åsa", "TranslatedRole": "Actor"},
+                    ]
+                },
+            ),
+            # no channel, air date or cast
+            MythProgram(title="Test", raw_start_time="2026-01-01T21:00:00Z"),
+        ],
+        start_index=40,
+        total_available=97,
+    )
+
+
+def round_trip(result):
+    return cache_codec.decode(cache_codec.encode(result))
+
+
+class CacheCodecTests(SimpleTestCase):
+    def assertProgramsEqual(self, decoded, expected):
+        self.assertIsInstance(decoded, ProgramList)
+        self.assertEqual(list(decoded), list(expected))
+        self.assertEqual(decoded.start_index, expected.start_index)
+        self.assertEqual(decoded.total_available, expected.total_available)
+
+    def test_program_list_round_trip(self):
+        expected = programs()
+        decoded = round_trip(programs())
+        self.assertProgramsEqual(decoded, expected)
+        # None fields stay None, not empty values
+        last = decoded[-1]
+        self.assertIsNone(last.channel)
+        self.assertIsNone(last.season)
+        self.assertIsNone(last.cast)
+        self.assertIsNone(last.highlights)
+
+    def test_display_values_round_trip(self):
+        original = programs()
+        decoded = round_trip(original)
+        # formatted when encoded, and restored without formatting again
+        self.assertIsNotNone(decoded[0]._display)
+        self.assertEqual(decoded[0]._display, original[0]._display)
+        self.assertEqual(decoded[1]._display, original[1]._display)
+        self.assertEqual(decoded[1].display.cast, (("Actor", "Zoë, Åsa"),))
+        self.assertEqual(decoded[0].display.air_year, "1999")
+        # no end time: formatted when first used, if ever
+        self.assertIsNone(decoded[2]._display)
+
+    def test_programs_share_channel(self):
+        decoded = round_trip(programs())
+        self.assertEqual(decoded[0].channel, CHANNEL)
+        self.assertIs(decoded[0].channel, decoded[1].channel)
+
+    def test_empty_program_list(self):
+        self.assertProgramsEqual(round_trip(ProgramList()), ProgramList())
+
+    @override_settings(MYTHTV_CACHE_COMPRESSION=6)
+    def test_compressed_round_trip(self):
+        expected = ProgramList(
+            [program(hour % 24, Description="é" * 100) for hour in range(100)]
+        )
+        encoded = cache_codec.encode(expected)
+        self.assertEqual(encoded[1:2], cache_codec.COMPRESSED)
+        self.assertProgramsEqual(cache_codec.decode(encoded), expected)
+
+    @override_settings(MYTHTV_CACHE_COMPRESSION=0)
+    def test_uncompressed_round_trip(self):
+        expected = ProgramList([program(hour % 24) for hour in range(100)])
+        encoded = cache_codec.encode(expected)
+        self.assertEqual(encoded[1:2], cache_codec.UNCOMPRESSED)
+        self.assertProgramsEqual(cache_codec.decode(encoded), expected)
+
+    def test_json_data_round_trip(self):
+        data = {
+            "ChannelInfos": [CHANNEL, {"ChanId": 1002, "ChannelName": "Ünïcode"}],
+            "Missing": None,
+            "Count": 2,
+        }
+        self.assertEqual(round_trip(data), data)
+        self.assertEqual(round_trip([None, "ü", 1.5]), [None, "ü", 1.5])
+
+    def test_other_results_unchanged(self):
+        for result in (None, "text", 42):
+            with self.subTest(result=result):
+                self.assertIs(cache_codec.encode(result), result)
+                self.assertIs(cache_codec.decode(result), result)
+        # not marshallable
+        data = {"program": MythProgram()}
+        self.assertIs(cache_codec.encode(data), data)
+
+    def test_cached_response_pickles_encoded_result(self):
+        entry = CachedResponse(programs(), 100.0, "digest", 50.0)
+        loaded = pickle.loads(pickle.dumps(entry))
+        self.assertIsInstance(loaded.__dict__["encoded_result"], bytes)
+        # pickled again without being decoded
+        loaded = pickle.loads(pickle.dumps(loaded))
+        self.assertEqual(loaded.version, ("digest", 50.0))
+        self.assertProgramsEqual(loaded.result, programs())
+
+    def test_cached_none_result(self):
+        entry = CachedResponse(None, 100.0)
+        self.assertIsNone(pickle.loads(pickle.dumps(entry)).result)
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from nu_mythweb import context_processors
+from nu_mythweb.recordings import mythtv_service
+from nu_mythweb.recordings.mythtv_service import MythTVService
+
+
+class ImmediateExecutor:
+    """Runs submitted functions right away, for predictable refreshes."""
+
+    def submit(self, func):
+        func()
+
+
+def channels(*names):
+    return [
+        {"ChanId": 1000 + i, "CallSign": f"CH{i}", "ChannelName": name}
+        for i, name in enumerate(names)
+    ]
+
+
+@override_settings(MYTHTV_SHARED_SINGLE_FLIGHT=False)
+class ChannelIndexTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for patcher in (
+            mock.patch.dict(
+                context_processors._channel_index, {"version": None, "channels": {}}
+            ),
+            mock.patch.object(
+                mythtv_service, "get_executor", return_value=ImmediateExecutor()
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(MythTVService, "_fetch")
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def backend_returns(self, *names):
+        result = channels(*names)
+        self.fetch.return_value = (result, True, repr(result))
+
+    def expire_channel_list(self):
+        cache_key = mythtv_service.response_cache_key(
+            MythTVService().base_url,
+            "Channel/GetChannelInfoList",
+            mythtv_service.channel_list_params(1),
+            mythtv_service.parse_channels,
+            0,
+        )
+        entry = cache.get(cache_key)
+        entry.fresh_until = 0
+        cache.set(cache_key, entry)
+
+    def test_index_reused_while_list_unchanged(self):
+        self.backend_returns("News")
+        index = context_processors.get_channel_index()
+        self.assertEqual(index, {1000: "CH0 - News"})
+        self.assertIs(context_processors.get_channel_index(), index)
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_index_rebuilt_when_refresh_changes_channels(self):
+        self.backend_returns("News")
+        context_processors.get_channel_index()
+
+        self.backend_returns("News", "Sports")
+        self.expire_channel_list()
+        # the stale list is shown while it is refreshed
+        self.assertEqual(context_processors.get_channel_index(), {1000: "CH0 - News"})
+        self.assertEqual(
+            context_processors.get_channel_index(),
+            {1000: "CH0 - News", 1001: "CH1 - Sports"},
+        )
+
+    def test_unavailable_backend_not_remembered(self):
+        self.fetch.return_value = ([], False, "")
+        self.assertEqual(context_processors.get_channel_index(), {})
+        self.backend_returns("News")
+        self.assertEqual(context_processors.get_channel_index(), {1000: "CH0 - News"})
@@ -0,0 +1,324 @@
+import asyncio
+import codecs
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from nu_mythweb.recordings import mythtv_service
+from nu_mythweb.recordings.api_models import MythProgram
+from nu_mythweb.recordings.mythtv_service import (
+    AsyncSingleFlight,
+    CircuitBreaker,
+    ProgramListParser,
+    SingleFlight,
+    parse_programs,
+)
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+class ImmediateExecutor:
+    """Runs submitted functions right away, for predictable probes."""
+
+    def submit(self, func):
+        func()
+
+
+@override_settings(MYTHTV_BREAKER_FAILURES=2, MYTHTV_BREAKER_RESET=60)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("http://mythtv:6544")
+        patcher = mock.patch.object(
+            mythtv_service, "get_executor", return_value=ImmediateExecutor()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # outage and recovery messages
+        patcher = mock.patch("builtins.print")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.breaker.record(requests.ConnectionError())
+
+    def reset_elapsed(self):
+        self.breaker.retry_at = time.monotonic() - 1
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow_request())
+
+        self.fail()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertIsNotNone(self.breaker.opened_at)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_failure_count(self):
+        self.fail()
+        self.breaker.record()
+        self.fail()
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_client_errors_are_not_failures(self):
+        self.breaker.record(http_error(404))
+        self.breaker.record(http_error(404))
+        self.assertEqual(self.breaker.state, "closed")
+
+        self.breaker.record(http_error(503))
+        self.breaker.record(http_error(503))
+        self.assertEqual(self.breaker.state, "open")
+
+    def test_half_open_after_reset_and_closes_when_probe_succeeds(self):
+        self.fail(2)
+        self.reset_elapsed()
+        self.assertEqual(self.breaker.state, "half-open")
+
+        with mock.patch.object(self.breaker, "probe") as probe:
+            probe.side_effect = lambda: self.breaker.record()
+            # the request that starts the probe still fails fast
+            self.assertFalse(self.breaker.allow_request())
+        probe.assert_called_once()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertIsNone(self.breaker.opened_at)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_reopens_when_probe_fails(self):
+        self.fail(2)
+        opened_at = self.breaker.opened_at
+        self.reset_elapsed()
+
+        with mock.patch.object(self.breaker, "probe") as probe:
+            probe.side_effect = lambda: self.fail()
+            self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, "open")
+        # still the time of the outage, retried after another reset period
+        self.assertEqual(self.breaker.opened_at, opened_at)
+        self.assertGreater(self.breaker.retry_at, time.monotonic() + 30)
+
+    def test_one_probe_at_a_time(self):
+        self.fail(2)
+        self.reset_elapsed()
+        with mock.patch.object(self.breaker, "probe") as probe:
+            self.assertFalse(self.breaker.allow_request())
+            # probe has not reported back yet
+            self.assertEqual(self.breaker.state, "half-open")
+            self.assertFalse(self.breaker.allow_request())
+        probe.assert_called_once()
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"loaded": len(calls)}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flight.run, "key", load)
+            started.wait(5)
+            followers = [executor.submit(flight.run, "key", load) for _ in range(3)]
+            # followers are waiting on the leader's call
+            time.sleep(0.05)
+            release.set()
+            results = [leader.result(5)] + [f.result(5) for f in followers]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"loaded": 1}] * 4)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_exceptions_are_shared_and_not_remembered(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise ValueError("backend error")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.run, "key", fail)
+            started.wait(5)
+            follower = executor.submit(flight.run, "key", fail)
+            time.sleep(0.05)
+            release.set()
+            for future in (leader, follower):
+                with self.assertRaisesMessage(ValueError, "backend error"):
+                    future.result(5)
+
+        # a later call runs again
+        self.assertEqual(flight.run("key", lambda: "ok"), "ok")
+        self.assertEqual(flight.calls, {})
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.run("a", lambda: 1), 1)
+        self.assertEqual(flight.run("b", lambda: 2), 2)
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_result(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"loaded": len(calls)}
+
+        async def main():
+            return await asyncio.gather(*(flight.run("key", load) for _ in range(4)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_exceptions_are_shared_and_not_remembered(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("backend error")
+
+        async def ok():
+            return "ok"
+
+        async def main():
+            results = await asyncio.gather(
+                flight.run("key", fail),
+                flight.run("key", fail),
+                return_exceptions=True,
+            )
+            return results, await flight.run("key", ok)
+
+        results, later = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([type(result) for result in results], [ValueError] * 2)
+        self.assertEqual(later, "ok")
+
+    def test_cancelled_caller_does_not_cancel_the_call(self):
+        flight = AsyncSingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.02)
+            return "loaded"
+
+        async def main():
+            first = asyncio.create_task(flight.run("key", load))
+            second = asyncio.create_task(flight.run("key", load))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), "loaded")
+
+
+def guide_program(hour, **data):
+    return {
+        "StartTime": f"2026-01-01T{hour:02}:00:00Z",
+        "EndTime": f"2026-01-01T{hour:02}:30:00Z",
+        **data,
+    }
+
+
+PROGRAM_LIST = {
+    "ProgramList": {
+        "StartIndex": "20",
+        "Count": "3",
+        "TotalAvailable": "103",
+        "Programs": [
+            guide_program(18, Title="Evening News", SubTitle="", Category="News"),
+            guide_program(
+                19,
+                Title="Drama [Part 1]",
+                SubTitle='A "quoted", {braced} title',
+                Category="Drama",
+            ),
+            guide_program(20, Title="Ñandú – café", Category="Nature"),
+        ],
+    }
+}
+
+
+class ProgramListParserTests(SimpleTestCase):
+    def parse(self, text, chunk_size):
+        parser = ProgramListParser()
+        programs = []
+        for i in range(0, len(text), chunk_size):
+            programs.extend(parser.feed(text[i : i + chunk_size]))
+        return parser, programs
+
+    def test_programs_split_at_any_point(self):
+        text = json.dumps(PROGRAM_LIST, ensure_ascii=False, indent=1)
+        expected = PROGRAM_LIST["ProgramList"]["Programs"]
+        for chunk_size in (1, 2, 3, 7, 64, len(text)):
+            with self.subTest(chunk_size=chunk_size):
+                parser, programs = self.parse(text, chunk_size)
+                self.assertEqual(programs, expected)
+                self.assertEqual(parser.start_index, 20)
+                self.assertEqual(parser.total_available, 103)
+                parser.close()
+
+    def test_bytes_split_inside_characters(self):
+        # as streamed by MythTVService._stream_programs
+        data = json.dumps(PROGRAM_LIST, ensure_ascii=False).encode()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        parser = ProgramListParser()
+        programs = []
+        for i in range(len(data)):
+            programs.extend(parser.feed(decoder.decode(data[i : i + 1])))
+        self.assertEqual(programs, PROGRAM_LIST["ProgramList"]["Programs"])
+        parser.close()
+
+    def test_programs_returned_as_received(self):
+        text = json.dumps(PROGRAM_LIST)
+        second = text.index('{"StartTime": "2026-01-01T19')
+        parser = ProgramListParser()
+        self.assertEqual(len(parser.feed(text[:second])), 1)
+        self.assertEqual(len(parser.feed(text[second:])), 2)
+
+    def test_empty_list(self):
+        parser, programs = self.parse(
+            json.dumps({"ProgramList": {"TotalAvailable": "0", "Programs": []}}), 5
+        )
+        self.assertEqual(programs, [])
+        self.assertEqual(parser.total_available, 0)
+        parser.close()
+
+    def test_truncated_response(self):
+        text = json.dumps(PROGRAM_LIST)
+        for end in (10, text.index("Programs") + 5, text.index("Drama"), len(text) - 3):
+            with self.subTest(end=end):
+                parser, programs = self.parse(text[:end], 4)
+                # only complete programs, and the list is not complete
+                expected = PROGRAM_LIST["ProgramList"]["Programs"]
+                self.assertEqual(programs, expected[: len(programs)])
+                with self.assertRaises(ValueError):
+                    parser.close()
+
+    def test_matches_parse_programs(self):
+        text = json.dumps(PROGRAM_LIST)
+        _, programs = self.parse(text, 5)
+        parsed = parse_programs(json.loads(text))
+        self.assertEqual([MythProgram.from_json(p) for p in programs], list(parsed))
+        self.assertEqual(parsed.start_index, 20)
+        self.assertEqual(parsed.total_available, 103)
@@ -0,0 +1,88 @@
+from datetime import UTC, datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase
+
+from nu_mythweb.recordings import search
+from nu_mythweb.recordings.models import Channel, GuideProgram, RecordedProgram
+
+START = datetime(2026, 1, 1, 20, tzinfo=UTC)
+
+
+def program_data(title):
+    return {"Title": title, "SubTitle": "", "Description": "", "Category": "News"}
+
+
+def index_rows(model):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT rowid FROM {search.fts_table(model)}")
+        return {row[0] for row in cursor.fetchall()}
+
+
+class SearchIndexTests(TestCase):
+    def test_deleting_guide_programs_removes_index_rows(self):
+        channel = Channel.objects.create(chan_id=1001)
+        programs = [
+            GuideProgram.objects.create(
+                channel=channel,
+                start_time=START + timedelta(hours=hour),
+                end_time=START + timedelta(hours=hour + 1),
+                title=title,
+                data=program_data(title),
+            )
+            for hour, title in enumerate(["Evening News", "Late News"])
+        ]
+        search.index_programs(
+            GuideProgram, [(program.pk, program.data) for program in programs]
+        )
+
+        programs[0].delete()
+
+        self.assertEqual(index_rows(GuideProgram), {programs[1].pk})
+        self.assertEqual(
+            [pk for pk, _ in search.search(GuideProgram.objects.all(), "news")],
+            [programs[1].pk],
+        )
+
+    def test_deleting_recordings_removes_index_rows(self):
+        # the recordings table is rebuilt by 0003_recording_filters
+        for recorded_id in (1, 2):
+            RecordedProgram.objects.create(
+                recorded_id=recorded_id,
+                start_time=START,
+                title="Evening News",
+                data=program_data("Evening News"),
+            )
+        search.index_programs(
+            RecordedProgram, [(1, program_data("Evening News")), (2, {})]
+        )
+
+        RecordedProgram.objects.filter(recorded_id=1).delete()
+
+        self.assertEqual(index_rows(RecordedProgram), {2})
+
+    def test_search_pages(self):
+        RecordedProgram.objects.bulk_create(
+            RecordedProgram(
+                recorded_id=recorded_id,
+                start_time=START,
+                title="Evening News",
+                data=program_data("Evening News"),
+            )
+            for recorded_id in range(1, 6)
+        )
+        search.index_programs(
+            RecordedProgram,
+            [
+                (recorded_id, program_data("Evening News"))
+                for recorded_id in range(1, 6)
+            ],
+        )
+        recordings = RecordedProgram.objects.all()
+
+        first = search.search(recordings, "news", limit=3)
+        rest = search.search(recordings, "news", limit=3, offset=3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(rest), 2)
+        self.assertEqual({pk for pk, _ in first + rest}, {1, 2, 3, 4, 5})
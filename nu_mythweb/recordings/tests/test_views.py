@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+from django.utils.http import http_date
+
+from nu_mythweb.recordings import views
+from nu_mythweb.recordings.api_models import MythProgram, ProgramList
+from nu_mythweb.recordings.views import page_validators, render_if_modified
+
+
+class FakeService:
+    """Stands in for MythTVService, with the version of its last response."""
+
+    def __init__(self, version):
+        self.version = version
+        self.breaker = SimpleNamespace(opened_at=None)
+        self.channels = "channels"
+
+    def content_version(self):
+        return self.version
+
+    def channels_version(self):
+        return self.channels
+
+
+class PageValidatorTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.service = FakeService(("digest", 1767290400.0))
+
+    def validators(self, path="/recordings/", *inputs, **headers):
+        return page_validators(
+            self.factory.get(path, headers=headers), self.service, *inputs
+        )
+
+    def test_same_data_same_etag(self):
+        etag, last_modified = self.validators()
+        self.assertEqual(self.validators(), (etag, last_modified))
+
+    def test_etag_changes_with_inputs(self):
+        etag, _ = self.validators()
+        changes = {
+            "response content": lambda: setattr(
+                self.service, "version", ("changed", 1767290400.0)
+            ),
+            "channel list": lambda: setattr(self.service, "channels", "changed"),
+            "backend outage": lambda: setattr(
+                self.service.breaker, "opened_at", timezone.now()
+            ),
+        }
+        for name, change in changes.items():
+            with self.subTest(name):
+                change()
+                new_etag, _ = self.validators()
+                self.assertNotEqual(new_etag, etag)
+                etag = new_etag
+
+    def test_etag_depends_on_request(self):
+        etag, _ = self.validators()
+        self.assertNotEqual(self.validators("/recordings/?page=2")[0], etag)
+        self.assertNotEqual(self.validators(HX_Request="true")[0], etag)
+
+    def test_etag_changes_at_midnight(self):
+        etag, _ = self.validators()
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch.object(timezone, "localdate", return_value=tomorrow):
+            new_etag, last_modified = self.validators()
+        self.assertNotEqual(new_etag, etag)
+        midnight = timezone.make_aware(datetime.combine(tomorrow, datetime.min.time()))
+        self.assertEqual(last_modified, int(midnight.timestamp()))
+
+    def test_last_modified_from_response(self):
+        self.service.version = ("digest", timezone.now().timestamp() + 60)
+        _, last_modified = self.validators()
+        self.assertEqual(last_modified, int(self.service.version[1]))
+
+    def test_other_inputs_only_get_an_etag(self):
+        etag, last_modified = self.validators("/guide/", "mirror:1")
+        self.assertIsNone(last_modified)
+        self.assertNotEqual(self.validators("/guide/", "mirror:2")[0], etag)
+
+    def test_unknown_version(self):
+        self.service.version = None
+        self.assertIsNone(self.validators())
+
+
+class RenderIfModifiedTests(SimpleTestCase):
+    validators = ('"abc"', 1767290400)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.rendered = []
+
+    def render_page(self, status=200):
+        self.rendered.append(status)
+        return HttpResponse("page", status=status)
+
+    def test_renders_with_validators(self):
+        response = render_if_modified(
+            self.factory.get("/"), self.validators, self.render_page
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["ETag"], '"abc"')
+        self.assertEqual(response.headers["Last-Modified"], http_date(1767290400))
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+        self.assertIn("HX-Request", response.headers["Vary"])
+        self.assertEqual(self.rendered, [200])
+
+    def test_not_modified_for_matching_etag(self):
+        request = self.factory.get("/", headers={"If-None-Match": '"abc"'})
+        response = render_if_modified(request, self.validators, self.render_page)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], '"abc"')
+        self.assertEqual(self.rendered, [])
+
+    def test_not_modified_since(self):
+        request = self.factory.get(
+            "/", headers={"If-Modified-Since": http_date(1767290400)}
+        )
+        response = render_if_modified(request, self.validators, self.render_page)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.rendered, [])
+
+    def test_renders_for_other_etag(self):
+        request = self.factory.get("/", headers={"If-None-Match": '"old"'})
+        response = render_if_modified(request, self.validators, self.render_page)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.rendered, [200])
+
+    def test_errors_do_not_get_validators(self):
+        response = render_if_modified(
+            self.factory.get("/"), self.validators, lambda: self.render_page(503)
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn("ETag", response.headers)
+
+    def test_without_validators(self):
+        request = self.factory.get("/", headers={"If-None-Match": '"abc"'})
+        response = render_if_modified(request, None, self.render_page)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response.headers)
+
+
+def program_at(day, hour):
+    return MythProgram(
+        title="Evening News",
+        raw_start_time=f"2026-01-{day:02}T{hour:02}:00:00+00:00",
+        raw_end_time=f"2026-01-{day:02}T{hour:02}:30:00+00:00",
+    )
+
+
+class PagedProgramPageTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        # the second page of three, starting on the day the first page ended
+        self.programs = ProgramList(
+            [program_at(2, 18), program_at(2, 19), program_at(3, 12)],
+            start_index=3,
+            total_available=9,
+        )
+
+    def render_rows(self, query):
+        request = self.factory.get(
+            f"/recordings/?{query}", headers={"HX-Request": "true"}
+        )
+        context = {}
+        with mock.patch.object(views, "render") as render:
+            views.render_paged_program_page(
+                request, 2, "recordings/list_recordings.html", context, self.programs
+            )
+        self.assertEqual(
+            render.call_args.args[1], "recordings/partials/program_rows.html"
+        )
+        return context
+
+    def test_next_page_continues_from_last_day(self):
+        context = self.render_rows("page=2&day=2026-01-01")
+        self.assertEqual(context["next_page_query"], "page=3")
+        self.assertEqual(
+            context["last_day"],
+            timezone.localtime(self.programs[-1].start_time).date().isoformat(),
+        )
+
+    def test_day_continued_from_previous_page_has_no_header(self):
+        first_day = timezone.localtime(self.programs[0].start_time).date()
+        days = self.render_rows(f"page=2&day={first_day.isoformat()}")["days"]
+        self.assertEqual([day.continued for day in days], [True, False])
+
+    def test_new_day_has_header(self):
+        days = self.render_rows("page=2&day=2026-01-01")["days"]
+        self.assertEqual([day.continued for day in days], [False, False])
@@ -1,19 +1,66 @@
-import time
-from datetime import datetime
+import hashlib
+from datetime import datetime, timedelta
+from functools import partial
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db import DatabaseError
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
 from django.views.decorators.http import require_POST
 
-from nu_mythweb.recordings.api_models import MythProgram
-from nu_mythweb.recordings.mythtv_service import MythTVService
+from nu_mythweb.recordings import guide_mirror, metrics, program_grid
+from nu_mythweb.recordings.api_models import MythProgram, program_days
+from nu_mythweb.recordings.events import format_event, get_event_hub, last_event_id
+from nu_mythweb.recordings.mythtv_service import (
+    RECORD_TYPES,
+    MythTVService,
+    get_breaker,
+)
+
+# marker output by program_table.html in place of rows when streaming
+PROGRAM_ROWS_MARKER = "<!--program-rows-->"
+# sent when a live update stream opens: browser reconnect delay, in ms
+EVENT_STREAM_START = "retry: 5000\n\n"
+# comment sent on idle live update streams, so closed connections are noticed
+EVENT_STREAM_KEEPALIVE = ": keep-alive\n\n"
+# recording manage actions: service method and keyword arguments
+MANAGE_ACTIONS = {
+    "delete": ("delete_recording", {}),
+    "rerecord": ("delete_recording", {"record_again": True}),
+    "undelete": ("undelete_recording", {}),
+    "stop": ("stop_recording", {}),
+}
 
 
 def dashboard(request):
-    context = {"upcoming": [], "error": None}
     mythtv_service = MythTVService()
+    # backend status and recent recordings are independent; fetch in parallel
+    results = mythtv_service.gather(
+        status=mythtv_service.get_backend_status,
+        recorded=partial(mythtv_service.get_recent_recordings, limit=3),
+    )
+    return render(request, "recordings/dashboard.html", dashboard_context(results))
+
+
+def dashboard_context(results):
+    """Build dashboard template context from backend status and recordings
+    :class:`~nu_mythweb.recordings.mythtv_service.CallResult` values."""
+    context = {"upcoming": [], "error": None}
     try:
-        # Fetch detailed Backend Status
-        status = mythtv_service.get_backend_status()
+        # Detailed Backend Status
+        status = results["status"].value
+        if not results["status"].ok:
+            raise results["status"].error
         machine = status.get("MachineInfo", {})
 
         # Extract 'total' storage group for summary
@@ -49,55 +96,433 @@ def dashboard(request):
         context["upcoming"] = [
             MythProgram.from_json(prog) for prog in status.get("Scheduled", [])[:3]
         ]
-        context["recorded"] = mythtv_service.get_recent_recordings(limit=3)
+        # a failure loading recent recordings should not hide backend status
+        context["recorded"] = results["recorded"].value or []
         context["backend"] = backend_info
 
     except Exception as e:
         context["error"] = f"Error connecting to MythTV: {e}"
 
-    return render(request, "recordings/dashboard.html", context)
+    return context
 
 
 def upcoming_list(request):
     context = {"programs": [], "error": None}
+    myth_api = MythTVService()
     try:
-        context["programs"] = MythTVService().get_upcoming_recordings()
+        context["programs"] = myth_api.get_upcoming_recordings()
     except Exception as e:
         context["error"] = f"Could not connect to MythTV: {e}"
 
-    return render(request, "recordings/upcoming.html", context)
+    return render_if_modified(
+        request,
+        page_validators(request, myth_api),
+        partial(
+            render_program_page,
+            request,
+            "recordings/upcoming.html",
+            context,
+            context["programs"],
+        ),
+    )
 
 
 def recordings_list(request):
-    context = {"recordings": [], "error": None}
+    page = get_page_number(request)
+    query = request.GET.get("q", "")
+    filters = get_recording_filters(request)
+    context = {
+        "recordings": [],
+        "error": None,
+        "query": query,
+        "filters": filters,
+        "bulk_actions": True,
+    }
+    myth_api = MythTVService()
     try:
-        recordings = MythTVService().get_recent_recordings(limit=1000)
+        if (query or filters) and not guide_mirror.recordings_available():
+            context.update(MIRROR_UNAVAILABLE)
+        elif query:
+            # search the local copy of recordings
+            context["recordings"] = guide_mirror.search_recordings(
+                query, start=search_start(page)
+            )
+        elif filters:
+            context.update(recording_filter_context(filters, page))
+        else:
+            context["recordings"] = myth_api.get_recent_recordings(
+                limit=settings.MYTHTV_RECORDINGS_PER_PAGE,
+                start=(page - 1) * settings.MYTHTV_RECORDINGS_PER_PAGE,
+            )
     except Exception as e:
-        context["error"] = f"Could not connect to MythTV: {e}"
-    context = {"recordings": recordings}
-    return render(request, "recordings/list_recordings.html", context)
+        context.update(recordings_error(e))
+    context["filter_options"] = guide_mirror.recording_filter_options()
+    # searches and filters of the local copy of recordings have no version
+    return render_if_modified(
+        request,
+        page_validators(request, myth_api, context["filter_options"]),
+        partial(render_recordings_page, request, page, context),
+    )
+
+
+# searches and filters of recordings before the local copy is synced
+MIRROR_UNAVAILABLE = {
+    "error": "Recordings have not been copied from the backend yet; run the"
+    " sync_guide command to search and filter recordings.",
+    "error_title": "Search Unavailable",
+}
+
+
+def recordings_error(error):
+    """Error context for the recordings list, for a backend or local error."""
+    if isinstance(error, DatabaseError):
+        # searches and filters use the local copy of recordings
+        return {
+            "error": f"Could not read the local copy of recordings: {error}",
+            "error_title": "Database Error",
+        }
+    return {"error": f"Could not connect to MythTV: {error}"}
+
+
+def get_recording_filters(request):
+    """
+    Filter, sort and group options for the recordings list from request
+    parameters; empty when none are set. Raises :exc:`BadRequest` for
+    invalid options.
+    """
+    filters = {
+        name: request.GET[name]
+        for name in [*guide_mirror.RECORDING_FILTERS, "sort", "group"]
+        if request.GET.get(name)
+    }
+    if not filters.get("chan_id", "0").isdigit():
+        raise BadRequest("Invalid channel id")
+    if filters.get("sort", "newest") not in guide_mirror.RECORDING_SORTS:
+        raise BadRequest("Invalid sort order")
+    if filters.get("group", "series") != "series":
+        raise BadRequest("Invalid grouping")
+    if filters.get("sort") == "newest":
+        # default order
+        del filters["sort"]
+    return filters
+
+
+def recording_filter_context(filters, page):
+    """
+    Context for a filtered recordings list page, from the local copy of
+    recordings: a page of matching recordings, or matching series when
+    grouped by series.
+    """
+    context = {}
+    if filters.get("group") == "series":
+        context["series"] = guide_mirror.recording_series(filters)
+    else:
+        context["recordings"] = guide_mirror.filter_recordings(
+            filters,
+            sort=filters.get("sort", "newest"),
+            start=(page - 1) * settings.MYTHTV_RECORDINGS_PER_PAGE,
+            limit=settings.MYTHTV_RECORDINGS_PER_PAGE,
+        )
+    return context
+
+
+def get_page_number(request):
+    """Page number from request parameters; defaults to the first page."""
+    try:
+        return max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        return 1
+
+
+def search_start(page):
+    """Index of the first search result on a page of search results."""
+    return (page - 1) * settings.MYTHTV_SEARCH_LIMIT
+
+
+def render_recordings_page(request, page, context, asynchronous=False):
+    """Render a full recordings page, or just the rows for the next page when
+    requested by HTMX infinite scroll."""
+    return render_paged_program_page(
+        request,
+        page,
+        "recordings/list_recordings.html",
+        context,
+        context["recordings"],
+        asynchronous=asynchronous,
+    )
+
+
+def render_paged_program_page(
+    request, page, template_name, context, programs, asynchronous=False
+):
+    """
+    Render a page of a program list that is loaded a page at a time (a
+    :class:`ProgramList` with more programs), with a link to the next page;
+    or just the rows for the next page when requested by HTMX infinite
+    scroll.
+    """
+    if getattr(programs, "has_more", False):
+        context["next_page"] = page + 1
+        # keep filters when loading the next page
+        params = request.GET.copy()
+        params["page"] = page + 1
+        params.pop("day", None)
+        context["next_page_query"] = params.urlencode()
+        context["last_day"] = programs[-1].display.start.date().isoformat()
+    if request.headers.get("HX-Request") and page > 1:
+        days = list(program_days(programs))
+        if days and days[0].date.isoformat() == request.GET.get("day"):
+            days[0].continued = True
+        context["days"] = days
+        return render(request, "recordings/partials/program_rows.html", context)
+    return render_program_page(
+        request, template_name, context, programs, asynchronous=asynchronous
+    )
 
 
 def guide_search(request):
-    query = request.GET.get("q", "")
-    search_type = request.GET.get("search-filter", "keyword")
-    chan_id = request.GET.get("channel_id")
+    query, search_type, chan_id, searchable = guide_search_params(request)
+    page = get_page_number(request)
     results = []
+    mythtv_service = MythTVService()
+    validators = None
+    error = None
 
-    # don't allow empty searches; require either keyword or filter
-    if query or chan_id:
-        results = MythTVService().search_guide(query, search_type, channel_id=chan_id)
+    try:
+        if searchable and guide_mirror.is_available():
+            results = guide_mirror.search_guide(
+                query,
+                search_type,
+                channel_id=chan_id,
+                upcoming=mythtv_service.get_upcoming_recordings(),
+                start=search_start(page),
+            )
+            validators = page_validators(
+                request,
+                mythtv_service,
+                guide_mirror.last_synced(),
+                program_keys(results),
+            )
+        elif searchable:
+            results = mythtv_service.search_guide(
+                query, search_type, channel_id=chan_id
+            )
+            validators = page_validators(request, mythtv_service)
+    except Exception as e:
+        error = f"Could not connect to MythTV: {e}"
 
-    return render(
+    return render_if_modified(
         request,
-        "recordings/guide_search.html",
-        {
-            "results": results,
-            "query": query,
-            "search_filter": search_type,
-            "channel_id": chan_id,
+        validators,
+        partial(
+            render_paged_program_page,
+            request,
+            page,
+            "recordings/guide_search.html",
+            {
+                "results": results,
+                "query": query,
+                "search_filter": search_type,
+                "channel_id": chan_id,
+                "error": error,
+            },
+            results,
+        ),
+    )
+
+
+def guide_search_params(request):
+    """
+    Query, search filter and channel id of a guide search, and whether to
+    search. The search form sends a blank channel id for no channel filter.
+    Empty searches, without a keyword or channel, are not made; nor are
+    searches of channel ids that are not numbers, which match nothing.
+    """
+    query = request.GET.get("q", "")
+    search_type = request.GET.get("search-filter", "keyword")
+    chan_id = request.GET.get("channel_id", "").strip() or None
+    searchable = bool(query or chan_id) and (chan_id is None or chan_id.isdigit())
+    return query, search_type, chan_id, searchable
+
+
+def guide_grid(request):
+    start, end = guide_grid_window(request)
+    mythtv_service = MythTVService()
+    blocks = program_grid.window_blocks(start, end)
+    results = mythtv_service.gather(
+        channels=mythtv_service.get_channels,
+        upcoming=mythtv_service.get_upcoming_recordings,
+        **{
+            block.isoformat(): partial(mythtv_service.get_guide_index, block)
+            for block in blocks
         },
     )
+    validators = page_validators(request, mythtv_service, start)
+    # load the times before and after, for moving the grid
+    for block in program_grid.adjacent_blocks(start, end):
+        mythtv_service.prefetch_guide_index(block)
+    return render_if_modified(
+        request,
+        validators,
+        partial(
+            render,
+            request,
+            "recordings/guide_grid.html",
+            guide_grid_context(results, start, end, blocks),
+        ),
+    )
+
+
+def guide_grid_window(request):
+    """Start and end of the guide grid, from request parameters."""
+    start = program_grid.grid_start(request.GET.get("start"))
+    hours = program_grid.grid_hours(request.GET.get("hours"))
+    return start, start + timedelta(hours=hours)
+
+
+def guide_grid_context(results, start, end, blocks):
+    """Build guide grid template context from the channel list, upcoming
+    recordings and guide block :class:`GuideIndex` values."""
+    hours = (end - start) // timedelta(hours=1)
+    context = {
+        "rows": [],
+        "error": None,
+        "start": start,
+        "hours": hours,
+        "slots": program_grid.grid_slots(start, end),
+        "slot_columns": program_grid.GRID_SLOT // program_grid.GRID_COLUMN,
+        "earlier": start - timedelta(hours=hours),
+        "later": end,
+    }
+    failed = next((result for result in results.values() if not result.ok), None)
+    if failed is not None:
+        context["error"] = f"Could not connect to MythTV: {failed.error}"
+        return context
+    context["rows"] = program_grid.grid_rows(
+        [results[block.isoformat()].value for block in blocks],
+        results["channels"].value,
+        start,
+        end,
+        upcoming=results["upcoming"].value,
+    )
+    return context
+
+
+def page_validators(request, myth_api, *inputs):
+    """
+    ETag and Last-Modified time for a page showing backend data returned by
+    ``myth_api``, derived from the version of the cached responses instead
+    of the rendered page, so unchanged pages are not rendered at all. None
+    if the data's version is unknown (see
+    :meth:`MythTVService.content_version`).
+
+    ``inputs`` are anything else the page shows, e.g. data from the local
+    copy of guide listings. Those have no modified time, so pages with
+    other inputs only get an ETag.
+    """
+    version = myth_api.content_version()
+    if version is None:
+        return None
+    digest, modified = version
+    today = timezone.localdate()
+    offline = myth_api.breaker.opened_at
+    parts = [
+        digest,
+        request.get_full_path(),
+        request.headers.get("HX-Request", ""),
+        # pages embed the CSRF token, and channel names from the channel list
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        myth_api.channels_version(),
+        # dates are shown relative to today, and outages with a notice
+        today,
+        offline,
+        *inputs,
+    ]
+    etag = hashlib.md5("\n".join(map(str, parts)).encode()).hexdigest()
+    if inputs:
+        return f'"{etag}"', None
+    midnight = timezone.make_aware(datetime.combine(today, datetime.min.time()))
+    changes = [modified, midnight.timestamp()]
+    if offline is not None:
+        changes.append(offline.timestamp())
+    return f'"{etag}"', int(max(changes))
+
+
+def program_keys(programs):
+    """Digest of the programs in a list and their recording status."""
+    digest = hashlib.md5()
+    for program in programs:
+        channel = program.channel or {}
+        digest.update(
+            f"{channel.get('ChanId')}|{program.raw_start_time}"
+            f"|{program.status_display}\n".encode()
+        )
+    return digest.hexdigest()
+
+
+def render_if_modified(request, validators, render_page):
+    """
+    Respond with 304 Not Modified if the browser's copy of a page is
+    current, according to ``validators`` from :func:`page_validators`;
+    otherwise render the page with ``render_page()``. Responses carry the
+    validators, and browsers are asked to check them before reusing a page.
+    """
+    if validators is None:
+        return render_page()
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = render_page()
+        if response.status_code != 200:
+            return response
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    # HTMX requests for the same URL get only part of the page
+    patch_vary_headers(response, ["HX-Request"])
+    return response
+
+
+def render_program_page(request, template_name, context, programs, asynchronous=False):
+    """
+    Render a page with a program table as a streaming response.
+
+    The page is rendered with a marker in place of the table rows and sent
+    up to that point; rows are then rendered and sent one day at a time,
+    followed by the rest of the page. The browser can start displaying the
+    page right away and the full page is never held in memory. Pages
+    without programs are rendered normally.
+
+    Use ``asynchronous=True`` from async views, to stream with an async
+    iterator under ASGI.
+    """
+    if not programs:
+        return render(request, template_name, context)
+
+    page = render_to_string(template_name, context | {"stream_rows": True}, request)
+    head, tail = page.split(PROGRAM_ROWS_MARKER, 1)
+    rows_template = get_template("recordings/partials/program_row_group.html")
+
+    def render_rows():
+        yield head
+        # each chunk is a day of programs, starting with a date header
+        for day in program_days(programs):
+            yield rows_template.render(
+                {"day": day, "bulk_actions": context.get("bulk_actions")}
+            )
+        yield tail
+
+    if asynchronous:
+
+        async def arender_rows():
+            # render each day in a worker thread, off the event loop
+            chunks = render_rows()
+            while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+                yield chunk
+
+        return StreamingHttpResponse(arender_rows())
+    return StreamingHttpResponse(render_rows())
 
 
 @require_POST
@@ -115,24 +540,13 @@ def schedule_recording(request):
             chan_id, start_time, record_type=record_type, record_id=record_id
         )
 
-    # get updated program
-    time.sleep(0.3)  # program details are not refreshed immediately...
-    program = myth_api.get_program_details(chan_id, start_time)
-
+    # get updated program; program details are not refreshed immediately,
+    # so check until they reflect the change
+    fetch = partial(myth_api.get_program_details, chan_id, start_time)
     if success:
-        # make sure program details has updated recording information
-        # TODO: should probably set a limit here...
-        retries = 0
-        while retries > 10:
-            # scheduling or canceling schedule
-            if (record_type == "cancel" and hasattr(program, "recording")) or (
-                record_type != "cancel" and program.recording is None
-            ):
-                program = myth_api.get_program_details(chan_id, start_time)
-                print("program.recording:", program.recording)
-                retries += 1
-            else:
-                break
+        program = myth_api.wait_for(fetch, schedule_updated(record_type))
+    else:
+        program = fetch()
 
     # re-render the record form portion of the recording status
     return render(
@@ -148,34 +562,7 @@ def schedule_recording(request):
 @require_POST
 def manage_recording(request, recorded_id: int):
     # delete or undelete
-    action = request.POST.get("action")
-    myth_api = MythTVService()
-    if action == "delete":
-        success = myth_api.delete_recording(recorded_id)
-    elif action == "undelete":
-        success = myth_api.undelete_recording(recorded_id)
-    elif action == "stop":
-        success = myth_api.stop_recording(recorded_id)
-    else:
-        success = False
-
-    # get updated program
-    time.sleep(0.1)  # program details are not refreshed immediately...
-    program = myth_api.get_recording_details(recorded_id)
-
-    if success:
-        # make sure program details has updated recording information
-        retries = 0
-        while retries > 10:
-            # delete or undelete
-            if (action == "delete" and program.recording["RecGroup"] != "Deleted") or (
-                (action == "undelete" and program.recording["RecGroup"] == "Deleted")
-                or (action == "stop" and program.recording["Status"] != "Recording")
-            ):
-                program = myth_api.get_recording_details(recorded_id)
-                retries += 1
-            else:
-                break
+    program, success = manage(MythTVService(), recorded_id, request.POST.get("action"))
 
     # re-render the record form portion of the recording status
     return render(
@@ -186,3 +573,185 @@ def manage_recording(request, recorded_id: int):
             "updated": success,
         },
     )
+
+
+def manage(myth_api, recorded_id, action):
+    """
+    Apply a manage action (see :data:`MANAGE_ACTIONS`) to a recording.
+    Returns the updated program and whether the action succeeded.
+    """
+    method, kwargs = MANAGE_ACTIONS.get(action, (None, {}))
+    success = bool(method) and getattr(myth_api, method)(recorded_id, **kwargs)
+
+    # get updated program; check until it reflects the change
+    fetch = partial(myth_api.get_recording_details, recorded_id)
+    if success:
+        program = myth_api.wait_for(fetch, recording_updated(action))
+        # filtered and searched lists show the local copy of recordings
+        guide_mirror.update_recording(recorded_id, program)
+    else:
+        program = fetch()
+    return program, success
+
+
+@require_POST
+def manage_recordings(request):
+    """
+    Apply a manage action to the recordings selected on the recordings
+    page, a few at a time concurrently. Responds with a summary, and the
+    updated status of each recording swapped into its row.
+    """
+    action = request.POST.get("action")
+    recorded_ids = get_recorded_ids(request)
+    myth_api = MythTVService()
+    results = myth_api.map_concurrent(
+        partial(manage, myth_api, action=action), recorded_ids
+    )
+    return render(
+        request,
+        "recordings/partials/bulk_manage_results.html",
+        bulk_manage_context(recorded_ids, results),
+    )
+
+
+def get_recorded_ids(request):
+    """Unique recording ids selected for a bulk action."""
+    return list(
+        dict.fromkeys(
+            int(value)
+            for value in request.POST.getlist("recorded_id")
+            if value.isdigit()
+        )
+    )
+
+
+def bulk_manage_context(recorded_ids, results):
+    """Template context for the results of a bulk manage action."""
+    programs = []
+    failed = 0
+    for recorded_id, result in zip(recorded_ids, results):
+        program, success = result.value if result.ok else (None, False)
+        if not success:
+            failed += 1
+        if program is not None:
+            programs.append((recorded_id, program, success))
+    return {"programs": programs, "total": len(recorded_ids), "failed": failed}
+
+
+def schedule_updated(record_type):
+    """
+    Returns a check for whether program details reflect a schedule change
+    of the given type (one, single, all, or cancel).
+    """
+    if record_type == "cancel":
+        return lambda program: (
+            program is not None and program.status_display != "Will Record"
+        )
+    _, rec_type = RECORD_TYPES.get(record_type, (None, None))
+
+    # scheduled once the program has a recording rule of the requested type;
+    # an existing rule changing type keeps its id
+    def converged(program):
+        recording = program and program.recording
+        if not recording or not recording.get("RecordId"):
+            return False
+        return "RecType" not in recording or recording["RecType"] == rec_type
+
+    return converged
+
+
+def recording_updated(action):
+    """
+    Returns a check for whether recording details reflect a manage action
+    (delete, rerecord, undelete, stop).
+    """
+
+    def check(program):
+        if program is None or program.recording is None:
+            return False
+        if action in ("delete", "rerecord"):
+            return program.recording.get("RecGroup") == "Deleted"
+        if action == "undelete":
+            return program.recording.get("RecGroup") != "Deleted"
+        if action == "stop":
+            return program.status_display != "Recording"
+        return True
+
+    return check
+
+
+def program_status(request):
+    """Recording status of a program, reloaded after live update events."""
+    recorded_id = request.GET.get("recorded_id")
+    if recorded_id:
+        program = MythTVService().get_recording_details(recorded_id)
+    else:
+        program = MythTVService().get_program_details(
+            request.GET.get("chan_id"), request.GET.get("start_time")
+        )
+    return render_program_status(request, program)
+
+
+def render_program_status(request, program):
+    if not program:
+        # leave the current status in place
+        return HttpResponse(status=204)
+    # program details with the status, for programs picked in the guide grid
+    template_name = (
+        "recordings/partials/guide_grid_program.html"
+        if request.GET.get("details")
+        else "recordings/partials/program_record_status.html"
+    )
+    return render(request, template_name, {"program": program})
+
+
+def live_updates(request):
+    """
+    Send backend events to the browser as Server-Sent Events, see
+    :mod:`nu_mythweb.recordings.events`. Each open connection holds a worker
+    thread; under ASGI the async view is used instead.
+    """
+    if not settings.MYTHTV_LIVE_UPDATES:
+        return live_updates_disabled()
+    hub = get_event_hub()
+    event_id = last_event_id(request, hub)
+
+    def stream():
+        nonlocal event_id
+        yield EVENT_STREAM_START
+        while True:
+            events = hub.wait(event_id, timeout=settings.MYTHTV_EVENT_HEARTBEAT)
+            for event in events:
+                event_id = event["id"]
+                yield format_event(event)
+            if not events:
+                yield EVENT_STREAM_KEEPALIVE
+
+    return event_stream_response(stream())
+
+
+def live_updates_disabled():
+    # no content tells the browser to stop reconnecting
+    return HttpResponse(status=204)
+
+
+def event_stream_response(content):
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # don't let proxies buffer events
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def prometheus_metrics(request):
+    """Metrics of this server process, in the Prometheus text format."""
+    if not settings.MYTHTV_METRICS:
+        raise Http404
+    for base_url in MythTVService().backend_urls:
+        breaker = get_breaker(base_url)
+        metrics.set_gauge(
+            "mythtv_backend_up", int(breaker.opened_at is None), backend=base_url
+        )
+    return HttpResponse(
+        metrics.export(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
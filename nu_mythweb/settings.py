@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "nu_mythweb.recordings.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,13 +54,16 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "nu_mythweb.recordings.middleware.CacheWarmerMiddleware",
+    "nu_mythweb.recordings.middleware.EventHubMiddleware",
 ]
 
 ROOT_URLCONF = "nu_mythweb.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django templates, with render times recorded for metrics
+        "BACKEND": "nu_mythweb.recordings.metrics.TimedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -68,6 +72,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "nu_mythweb.context_processors.channel_list",
+                "nu_mythweb.context_processors.backend_status",
             ],
         },
     },
@@ -87,6 +92,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # rendered program table rows; kept apart so the many small entries
+    # don't push API responses out of the default cache
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fragments",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -132,6 +154,111 @@ FORCE_SCRIPT_NAME = os.getenv("DJANGO_BASE_URL")
 # mythtv config
 MYTHTV_HOST = os.getenv("MYTHTV_BACKEND_IP", "127.0.0.1")
 MYTHTV_PORT = int(os.getenv("MYTHTV_BACKEND_PORT", 6544))
+# slave backends (comma separated host:port), sharing the master's database;
+# guide, channel and recording list requests are spread over all backends
+MYTHTV_SLAVE_BACKENDS = [
+    address.strip()
+    for address in os.getenv("MYTHTV_SLAVE_BACKENDS", "").split(",")
+    if address.strip()
+]
+
+# connection pool shared by all MythTV service API requests
+MYTHTV_POOL_SIZE = int(os.getenv("MYTHTV_POOL_SIZE", 10))
+# timeouts in seconds; connect timeout is kept short so an unreachable
+# backend is detected quickly, read timeout is the default for all endpoints
+MYTHTV_CONNECT_TIMEOUT = float(os.getenv("MYTHTV_CONNECT_TIMEOUT", 3.05))
+MYTHTV_TIMEOUT = float(os.getenv("MYTHTV_TIMEOUT", 10))
+# read timeout overrides for specific endpoints, e.g. large list requests
+MYTHTV_ENDPOINT_TIMEOUTS = {
+    "Status/GetBackendStatus": 5,
+    "Dvr/GetRecordedList": 30,
+    "Guide/GetProgramList": 30,
+}
+# retries with exponential backoff, after connection errors and 502-504
+# responses; only applied to idempotent (GET) requests, never after timeouts
+MYTHTV_RETRIES = int(os.getenv("MYTHTV_RETRIES", 2))
+MYTHTV_RETRY_BACKOFF = float(os.getenv("MYTHTV_RETRY_BACKOFF", 0.2))
+# after this many consecutive failed requests the backend is treated as
+# down: requests fail immediately and cached data is shown, and the backend
+# is checked again every reset interval (seconds) until it responds
+MYTHTV_BREAKER_FAILURES = int(os.getenv("MYTHTV_BREAKER_FAILURES", 3))
+MYTHTV_BREAKER_RESET = float(os.getenv("MYTHTV_BREAKER_RESET", 15))
+# record timings of backend requests, parsing and rendering, and cache hits;
+# exported at /metrics (Prometheus format) and in Server-Timing headers.
+# Off by default: /metrics is not authenticated, so only turn it on where
+# the site is not public or the path is restricted by the web server
+MYTHTV_METRICS = os.getenv("MYTHTV_METRICS", "False") == "True"
+# cache timeouts in seconds for MythTV API responses, by endpoint; endpoints
+# not listed are never cached. Cached schedule and recording data is expired
+# whenever a change is made through this site.
+MYTHTV_CACHE_TTLS = {
+    "Channel/GetChannelInfoList": 60 * 60 * 24,
+    "Guide/GetProgramList": 60 * 60,
+    "Dvr/GetUpcomingList": 60 * 5,
+    "Dvr/GetRecordedList": 60 * 5,
+    "Status/GetBackendStatus": 30,
+}
+# zlib compression level (1-9) for large cached results; 0 to not compress
+MYTHTV_CACHE_COMPRESSION = int(os.getenv("MYTHTV_CACHE_COMPRESSION", 1))
+# expired responses are served for up to this many more seconds while they
+# are refreshed in the background, so requests don't wait for the backend
+MYTHTV_CACHE_GRACE = int(os.getenv("MYTHTV_CACHE_GRACE", 3600))
+# identical concurrent requests share one backend request in each process;
+# also share between processes, using the cache (needs a shared cache)
+MYTHTV_SHARED_SINGLE_FLIGHT = (
+    os.getenv("MYTHTV_SHARED_SINGLE_FLIGHT", "False") == "True"
+)
+# refresh frequently used data in a background thread of each process
+# before it expires; off by default, as it keeps polling the backend while
+# nobody uses the site. With a shared cache, run the warm_mythtv_cache
+# command instead
+MYTHTV_CACHE_WARMER = os.getenv("MYTHTV_CACHE_WARMER", "False") == "True"
+MYTHTV_CACHE_WARM_INTERVAL = 30
+# after a change, poll with exponential backoff (starting at the poll
+# interval) until the backend reports the new state, or the timeout passes
+MYTHTV_POLL_INTERVAL = float(os.getenv("MYTHTV_POLL_INTERVAL", 0.05))
+MYTHTV_CONVERGE_TIMEOUT = float(os.getenv("MYTHTV_CONVERGE_TIMEOUT", 3))
+# seconds to keep rendered program table rows in the fragments cache; rows
+# are keyed by program details and recording status, so changes are never
+# served from it. 0 to always render rows
+MYTHTV_ROW_CACHE_TIMEOUT = int(os.getenv("MYTHTV_ROW_CACHE_TIMEOUT", 60 * 60 * 24))
+# number of recordings loaded at a time on the recordings page
+MYTHTV_RECORDINGS_PER_PAGE = 100
+# recordings updated at a time by bulk actions on the recordings page
+MYTHTV_BULK_CONCURRENCY = int(os.getenv("MYTHTV_BULK_CONCURRENCY", 4))
+# local copy of guide listings in the project database, for guide search;
+# kept up to date by running the sync_guide management command, and only
+# used once it has been run (until then, searches go to the backend). Listings
+# are synced in blocks of hours, which are refreshed once older than max age
+MYTHTV_GUIDE_MIRROR = os.getenv("MYTHTV_GUIDE_MIRROR", "True") == "True"
+MYTHTV_GUIDE_SYNC_DAYS = int(os.getenv("MYTHTV_GUIDE_SYNC_DAYS", 14))
+MYTHTV_GUIDE_SYNC_WINDOW_HOURS = 6
+MYTHTV_GUIDE_SYNC_MAX_AGE_HOURS = float(
+    os.getenv("MYTHTV_GUIDE_SYNC_MAX_AGE_HOURS", 12)
+)
+# guide grid: listings of all channels are fetched from the backend and
+# indexed in memory in blocks of hours (a divisor of 24); the grid shows
+# this many hours at a time by default
+MYTHTV_GUIDE_GRID_BLOCK_HOURS = int(os.getenv("MYTHTV_GUIDE_GRID_BLOCK_HOURS", 6))
+MYTHTV_GUIDE_GRID_HOURS = int(os.getenv("MYTHTV_GUIDE_GRID_HOURS", 3))
+# push live updates to pages using events from the backend's Myth protocol
+# port; the protocol version and token must match the backend's version.
+# Each open page holds a connection, so by default only with async views
+# (ASGI); with WSGI every open page would hold a worker thread
+MYTHTV_LIVE_UPDATES = (
+    os.getenv("MYTHTV_LIVE_UPDATES", os.getenv("MYTHTV_ASYNC_VIEWS", "False")) == "True"
+)
+MYTHTV_EVENT_PORT = int(os.getenv("MYTHTV_EVENT_PORT", 6543))
+MYTHTV_PROTO_VERSION = os.getenv("MYTHTV_PROTO_VERSION", "91")
+# the token for protocol version 91
+MYTHTV_PROTO_TOKEN = os.getenv("MYTHTV_PROTO_TOKEN", "BuzzOff")
+# seconds between keep-alive messages on idle live update connections
+MYTHTV_EVENT_HEARTBEAT = 15
+# results per page of a search of the local guide or recordings; more are
+# loaded as the page is scrolled
+MYTHTV_SEARCH_LIMIT = int(os.getenv("MYTHTV_SEARCH_LIMIT", 200))
+# use async views and client; enabled by default when served via asgi.py
+MYTHTV_ASYNC_VIEWS = os.getenv("MYTHTV_ASYNC_VIEWS", "False") == "True"
 
 
 # set environment variables
@@ -140,6 +267,8 @@ MYTHTV_PORT = int(os.getenv("MYTHTV_BACKEND_PORT", 6544))
 # SECRET_KEY=
 # MYTHTV_BACKEND_IP=
 # MYTHTV_BACKEND_PORT=6544
+# MYTHTV_POOL_SIZE=10
+# MYTHTV_TIMEOUT=10
 
 # apache env syntax
 # SetEnv MYTHTV_BACKEND_IP 192.168.1.100
@@ -7,24 +7,48 @@ from django.conf import settings
 from django.urls import path
 from django.views.generic.base import RedirectView
 
-from nu_mythweb.recordings.views import (
-    dashboard,
-    guide_search,
-    manage_recording,
-    recordings_list,
-    schedule_recording,
-    upcoming_list,
-)
+if settings.MYTHTV_ASYNC_VIEWS:
+    from nu_mythweb.recordings.async_views import (
+        dashboard,
+        guide_grid,
+        guide_search,
+        live_updates,
+        manage_recording,
+        manage_recordings,
+        program_status,
+        recordings_list,
+        schedule_recording,
+        upcoming_list,
+    )
+else:
+    from nu_mythweb.recordings.views import (
+        dashboard,
+        guide_grid,
+        guide_search,
+        live_updates,
+        manage_recording,
+        manage_recordings,
+        program_status,
+        recordings_list,
+        schedule_recording,
+        upcoming_list,
+    )
+from nu_mythweb.recordings.views import prometheus_metrics
 
 urlpatterns = [
     path("", dashboard, name="home"),
     path("upcoming/", upcoming_list, name="upcoming"),
     path("guide/", guide_search, name="guide-search"),
+    path("guide/grid/", guide_grid, name="guide-grid"),
     path("recording/schedule/", schedule_recording, name="schedule-recording"),
     path(
         "recording/manage/<int:recorded_id>/", manage_recording, name="manage-recording"
     ),
     path("recordings/", recordings_list, name="list-recordings"),
+    path("recordings/manage/", manage_recordings, name="manage-recordings"),
+    path("program/status/", program_status, name="program-status"),
+    path("live-updates/", live_updates, name="live-updates"),
+    path("metrics", prometheus_metrics, name="metrics"),
     path(
         "favicon.ico", RedirectView.as_view(url=settings.STATIC_URL + "img/favicon.ico")
     ),
@@ -0,0 +1,60 @@
+// Live updates: reload the recording status of programs on the page when
+// the backend reports a change (see nu_mythweb/recordings/events.py)
+(function () {
+    const script = document.currentScript;
+    if (!window.EventSource) {
+        return;
+    }
+    const statusUrl = script.dataset.statusUrl;
+    const source = new EventSource(script.dataset.eventsUrl);
+    let pendingReload = null;
+
+    function reloadStatus(cell) {
+        const params = new URLSearchParams();
+        if (cell.dataset.recordedId) {
+            params.set("recorded_id", cell.dataset.recordedId);
+        } else {
+            params.set("chan_id", cell.dataset.chanId);
+            params.set("start_time", cell.dataset.startTime);
+        }
+        htmx.ajax("GET", statusUrl + "?" + params, {target: cell, swap: "innerHTML"});
+    }
+
+    function isVisible(element) {
+        const rect = element.getBoundingClientRect();
+        return rect.bottom > 0 && rect.top < window.innerHeight;
+    }
+
+    function programCells(event) {
+        const selectors = [];
+        if (event.recorded_id) {
+            selectors.push(`td.status[data-recorded-id="${CSS.escape(event.recorded_id)}"]`);
+        }
+        if (event.chan_id && event.start_time) {
+            selectors.push(
+                `td.status[data-chan-id="${CSS.escape(event.chan_id)}"]` +
+                `[data-start-time="${CSS.escape(event.start_time)}"]`
+            );
+        }
+        return selectors.length ? document.querySelectorAll(selectors.join(", ")) : null;
+    }
+
+    source.addEventListener("mythtv", function (message) {
+        const event = JSON.parse(message.data);
+        const cells = programCells(event);
+        if (cells) {
+            cells.forEach(reloadStatus);
+            return;
+        }
+        // schedule changes can affect any program; once changes settle,
+        // reload the programs in view
+        clearTimeout(pendingReload);
+        pendingReload = setTimeout(function () {
+            document.querySelectorAll("td.status").forEach(function (cell) {
+                if (isVisible(cell)) {
+                    reloadStatus(cell);
+                }
+            });
+        }, 1000);
+    });
+})();